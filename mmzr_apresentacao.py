@@ -0,0 +1,126 @@
+"""
+MMZR Family Office - Apresentação dos Valores de Rentabilidade
+
+Este módulo calcula de uma vez, para a tabela de rentabilidade inteira, os
+textos e as cores exibidos na tabela de performance dos relatórios. Os
+percentuais, diferenças em pontos percentuais e valores em reais são
+formatados com operações vetorizadas do NumPy/pandas, e a renderização de
+cada carteira só consulta os valores prontos.
+
+Os textos são idênticos aos de ``MMZREmailGenerator.format_percentage`` e
+``format_currency`` (inclusive o separador de milhar ".", que é o formato
+já usado nos relatórios).
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# Cores dos valores positivos, negativos e nulos
+COR_POSITIVO = "#28a745"
+COR_NEGATIVO = "#dc3545"
+COR_NEUTRO = "#333333"
+
+# Dígito seguido de grupos de 3 dígitos até o ponto decimal (separador de milhar)
+_PADRAO_MILHAR = r'(\d)(?=(?:\d{3})+\.)'
+
+# Períodos da tabela de performance: sufixo das colunas de saída -> colunas da planilha
+PERIODOS = {
+    'mes': ('Rentabilidade Carteira Mês', 'Benchmark Mês', 'Variação Relativa Mês'),
+    'ano': ('Rentabilidade Carteira No Ano', 'Benchmark No Ano', 'Variação Relativa No Ano'),
+}
+
+
+def _como_float(valores: Iterable) -> np.ndarray:
+    """Converte os valores para um array float64."""
+    return np.asarray(valores, dtype=float)
+
+
+def cores(valores: Iterable) -> np.ndarray:
+    """
+    Cor de exibição de cada valor (verde se positivo, vermelho se negativo).
+
+    Args:
+        valores (Iterable): Valores numéricos
+
+    Returns:
+        np.ndarray: Cores em hexadecimal (NaN e zero usam a cor neutra)
+    """
+    valores = _como_float(valores)
+    return np.where(valores > 0, COR_POSITIVO, np.where(valores < 0, COR_NEGATIVO, COR_NEUTRO)).astype(object)
+
+
+def _duas_casas(valores: np.ndarray) -> np.ndarray:
+    """Texto de cada valor com duas casas decimais (mesmo arredondamento de f"{v:.2f}")."""
+    return np.char.mod('%.2f', valores)
+
+
+def formatar_percentuais(valores: Iterable, sufixo: str = "%") -> np.ndarray:
+    """
+    Formata valores como percentual, com "+" explícito nos positivos.
+
+    Args:
+        valores (Iterable): Valores numéricos
+        sufixo (str): Texto após o número ("%" ou " p.p.")
+
+    Returns:
+        np.ndarray: Textos no formato "+1.23%"
+    """
+    valores = _como_float(valores)
+    sinais = np.where(valores > 0, "+", "")
+    return np.char.add(np.char.add(sinais, _duas_casas(valores)), sufixo).astype(object)
+
+
+def formatar_moedas(valores: Iterable) -> np.ndarray:
+    """
+    Formata valores como moeda ("R$ 1.234.56", "-R$ 10.00").
+
+    Args:
+        valores (Iterable): Valores numéricos
+
+    Returns:
+        np.ndarray: Textos formatados
+    """
+    valores = _como_float(valores)
+    nao_negativos = valores >= 0
+    # O módulo só é aplicado aos negativos (-0.0 mantém o sinal, como no formato original)
+    numeros = pd.Series(_duas_casas(np.where(nao_negativos, valores, -valores)), dtype=object)
+    numeros = numeros.str.replace(_PADRAO_MILHAR, r'\1.', regex=True).to_numpy(dtype=str)
+    prefixos = np.where(nao_negativos, "R$ ", "-R$ ")
+    return np.char.add(prefixos, numeros).astype(object)
+
+
+def apresentar_rentabilidade(rentabilidade: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula os textos e cores da tabela de performance de todas as carteiras.
+
+    Para cada período (sufixo ``mes`` ou ``ano``) são geradas as colunas
+    ``cor_carteira_<p>``, ``carteira_<p>``, ``benchmark_<p>``,
+    ``cor_diferenca_<p>`` e ``diferenca_<p>``; para o retorno financeiro
+    (vazio vale 0), ``cor_retorno`` e ``retorno``.
+
+    Args:
+        rentabilidade (pd.DataFrame): Tabela de rentabilidade (ESQUEMA_RENTABILIDADE)
+
+    Returns:
+        pd.DataFrame: Uma linha por linha da tabela, na mesma ordem, indexada
+            pelo 'Código carteira smart'
+    """
+    colunas = {}
+    for periodo, (carteira, benchmark, diferenca) in PERIODOS.items():
+        colunas[f'cor_carteira_{periodo}'] = cores(rentabilidade[carteira])
+        colunas[f'carteira_{periodo}'] = formatar_percentuais(rentabilidade[carteira])
+        colunas[f'benchmark_{periodo}'] = formatar_percentuais(rentabilidade[benchmark])
+        colunas[f'cor_diferenca_{periodo}'] = cores(rentabilidade[diferenca])
+        colunas[f'diferenca_{periodo}'] = formatar_percentuais(rentabilidade[diferenca], " p.p.")
+
+    retorno = rentabilidade['Retorno Financeiro'].fillna(0)
+    colunas['cor_retorno'] = cores(retorno)
+    colunas['retorno'] = formatar_moedas(retorno)
+
+    return pd.DataFrame(colunas, index=pd.Index(rentabilidade['Código carteira smart'].to_numpy(), dtype=object))
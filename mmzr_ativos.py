@@ -0,0 +1,124 @@
+"""
+MMZR Family Office - Interpretação de Ativos
+
+Este módulo interpreta os rótulos de ativos usados nas seções de ativos
+promotores e detratores, no formato "NOME DO ATIVO (1,23%)". O padrão é
+compilado uma única vez e cada texto distinto é interpretado no máximo uma
+vez por processo: a extração (filtro por sinal) e a renderização (inclusão
+do "+" nos percentuais positivos) reutilizam o mesmo resultado.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import re
+from typing import Dict, Iterable, NamedTuple, Optional
+
+import pandas as pd
+
+# Percentual entre parênteses no rótulo do ativo, ex.: "(1.5%)", "(-0,94%)", "(+2%)"
+PADRAO_PERCENTUAL = re.compile(r'\(([-+]?\d+[.,]?\d*)%\)')
+
+# Mesmo padrão, capturando também o texto anterior (equivale a PADRAO_PERCENTUAL.search)
+PADRAO_ROTULO = re.compile(r'^(.*?)' + PADRAO_PERCENTUAL.pattern, re.DOTALL)
+
+# Limite de rótulos distintos mantidos em memória
+TAMANHO_MAXIMO_CACHE = 100_000
+
+
+class AtivoInterpretado(NamedTuple):
+    """
+    Rótulo de ativo já interpretado.
+
+    Attributes:
+        texto (str): Rótulo original
+        nome (str): Texto antes do percentual (ou o rótulo inteiro, sem percentual)
+        percentual_str (Optional[str]): Percentual como escrito, com ponto decimal
+        percentual (Optional[float]): Valor numérico do percentual
+        sinal (Optional[int]): 1, -1 ou 0 conforme o percentual (None se ausente)
+        rotulo_promotor (str): Rótulo exibido na seção de promotores ("+" explícito)
+    """
+    texto: str
+    nome: str
+    percentual_str: Optional[str]
+    percentual: Optional[float]
+    sinal: Optional[int]
+    rotulo_promotor: str
+
+
+_cache_ativos: Dict[str, AtivoInterpretado] = {}
+
+
+def _montar(texto: str, nome: str, percentual_str: Optional[str]) -> AtivoInterpretado:
+    """Cria o AtivoInterpretado a partir das partes extraídas pelo padrão."""
+    if percentual_str is None:
+        return AtivoInterpretado(texto, nome, None, None, None, texto)
+
+    percentual = float(percentual_str)
+    sinal = 1 if percentual > 0 else -1 if percentual < 0 else 0
+
+    # Adicionar o símbolo "+" antes da porcentagem se for um valor positivo
+    rotulo_promotor = texto
+    if percentual > 0 and not percentual_str.startswith('+'):
+        rotulo_promotor = texto.replace(f"({percentual_str}%)", f"(+{percentual_str}%)")
+
+    return AtivoInterpretado(texto, nome, percentual_str, percentual, sinal, rotulo_promotor)
+
+
+def _guardar(ativo: AtivoInterpretado) -> AtivoInterpretado:
+    """Guarda um rótulo interpretado no cache, respeitando o tamanho máximo."""
+    if len(_cache_ativos) >= TAMANHO_MAXIMO_CACHE:
+        _cache_ativos.clear()
+    _cache_ativos[ativo.texto] = ativo
+    return ativo
+
+
+def interpretar_ativo(texto: str) -> AtivoInterpretado:
+    """
+    Interpreta um rótulo de ativo (resultado memorizado por texto).
+
+    Args:
+        texto (str): Rótulo no formato "NOME (1,23%)"
+
+    Returns:
+        AtivoInterpretado: Nome, percentual e sinal do ativo
+    """
+    ativo = _cache_ativos.get(texto)
+    if ativo is not None:
+        return ativo
+
+    match = PADRAO_PERCENTUAL.search(texto)
+    if match is None:
+        return _guardar(_montar(texto, texto.strip(), None))
+    return _guardar(_montar(texto, texto[:match.start()].strip(), match.group(1).replace(',', '.')))
+
+
+def interpretar_coluna(valores: Iterable) -> int:
+    """
+    Interpreta de uma vez uma coluna inteira de rótulos de ativos.
+
+    Os textos distintos ainda não vistos são processados em bloco com
+    ``str.extract`` e guardados no cache usado por ``interpretar_ativo``,
+    de modo que a renderização não executa o padrão rótulo a rótulo.
+    Valores vazios (NaN/None) são ignorados.
+
+    Args:
+        valores (Iterable): Série ou lista de rótulos
+
+    Returns:
+        int: Quantidade de textos novos interpretados
+    """
+    serie = pd.Series(valores, dtype=object).dropna()
+    distintos = pd.Series(pd.unique(serie.astype(str)), dtype=object)
+    novos = distintos[~distintos.isin(_cache_ativos.keys())]
+
+    if len(novos):
+        extraido = novos.str.extract(PADRAO_ROTULO)
+        percentuais = extraido[1].str.replace(',', '.', regex=False)
+        for texto, nome, percentual_str in zip(novos.tolist(), extraido[0].tolist(), percentuais.tolist()):
+            if isinstance(percentual_str, str):
+                _guardar(_montar(texto, nome.strip(), percentual_str))
+            else:
+                _guardar(_montar(texto, texto.strip(), None))
+    return len(novos)
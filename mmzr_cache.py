@@ -0,0 +1,336 @@
+"""
+MMZR Family Office - Cache de Planilhas
+
+Este módulo mantém em disco uma cópia já interpretada das abas das planilhas
+Excel, evitando que cada execução precise abrir e decodificar novamente os
+arquivos .xlsx/.xlsm (a etapa mais lenta do processamento mensal).
+
+Cada aba é gravada em formato pickle dentro de uma pasta
+``.mmzr_cache`` ao lado das planilhas. A chave de cada entrada combina o
+caminho absoluto, o tamanho, a data de modificação e o hash SHA-256 do
+conteúdo do arquivo de origem; quando a planilha muda (ou quando o esquema ou
+as opções de leitura de uma aba mudam), as entradas antigas daquela planilha
+são descartadas automaticamente.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import os
+import hashlib
+import pickle
+import logging
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from mmzr_compatibilidade import MMZRCompatibilidade
+from mmzr_schema import EsquemaAba
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+NOME_DIRETORIO_CACHE = ".mmzr_cache"
+
+
+class MMZRCache:
+    """
+    Cache de abas de planilhas Excel indexado pela assinatura do arquivo.
+
+    Attributes:
+        diretorio (Optional[str]): Pasta do cache; se None, usa ``.mmzr_cache``
+            ao lado de cada planilha lida
+        habilitado (bool): Se False, todas as leituras vão direto ao Excel
+    """
+
+    # Incrementar quando o formato das entradas gravadas mudar
+    VERSAO_FORMATO = 2
+
+    # Assinaturas já calculadas nesta execução: (caminho, tamanho, mtime) -> hash
+    _hashes_calculados: Dict[Tuple[str, int, int], str] = {}
+
+    def __init__(self, diretorio: Optional[str] = None, habilitado: bool = True) -> None:
+        """
+        Inicializa o cache.
+
+        Args:
+            diretorio (Optional[str]): Pasta onde as entradas serão gravadas
+            habilitado (bool): Permite desligar o cache sem alterar o chamador
+        """
+        self.diretorio = diretorio
+        self.habilitado = habilitado
+
+    @staticmethod
+    def assinatura_arquivo(caminho: str) -> str:
+        """
+        Calcula a assinatura de um arquivo (caminho + tamanho + mtime + SHA-256).
+
+        O hash do conteúdo é memorizado por (caminho, tamanho, mtime) para que
+        várias abas do mesmo arquivo não releiam os bytes a cada consulta.
+
+        Args:
+            caminho (str): Caminho do arquivo
+
+        Returns:
+            str: Assinatura hexadecimal do arquivo
+        """
+        caminho_abs = os.path.abspath(caminho)
+        stat = os.stat(caminho_abs)
+        chave = (caminho_abs, stat.st_size, stat.st_mtime_ns)
+
+        hash_conteudo = MMZRCache._hashes_calculados.get(chave)
+        if hash_conteudo is None:
+            sha = hashlib.sha256()
+            with open(caminho_abs, "rb") as f:
+                for bloco in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(bloco)
+            hash_conteudo = sha.hexdigest()
+            MMZRCache._hashes_calculados[chave] = hash_conteudo
+
+        return hashlib.sha256(
+            f"{caminho_abs}|{stat.st_size}|{stat.st_mtime_ns}|{hash_conteudo}".encode("utf-8")
+        ).hexdigest()
+
+    def _diretorio_para(self, caminho: str) -> str:
+        """Retorna a pasta de cache usada para uma planilha."""
+        if self.diretorio:
+            return self.diretorio
+        return os.path.join(os.path.dirname(os.path.abspath(caminho)), NOME_DIRETORIO_CACHE)
+
+    @staticmethod
+    def _prefixo_fonte(caminho: str) -> str:
+        """Prefixo comum a todas as entradas de uma planilha (qualquer aba, opção ou versão)."""
+        nome_base = "".join(c if c.isalnum() else "_" for c in os.path.basename(caminho))
+        fonte = hashlib.sha1(os.path.abspath(caminho).encode("utf-8")).hexdigest()[:8]
+        return f"{nome_base}__{fonte}__"
+
+    def _prefixo_entrada(self, caminho: str, aba: Union[str, int], opcoes: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Monta o prefixo estável de uma entrada (independente da versão do arquivo).
+
+        O nome das entradas tem a forma ``<planilha>__<fonte>__<aba><opções>__<versão>.pkl``,
+        o que permite reconhecer as entradas da mesma planilha e da mesma aba
+        mesmo depois de uma mudança de esquema ou de opções.
+
+        Args:
+            caminho (str): Caminho da planilha
+            aba (Union[str, int]): Nome ou índice da aba
+            opcoes (Dict[str, Any]): Opções repassadas ao ``pd.read_excel``
+
+        Returns:
+            Tuple[str, str]: (prefixo da aba, prefixo completo usado no nome do arquivo)
+        """
+        chave_aba = hashlib.sha1(repr(aba).encode("utf-8")).hexdigest()[:8]
+        chave_opcoes = hashlib.sha1(repr((
+            self.VERSAO_FORMATO,
+            sorted((k, repr(v)) for k, v in opcoes.items()),
+        )).encode("utf-8")).hexdigest()[:8]
+        prefixo_aba = f"{self._prefixo_fonte(caminho)}{chave_aba}"
+        return prefixo_aba, f"{prefixo_aba}{chave_opcoes}__"
+
+    def _remover_obsoletos(self, diretorio: str, caminho: str, prefixo_aba: str, arquivo_atual: str) -> None:
+        """
+        Remove as entradas da planilha que não servem mais.
+
+        São removidas as entradas de versões anteriores do arquivo (planilha
+        modificada), de qualquer aba, e as da mesma aba gravadas com outro
+        esquema ou outras opções.
+        """
+        prefixo_fonte = self._prefixo_fonte(caminho)
+        versao_atual = arquivo_atual[arquivo_atual.rindex("__"):]
+        try:
+            for nome in os.listdir(diretorio):
+                if not nome.startswith(prefixo_fonte) or not nome.endswith(".pkl") or nome == arquivo_atual:
+                    continue
+                if not nome.endswith(versao_atual) or nome.startswith(prefixo_aba):
+                    os.remove(os.path.join(diretorio, nome))
+                    logger.info(f"Entrada de cache obsoleta removida: {nome}")
+        except OSError as e:
+            logger.warning(f"Erro ao remover entradas obsoletas do cache: {e}")
+
+    def _localizar_entrada(self, caminho: str, aba: Union[str, int],
+                           opcoes: Dict[str, Any]) -> Optional[Tuple[str, str, str]]:
+        """
+        Localiza o arquivo de cache correspondente à versão atual da planilha.
+
+        Args:
+            caminho (str): Caminho da planilha de origem
+            aba (Union[str, int]): Aba (ou marcador) a que o valor se refere
+            opcoes (Dict[str, Any]): Opções que influenciam o valor calculado
+
+        Returns:
+            Optional[Tuple[str, str, str]]: (pasta, prefixo da aba, nome do arquivo)
+                ou None se a planilha não puder ser lida
+        """
+        try:
+            assinatura = self.assinatura_arquivo(caminho)
+        except OSError:
+            return None
+        prefixo_aba, prefixo = self._prefixo_entrada(caminho, aba, opcoes)
+        return self._diretorio_para(caminho), prefixo_aba, f"{prefixo}{assinatura[:24]}.pkl"
+
+    def _carregar_ou_calcular(self, caminho: str, aba: Union[str, int], opcoes: Dict[str, Any], calcular: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache para (caminho, aba, opções) ou o calcula e grava.
+
+        Args:
+            caminho (str): Caminho da planilha de origem
+            aba (Union[str, int]): Aba (ou marcador) a que o valor se refere
+            opcoes (Dict[str, Any]): Opções que influenciam o valor calculado
+            calcular (Callable[[], Any]): Função sem argumentos que produz o valor
+
+        Returns:
+            Any: Valor lido do cache ou recém-calculado
+        """
+        if not self.habilitado:
+            return calcular()
+
+        entrada = self._localizar_entrada(caminho, aba, opcoes)
+        if entrada is None:
+            # Arquivo inexistente ou inacessível: deixar o erro real surgir na leitura
+            return calcular()
+
+        diretorio, prefixo_aba, nome_arquivo = entrada
+        caminho_cache = os.path.join(diretorio, nome_arquivo)
+
+        if os.path.exists(caminho_cache):
+            try:
+                with open(caminho_cache, "rb") as f:
+                    valor = pickle.load(f)
+                logger.info(f"Cache reutilizado: {os.path.basename(caminho)} [{aba}]")
+                return valor
+            except Exception as e:
+                logger.warning(f"Entrada de cache inválida, recalculando: {e}")
+
+        valor = calcular()
+
+        caminho_tmp = None
+        try:
+            os.makedirs(diretorio, exist_ok=True)
+            fd, caminho_tmp = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(caminho_tmp, caminho_cache)
+            caminho_tmp = None
+            self._remover_obsoletos(diretorio, caminho, prefixo_aba, nome_arquivo)
+        except Exception as e:
+            logger.warning(f"Não foi possível gravar o cache de {os.path.basename(caminho)}: {e}")
+        finally:
+            # Temporário de uma gravação que falhou (ex.: valor que não pode ser serializado)
+            if caminho_tmp is not None:
+                try:
+                    os.remove(caminho_tmp)
+                except OSError:
+                    pass
+
+        return valor
+
+    def listar_abas(self, caminho: str) -> List[str]:
+        """
+        Retorna os nomes das abas de uma planilha.
+
+        Os nomes vêm da sonda leve de MMZRCompatibilidade (apenas
+        xl/workbook.xml), que já é memorizada por assinatura do arquivo e
+        dispensa gravação em disco.
+
+        Args:
+            caminho (str): Caminho da planilha
+
+        Returns:
+            List[str]: Nomes das abas na ordem do arquivo
+        """
+        return list(MMZRCompatibilidade._listar_abas(caminho))
+
+    @staticmethod
+    def _opcoes(esquema: Optional[EsquemaAba], opcoes: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Separa as opções repassadas ao ``pd.read_excel`` das que compõem a chave."""
+        opcoes_leitura = dict(opcoes)
+        opcoes_chave = dict(opcoes)
+        if esquema is not None:
+            opcoes_leitura.update(esquema.opcoes_leitura())
+            opcoes_chave['esquema'] = esquema
+        return opcoes_leitura, opcoes_chave
+
+    def contem_aba(self, caminho: str, aba: Union[str, int] = 0, esquema: Optional[EsquemaAba] = None,
+                   **opcoes: Any) -> bool:
+        """
+        Indica se a aba já está em cache para a versão atual da planilha.
+
+        Args:
+            caminho (str): Caminho da planilha
+            aba (Union[str, int]): Nome ou índice da aba
+            esquema (Optional[EsquemaAba]): Esquema usado na leitura
+            **opcoes: Argumentos adicionais para ``pd.read_excel``
+
+        Returns:
+            bool: True se ``ler_aba`` com os mesmos argumentos não precisar abrir o Excel
+        """
+        if not self.habilitado:
+            return False
+        entrada = self._localizar_entrada(caminho, aba, self._opcoes(esquema, opcoes)[1])
+        return entrada is not None and os.path.exists(os.path.join(entrada[0], entrada[2]))
+
+    def ler_aba(self, caminho: str, aba: Union[str, int] = 0, esquema: Optional[EsquemaAba] = None,
+                **opcoes: Any) -> pd.DataFrame:
+        """
+        Lê uma aba como DataFrame, reaproveitando o cache se a planilha não mudou.
+
+        Args:
+            caminho (str): Caminho da planilha
+            aba (Union[str, int]): Nome ou índice da aba
+            esquema (Optional[EsquemaAba]): Restringe a leitura às colunas/tipos declarados
+                (as colunas numéricas são convertidas depois da leitura, e a versão
+                convertida é a que fica em cache)
+            **opcoes: Argumentos adicionais para ``pd.read_excel``
+
+        Returns:
+            pd.DataFrame: Conteúdo da aba
+
+        Raises:
+            ValueError: Se faltar alguma coluna obrigatória do esquema
+        """
+        opcoes_leitura, opcoes_chave = self._opcoes(esquema, opcoes)
+
+        def ler() -> pd.DataFrame:
+            df_lido = pd.read_excel(caminho, sheet_name=aba, **opcoes_leitura)
+            return esquema.converter(df_lido) if esquema is not None else df_lido
+
+        df = self._carregar_ou_calcular(caminho, aba, opcoes_chave, ler)
+        if esquema is not None:
+            esquema.validar(df)
+        return df
+
+    def limpar(self, caminho_planilha: Optional[str] = None) -> int:
+        """
+        Remove todas as entradas do cache.
+
+        Args:
+            caminho_planilha (Optional[str]): Planilha cuja pasta de cache será limpa
+                (obrigatório quando o cache não tem diretório fixo)
+
+        Returns:
+            int: Quantidade de arquivos removidos
+        """
+        if self.diretorio:
+            diretorio = self.diretorio
+        elif caminho_planilha:
+            diretorio = self._diretorio_para(caminho_planilha)
+        else:
+            return 0
+
+        if not os.path.isdir(diretorio):
+            return 0
+
+        removidos = 0
+        for nome in os.listdir(diretorio):
+            if nome.endswith((".pkl", ".tmp")):
+                try:
+                    os.remove(os.path.join(diretorio, nome))
+                    removidos += 1
+                except OSError as e:
+                    logger.warning(f"Erro ao remover {nome}: {e}")
+
+        logger.info(f"Cache limpo: {removidos} entradas removidas")
+        return removidos
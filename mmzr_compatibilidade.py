@@ -16,11 +16,16 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Union, Any
 import logging
 import json
+import zipfile
+import xml.etree.ElementTree as ET
 
-# Configuração de logging
-logging.basicConfig(level=logging.INFO)
+# Configuração de logging (o formato é definido por quem executa o programa;
+# importar este módulo não deve alterá-lo)
 logger = logging.getLogger(__name__)
 
+# Propriedade MAPI com o Content-ID de um anexo (PR_ATTACH_CONTENT_ID, PT_UNICODE)
+PR_ATTACH_CONTENT_ID = "http://schemas.microsoft.com/mapi/proptag/0x3712001F"
+
 
 class MMZRCompatibilidade:
     """
@@ -30,6 +35,9 @@ class MMZRCompatibilidade:
     sistema operacional, como caminhos de arquivos e envio de emails.
     """
     
+    # Nomes de abas já consultados: (caminho, tamanho, mtime) -> lista de abas
+    _abas_por_arquivo: Dict[Tuple[str, int, int], List[str]] = {}
+    
     @staticmethod
     def get_os_info() -> Dict[str, str]:
         """
@@ -267,6 +275,56 @@ class MMZRCompatibilidade:
             logger.error(f"Erro na detecção automática de planilhas: {e}")
             return "", ""
     
+    @staticmethod
+    def get_file_fingerprint(file_path: str) -> Tuple[str, int, int]:
+        """
+        Retorna a assinatura rápida de um arquivo (caminho absoluto, tamanho, mtime).
+        
+        Args:
+            file_path (str): Caminho do arquivo
+            
+        Returns:
+            Tuple[str, int, int]: Assinatura do arquivo
+        """
+        caminho_abs = os.path.abspath(file_path)
+        stat = os.stat(caminho_abs)
+        return caminho_abs, stat.st_size, stat.st_mtime_ns
+    
+    @staticmethod
+    def _listar_abas(file_path: str) -> List[str]:
+        """
+        Lista as abas de uma planilha sem interpretar o conteúdo das células.
+        
+        Para .xlsx/.xlsm lê apenas a entrada xl/workbook.xml do contêiner zip;
+        para outros formatos (.xls) recorre ao pandas. O resultado é memorizado
+        pela assinatura do arquivo.
+        
+        Args:
+            file_path (str): Caminho para o arquivo Excel
+            
+        Returns:
+            List[str]: Nomes das abas na ordem do arquivo
+        """
+        assinatura = MMZRCompatibilidade.get_file_fingerprint(file_path)
+        abas = MMZRCompatibilidade._abas_por_arquivo.get(assinatura)
+        if abas is not None:
+            return abas
+        
+        if zipfile.is_zipfile(file_path):
+            abas = []
+            with zipfile.ZipFile(file_path) as pacote:
+                with pacote.open("xl/workbook.xml") as workbook_xml:
+                    for _, elemento in ET.iterparse(workbook_xml, events=("end",)):
+                        if elemento.tag.rsplit("}", 1)[-1] == "sheet":
+                            abas.append(elemento.get("name"))
+                        elemento.clear()
+        else:
+            # Formato binário antigo (.xls): sem atalho, usar o leitor do pandas
+            abas = list(pd.ExcelFile(file_path).sheet_names)
+        
+        MMZRCompatibilidade._abas_por_arquivo[assinatura] = abas
+        return abas
+    
     @staticmethod
     def _validar_abas(file_path: str, abas_necessarias: List[str]) -> bool:
         """
@@ -280,9 +338,7 @@ class MMZRCompatibilidade:
             bool: True se todas as abas necessárias existem
         """
         try:
-            import pandas as pd
-            excel_file = pd.ExcelFile(file_path)
-            sheet_names = excel_file.sheet_names
+            sheet_names = MMZRCompatibilidade._listar_abas(file_path)
             
             for aba in abas_necessarias:
                 if aba not in sheet_names:
@@ -293,7 +349,22 @@ class MMZRCompatibilidade:
             return False
     
     @staticmethod
-    def enviar_email(destinatario: str, assunto: str, caminho_html: str, anexos: Optional[List[str]] = None) -> bool:
+    def preparar_thread_email() -> None:
+        """
+        Prepara a thread atual para criar emails no Outlook.
+        
+        A automação do Outlook (COM) precisa ser inicializada em cada thread
+        que a usa, além da principal. Fora do Windows não faz nada.
+        """
+        try:
+            import pythoncom
+            pythoncom.CoInitialize()
+        except ImportError:
+            pass
+    
+    @staticmethod
+    def enviar_email(destinatario: str, assunto: str, caminho_html: str, anexos: Optional[List[str]] = None,
+                     imagens_cid: Optional[Dict[str, str]] = None) -> bool:
         """
         Envia um email usando o Outlook (Windows) ou exibe uma mensagem (macOS).
         
@@ -302,6 +373,8 @@ class MMZRCompatibilidade:
             assunto (str): Assunto do email
             caminho_html (str): Caminho para o arquivo HTML do relatório
             anexos (Optional[List[str]]): Lista de caminhos para arquivos a serem anexados
+            imagens_cid (Optional[Dict[str, str]]): Content-ID -> caminho das imagens
+                referenciadas no HTML por ``cid:`` (ex.: logo no modo "cid")
         
         Returns:
             bool: True se o email foi enviado, False caso contrário
@@ -326,11 +399,11 @@ class MMZRCompatibilidade:
             
             if sistema == "Windows":
                 return MMZRCompatibilidade._enviar_email_windows(
-                    destinatario, assunto, html_content, anexos
+                    destinatario, assunto, html_content, anexos, imagens_cid
                 )
             else:
                 return MMZRCompatibilidade._simular_envio_email(
-                    destinatario, assunto, caminho_html
+                    destinatario, assunto, caminho_html, imagens_cid
                 )
                 
         except Exception as e:
@@ -338,7 +411,8 @@ class MMZRCompatibilidade:
             return False
     
     @staticmethod
-    def _enviar_email_windows(destinatario: str, assunto: str, html_content: str, anexos: Optional[List[str]]) -> bool:
+    def _enviar_email_windows(destinatario: str, assunto: str, html_content: str, anexos: Optional[List[str]],
+                              imagens_cid: Optional[Dict[str, str]] = None) -> bool:
         """
         Cria email como rascunho no Outlook (Windows) para o usuário revisar e enviar.
         
@@ -347,6 +421,7 @@ class MMZRCompatibilidade:
             assunto (str): Assunto do email
             html_content (str): Conteúdo HTML do email
             anexos (Optional[List[str]]): Lista de anexos
+            imagens_cid (Optional[Dict[str, str]]): Content-ID -> caminho das imagens embutidas
             
         Returns:
             bool: True se o rascunho foi criado com sucesso
@@ -372,6 +447,14 @@ class MMZRCompatibilidade:
                         mail.Attachments.Add(anexo)
                         logger.info(f"Anexo adicionado: {anexo}")
             
+            # Imagens referenciadas por cid: (anexo com PR_ATTACH_CONTENT_ID)
+            if imagens_cid:
+                for content_id, caminho_imagem in imagens_cid.items():
+                    if os.path.exists(caminho_imagem):
+                        imagem = mail.Attachments.Add(caminho_imagem)
+                        imagem.PropertyAccessor.SetProperty(PR_ATTACH_CONTENT_ID, content_id)
+                        logger.info(f"Imagem embutida adicionada: {caminho_imagem} (cid:{content_id})")
+            
             # Salvar como rascunho ao invés de enviar
             mail.Save()
             
@@ -395,7 +478,8 @@ class MMZRCompatibilidade:
             return False
     
     @staticmethod
-    def _simular_envio_email(destinatario: str, assunto: str, caminho_html: str) -> bool:
+    def _simular_envio_email(destinatario: str, assunto: str, caminho_html: str,
+                             imagens_cid: Optional[Dict[str, str]] = None) -> bool:
         """
         Simula o envio de email em sistemas não-Windows.
         
@@ -403,6 +487,7 @@ class MMZRCompatibilidade:
             destinatario (str): Email do destinatário
             assunto (str): Assunto do email
             caminho_html (str): Caminho do arquivo HTML
+            imagens_cid (Optional[Dict[str, str]]): Content-ID -> caminho das imagens embutidas
             
         Returns:
             bool: Sempre True (simulação)
@@ -410,6 +495,8 @@ class MMZRCompatibilidade:
         logger.info(f"[SIMULAÇÃO] Email enviado para {destinatario}")
         logger.info(f"  Assunto: {assunto}")
         logger.info(f"  Arquivo HTML: {caminho_html}")
+        for content_id, caminho_imagem in (imagens_cid or {}).items():
+            logger.info(f"  Imagem embutida: {caminho_imagem} (cid:{content_id})")
         return True
     
     @staticmethod
@@ -482,4 +569,5 @@ class MMZRCompatibilidade:
 
 # Executar o teste quando o arquivo for executado diretamente
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     MMZRCompatibilidade.testar_compatibilidade() 
\ No newline at end of file
@@ -0,0 +1,530 @@
+"""
+MMZR Family Office - Conjunto de Dados
+
+Este módulo concentra a leitura das planilhas do sistema em um único objeto,
+MMZRDataset, que monta uma só vez o cadastro de clientes (Base Clientes +
+Base Consolidada, com emails de fallback) e a tabela de rentabilidade. O mesmo
+objeto é repassado à listagem de clientes, à geração dos relatórios e a
+qualquer outro ponto de entrada que precise das planilhas.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import os
+import math
+import hashlib
+import logging
+import zipfile
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from mmzr_apresentacao import apresentar_rentabilidade
+from mmzr_cache import MMZRCache
+from mmzr_compatibilidade import MMZRCompatibilidade
+from mmzr_schema import (
+    EsquemaAba,
+    ESQUEMA_BASE_CLIENTES,
+    ESQUEMA_BASE_CONSOLIDADA,
+    ESQUEMA_RENTABILIDADE,
+    MAXIMO_LINHAS_LOG,
+)
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+
+def email_ficticio(nome: str) -> str:
+    """
+    Cria o email de fallback usado para clientes sem email cadastrado.
+
+    Args:
+        nome (str): Nome do cliente
+
+    Returns:
+        str: Email no formato nome.sobrenome@example.com
+    """
+    return f"{nome.lower().replace(' ', '.')}@example.com"
+
+
+def normalizar_nome_cliente(nome: str) -> str:
+    """
+    Normaliza o nome de um cliente para comparações estáveis.
+
+    Remove acentos e espaços extras e ignora maiúsculas, de modo que
+    "João  da Silva " e "joao da silva" resultam no mesmo texto.
+
+    Args:
+        nome (str): Nome do cliente
+
+    Returns:
+        str: Nome normalizado
+    """
+    sem_acentos = unicodedata.normalize('NFKD', str(nome))
+    sem_acentos = "".join(c for c in sem_acentos if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def shard_do_cliente(nome: str, total: int) -> int:
+    """
+    Shard (1 a ``total``) ao qual um cliente pertence.
+
+    Usa um hash estável (SHA-1) do nome normalizado, e não ``hash()``, que
+    muda a cada execução do Python: o mesmo cliente cai sempre no mesmo
+    shard, em qualquer máquina.
+
+    Args:
+        nome (str): Nome do cliente
+        total (int): Quantidade de shards
+
+    Returns:
+        int: Número do shard, de 1 a ``total``
+    """
+    digest = hashlib.sha1(normalizar_nome_cliente(nome).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % total + 1
+
+
+def iterar_rentabilidade(caminho: str, esquema: EsquemaAba = ESQUEMA_RENTABILIDADE) -> Iterator[Dict[str, Any]]:
+    """
+    Lê a primeira aba da planilha de rentabilidade linha a linha, em memória constante.
+
+    Usa o modo ``read_only`` do openpyxl, que decodifica o XML da aba à medida
+    que as linhas são consumidas. Cada linha vira um registro compacto contendo
+    apenas as colunas do esquema, com os mesmos valores que a leitura normal
+    (``pd.read_excel`` + ``EsquemaAba.converter``) produziria: as colunas
+    numéricas viram float, com NaN para células vazias ou não numéricas; nas
+    demais colunas as células vazias viram None.
+
+    Args:
+        caminho (str): Caminho da planilha de rentabilidade (.xlsx/.xlsm)
+        esquema (EsquemaAba): Colunas a extrair de cada linha
+
+    Yields:
+        Dict[str, Any]: Registro de uma carteira (coluna -> valor)
+
+    Raises:
+        ValueError: Se faltar alguma coluna obrigatória do esquema
+    """
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = workbook.worksheets[0].iter_rows(values_only=True)
+        cabecalho = next(linhas, None) or ()
+
+        posicoes = {coluna: i for i, coluna in enumerate(cabecalho) if coluna in esquema.colunas}
+        faltantes = [coluna for coluna in esquema.obrigatorias if coluna not in posicoes]
+        if faltantes:
+            raise ValueError(f"Colunas obrigatórias ausentes na aba '{esquema.nome}': {', '.join(faltantes)}")
+
+        numericas = set(esquema.numericas)
+        campos = [(coluna, i, coluna in numericas) for coluna, i in posicoes.items()]
+        invalidas: Dict[str, List[int]] = {}
+
+        for numero_linha, linha in enumerate(linhas, 2):
+            if linha is None or all(valor is None for valor in linha):
+                continue
+            registro = {}
+            for coluna, i, converter in campos:
+                valor = linha[i] if i < len(linha) else None
+                if converter:
+                    numero = _converter_numero(valor)
+                    if math.isnan(numero) and valor is not None:
+                        invalidas.setdefault(coluna, []).append(numero_linha)
+                    valor = numero
+                registro[coluna] = valor
+            yield registro
+
+        for coluna, numeros in invalidas.items():
+            logger.warning(f"Aba '{esquema.nome}', coluna '{coluna}': {len(numeros)} valores não numéricos "
+                           f"ignorados (linhas {', '.join(map(str, numeros[:MAXIMO_LINHAS_LOG]))}"
+                           f"{'...' if len(numeros) > MAXIMO_LINHAS_LOG else ''})")
+    finally:
+        workbook.close()
+
+
+def _converter_numero(valor: Any) -> float:
+    """Converte uma célula como ``pd.to_numeric(errors='coerce')``: vazio ou texto inválido vira NaN."""
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    if isinstance(valor, str):
+        try:
+            return float(valor.strip())
+        except ValueError:
+            pass
+    return float('nan')
+
+
+def _ler_aba_em_processo(caminho: str, aba: str, esquema: Optional[EsquemaAba], usar_cache: bool) -> pd.DataFrame:
+    """
+    Lê uma aba em um processo auxiliar do pool de carregamento.
+
+    Função de módulo (e não método) para poder ser enviada a outro processo.
+    A entrada de cache em disco é gravada pelo próprio processo auxiliar.
+
+    Args:
+        caminho (str): Caminho da planilha
+        aba (str): Nome da aba
+        esquema (Optional[EsquemaAba]): Colunas/tipos a carregar
+        usar_cache (bool): Se False, o cache em disco não é consultado nem gravado
+
+    Returns:
+        pd.DataFrame: Conteúdo da aba
+    """
+    return MMZRCache(habilitado=usar_cache).ler_aba(caminho, aba, esquema=esquema)
+
+
+class MMZRDataset:
+    """
+    Dados das planilhas carregados uma única vez e compartilhados entre etapas.
+
+    As abas são lidas sob demanda (através do MMZRCache) e memorizadas no
+    próprio objeto, de forma que listar clientes e gerar relatórios na mesma
+    sessão não releia nem reprocesse nenhuma planilha.
+
+    Attributes:
+        planilha_base (str): Caminho da planilha com Base Clientes/Base Consolidada
+        planilha_rentabilidade (str): Caminho da planilha de rentabilidade
+        cache (MMZRCache): Cache em disco usado nas leituras
+    """
+
+    def __init__(self, planilha_base: str, planilha_rentabilidade: Optional[str] = None,
+                 usar_cache: bool = True) -> None:
+        """
+        Inicializa o conjunto de dados sem ler nenhuma planilha.
+
+        Args:
+            planilha_base (str): Caminho da planilha base
+            planilha_rentabilidade (Optional[str]): Caminho da planilha de rentabilidade
+            usar_cache (bool): Se False, as abas são sempre relidas do Excel
+        """
+        self.planilha_base = planilha_base
+        self.planilha_rentabilidade = planilha_rentabilidade
+        self.cache = MMZRCache(habilitado=usar_cache)
+        self._abas: Dict[Tuple[str, str, Optional[str]], pd.DataFrame] = {}
+        self._nomes_abas: Dict[str, List[str]] = {}
+
+    @classmethod
+    def carregar(cls, planilha_base: Optional[str] = None, planilha_rentabilidade: Optional[str] = None,
+                 usar_cache: bool = True, carregar_rentabilidade: bool = True,
+                 paralelo: bool = True) -> "MMZRDataset":
+        """
+        Localiza as planilhas (se não informadas) e carrega clientes e rentabilidade.
+
+        Args:
+            planilha_base (Optional[str]): Caminho da planilha base
+            planilha_rentabilidade (Optional[str]): Caminho da planilha de rentabilidade
+            usar_cache (bool): Se False, as abas são sempre relidas do Excel
+            carregar_rentabilidade (bool): Se False, a rentabilidade fica para ser
+                lida sob demanda (ex.: em modo streaming)
+            paralelo (bool): Se True, as abas ausentes do cache são lidas ao
+                mesmo tempo em processos separados
+
+        Returns:
+            MMZRDataset: Conjunto de dados já carregado
+
+        Raises:
+            ValueError: Se a planilha base não tiver a aba 'Base Clientes'
+        """
+        if not planilha_base or not planilha_rentabilidade:
+            planilha_base, planilha_rentabilidade = MMZRCompatibilidade.get_planilhas_path()
+
+        dataset = cls(planilha_base, planilha_rentabilidade, usar_cache)
+        if paralelo:
+            dataset.pre_carregar(dataset._abas_iniciais(carregar_rentabilidade))
+        dataset.clientes
+        if carregar_rentabilidade:
+            dataset.rentabilidade
+        return dataset
+
+    def listar_abas(self, caminho: Optional[str] = None) -> List[str]:
+        """
+        Retorna os nomes das abas de uma planilha (memorizado por arquivo).
+
+        Args:
+            caminho (Optional[str]): Planilha consultada (padrão: planilha base)
+
+        Returns:
+            List[str]: Nomes das abas
+        """
+        caminho = caminho or self.planilha_base
+        chave = os.path.abspath(caminho)
+        if chave not in self._nomes_abas:
+            self._nomes_abas[chave] = self.cache.listar_abas(caminho)
+        return self._nomes_abas[chave]
+
+    @staticmethod
+    def _chave_aba(caminho: str, aba: str, esquema: Optional[EsquemaAba]) -> Tuple[str, str, Optional[str]]:
+        """Chave usada para memorizar uma aba já lida nesta sessão."""
+        return (os.path.abspath(caminho), aba, repr(esquema) if esquema is not None else None)
+
+    def _abas_iniciais(self, carregar_rentabilidade: bool = True) -> List[Tuple[str, str, EsquemaAba]]:
+        """
+        Abas lidas ao montar clientes e (opcionalmente) rentabilidade.
+
+        Args:
+            carregar_rentabilidade (bool): Incluir a primeira aba da planilha de rentabilidade
+
+        Returns:
+            List[Tuple[str, str, EsquemaAba]]: (planilha, aba, esquema) de cada leitura
+        """
+        abas_base = self.listar_abas()
+        abas = [
+            (self.planilha_base, aba, esquema)
+            for aba, esquema in (("Base Clientes", ESQUEMA_BASE_CLIENTES), ("Base Consolidada", ESQUEMA_BASE_CONSOLIDADA))
+            if aba in abas_base
+        ]
+        if carregar_rentabilidade:
+            caminho = self.planilha_rentabilidade or self.planilha_base
+            abas_rentabilidade = self.listar_abas(caminho)
+            if abas_rentabilidade:
+                abas.append((caminho, abas_rentabilidade[0], ESQUEMA_RENTABILIDADE))
+        return abas
+
+    def pre_carregar(self, abas: List[Tuple[str, str, Optional[EsquemaAba]]]) -> None:
+        """
+        Lê várias abas de uma vez, em paralelo quando vale a pena.
+
+        A leitura de uma aba .xlsx é dominada pela descompressão e análise do
+        XML, que não se beneficia de threads. As abas que não estão no cache
+        em disco são distribuídas entre processos auxiliares (uma por
+        processo) e os DataFrames voltam ao processo principal, de forma que
+        o tempo total se aproxima do da aba mais lenta em vez da soma. Abas
+        já em cache são lidas diretamente, sem o custo de criar processos.
+
+        Em caso de falha do pool (ex.: ambiente sem suporte a processos), as
+        abas restantes são lidas sequencialmente pelo caminho normal.
+
+        Args:
+            abas (List[Tuple[str, str, Optional[EsquemaAba]]]): (planilha, aba, esquema)
+        """
+        pendentes = {}
+        for caminho, aba, esquema in abas:
+            chave = self._chave_aba(caminho, aba, esquema)
+            if chave in self._abas or chave in pendentes:
+                continue
+            if self.cache.contem_aba(caminho, aba, esquema=esquema):
+                self._abas[chave] = self.cache.ler_aba(caminho, aba, esquema=esquema)
+            else:
+                pendentes[chave] = (caminho, aba, esquema)
+
+        processos = min(len(pendentes), os.cpu_count() or 1)
+        if processos < 2:
+            return
+
+        try:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                futuros = {
+                    chave: executor.submit(_ler_aba_em_processo, caminho, aba, esquema, self.cache.habilitado)
+                    for chave, (caminho, aba, esquema) in pendentes.items()
+                }
+                for chave, futuro in futuros.items():
+                    self._abas[chave] = futuro.result()
+        except (OSError, RuntimeError) as e:
+            # BrokenProcessPool é subclasse de RuntimeError
+            logger.warning(f"Leitura paralela indisponível, lendo abas sequencialmente: {e}")
+            return
+
+        logger.info(f"{len(pendentes)} abas lidas em paralelo ({processos} processos)")
+
+    def ler_aba(self, aba: str, caminho: Optional[str] = None, esquema: Optional[EsquemaAba] = None) -> pd.DataFrame:
+        """
+        Retorna uma aba como DataFrame, lendo-a no máximo uma vez por sessão.
+
+        O DataFrame devolvido é compartilhado; quem precisar alterá-lo deve
+        trabalhar sobre uma cópia.
+
+        Args:
+            aba (str): Nome da aba
+            caminho (Optional[str]): Planilha consultada (padrão: planilha base)
+            esquema (Optional[EsquemaAba]): Colunas/tipos a carregar (padrão: todas)
+
+        Returns:
+            pd.DataFrame: Conteúdo da aba
+        """
+        caminho = caminho or self.planilha_base
+        chave = self._chave_aba(caminho, aba, esquema)
+        if chave not in self._abas:
+            self._abas[chave] = self.cache.ler_aba(caminho, aba, esquema=esquema)
+        return self._abas[chave]
+
+    @cached_property
+    def clientes(self) -> pd.DataFrame:
+        """
+        Cadastro de carteiras por cliente, com a coluna 'Email cliente' preenchida.
+
+        Returns:
+            pd.DataFrame: Base Clientes combinada com os emails da Base Consolidada
+
+        Raises:
+            ValueError: Se a planilha base não tiver a aba 'Base Clientes'
+        """
+        abas_base = self.listar_abas()
+        if "Base Clientes" not in abas_base:
+            raise ValueError("Aba 'Base Clientes' não encontrada na planilha base")
+
+        df_clientes = self.ler_aba("Base Clientes", esquema=ESQUEMA_BASE_CLIENTES).copy()
+        df_clientes['Nome cliente'] = df_clientes['Nome cliente'].str.strip()
+        df_clientes = df_clientes[df_clientes['Nome cliente'] != 'Nome Cliente']
+
+        # Carregar a aba Base Consolidada para obter os emails
+        if "Base Consolidada" in abas_base:
+            df_consolidada = self.ler_aba("Base Consolidada", esquema=ESQUEMA_BASE_CONSOLIDADA).copy()
+            df_consolidada['NomeCompletoCliente'] = df_consolidada['NomeCompletoCliente'].str.strip()
+
+            df_clientes = df_clientes.merge(
+                df_consolidada,
+                left_on='Nome cliente',
+                right_on='NomeCompletoCliente',
+                how='left'
+            )
+
+            df_clientes['Email cliente'] = df_clientes['EmailCliente']
+
+            # Criar emails fictícios para clientes sem email
+            clientes_sem_email = df_clientes['Email cliente'].isna()
+            if clientes_sem_email.any():
+                df_clientes.loc[clientes_sem_email, 'Email cliente'] = df_clientes.loc[clientes_sem_email, 'Nome cliente'].apply(email_ficticio)
+        else:
+            df_clientes['Email cliente'] = df_clientes['Nome cliente'].apply(email_ficticio)
+
+        logger.info(f"Base de clientes carregada: {len(df_clientes)} carteiras")
+        return df_clientes
+
+    @cached_property
+    def rentabilidade(self) -> pd.DataFrame:
+        """
+        Dados de rentabilidade por carteira (primeira aba da planilha de rentabilidade).
+
+        Returns:
+            pd.DataFrame: Tabela de rentabilidade
+        """
+        caminho = self.planilha_rentabilidade or self.planilha_base
+        primeira_aba = self.listar_abas(caminho)[0]
+        df_rentabilidade = self.ler_aba(primeira_aba, caminho, esquema=ESQUEMA_RENTABILIDADE)
+        logger.info(f"Rentabilidade carregada: {len(df_rentabilidade)} carteiras")
+        return df_rentabilidade
+
+    @cached_property
+    def indice_rentabilidade(self) -> Dict[Any, int]:
+        """
+        Índice código da carteira -> posição da linha na tabela de rentabilidade.
+
+        Construído uma única vez; em códigos repetidos vale a primeira linha
+        (mesmo comportamento do filtro ``.iloc[0]`` usado anteriormente) e as
+        repetições são registradas no log.
+
+        Returns:
+            Dict[Any, int]: Posição (para ``iloc``) de cada código
+        """
+        codigos = self.rentabilidade['Código carteira smart']
+        primeiras = ~codigos.duplicated(keep='first') & codigos.notna()
+        indice = dict(zip(codigos[primeiras].tolist(), primeiras.to_numpy().nonzero()[0].tolist()))
+
+        repetidos = int(codigos.duplicated(keep='first').sum())
+        if repetidos:
+            logger.warning(f"{repetidos} linhas com código de carteira repetido na rentabilidade; usando a primeira ocorrência")
+        return indice
+
+    @cached_property
+    def apresentacao(self) -> pd.DataFrame:
+        """
+        Textos e cores da tabela de performance de todas as carteiras.
+
+        Calculados em bloco uma única vez (ver ``apresentar_rentabilidade``),
+        alinhados linha a linha com ``rentabilidade``.
+
+        Returns:
+            pd.DataFrame: Valores formatados indexados pelo código da carteira
+        """
+        return apresentar_rentabilidade(self.rentabilidade)
+
+    def registro_rentabilidade(self, codigo: Any) -> Optional[pd.Series]:
+        """
+        Retorna a linha de rentabilidade de uma carteira em O(1).
+
+        Args:
+            codigo (Any): Código carteira smart
+
+        Returns:
+            Optional[pd.Series]: Linha da carteira ou None se não houver dados
+        """
+        posicao = self.indice_rentabilidade.get(codigo)
+        if posicao is None:
+            return None
+        return self.rentabilidade.iloc[posicao]
+
+    def iterar_rentabilidade(self) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre a rentabilidade registro a registro.
+
+        Se a tabela já estiver em memória ela é reaproveitada; caso contrário a
+        planilha é lida em modo streaming (ver ``iterar_rentabilidade``). Arquivos
+        .xls, que não são contêineres zip, são carregados normalmente.
+
+        Yields:
+            Dict[str, Any]: Registro de uma carteira (coluna -> valor)
+        """
+        caminho = self.planilha_rentabilidade or self.planilha_base
+        if 'rentabilidade' in self.__dict__ or not zipfile.is_zipfile(caminho):
+            yield from self.rentabilidade.to_dict('records')
+        else:
+            yield from iterar_rentabilidade(caminho)
+
+    @cached_property
+    def clientes_com_rentabilidade(self) -> pd.DataFrame:
+        """
+        Carteiras do cadastro que possuem dados na planilha de rentabilidade.
+
+        Returns:
+            pd.DataFrame: Subconjunto de ``clientes``
+        """
+        codigos_com_rentabilidade = set(self.rentabilidade['Código carteira smart'])
+        return self.clientes[self.clientes['Código carteira smart'].isin(codigos_com_rentabilidade)]
+
+    def filtrar_cliente(self, nome_ou_email: str) -> pd.DataFrame:
+        """
+        Retorna as carteiras de um cliente buscando por nome ou email.
+
+        Args:
+            nome_ou_email (str): Nome completo ou email do cliente
+
+        Returns:
+            pd.DataFrame: Carteiras do cliente (vazio se não encontrado)
+        """
+        nome_ou_email = nome_ou_email.strip()
+        df_clientes = self.clientes
+        return df_clientes[
+            (df_clientes['Nome cliente'] == nome_ou_email) |
+            (df_clientes['Email cliente'] == nome_ou_email)
+        ]
+
+    def filtrar_shard(self, indice: int, total: int, df_clientes: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Retorna as carteiras dos clientes de um shard (ver ``shard_do_cliente``).
+
+        Todas as carteiras de um cliente ficam no mesmo shard, e os shards
+        1..``total`` formam uma partição dos clientes.
+
+        Args:
+            indice (int): Shard desejado, de 1 a ``total``
+            total (int): Quantidade de shards
+            df_clientes (Optional[pd.DataFrame]): Carteiras a filtrar (padrão: todas)
+
+        Returns:
+            pd.DataFrame: Carteiras dos clientes do shard
+
+        Raises:
+            ValueError: Se o shard não estiver entre 1 e ``total``
+        """
+        if total < 1 or not 1 <= indice <= total:
+            raise ValueError(f"Shard inválido: {indice}/{total}")
+        if df_clientes is None:
+            df_clientes = self.clientes
+        nomes = df_clientes['Nome cliente']
+        shards = {nome: shard_do_cliente(nome, total) for nome in nomes.dropna().unique()}
+        return df_clientes[nomes.map(shards) == indice]
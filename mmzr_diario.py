@@ -0,0 +1,219 @@
+"""
+MMZR Family Office - Diário de Execução do Lote
+
+Este módulo mantém um diário (arquivo JSONL, só acrescentado) da execução em
+lote: para cada cliente, registra quando o relatório foi gravado e quando o
+email foi criado, junto com o hash dos dados de entrada. Cada linha é
+gravada e descarregada (flush) assim que a etapa termina, de modo que o
+diário sobrevive a uma interrupção no meio do lote.
+
+Com ``--resume`` a execução seguinte lê o diário e pula os clientes já
+concluídos: relatórios já gravados não são renderizados de novo e, o mais
+importante, emails já criados não são criados outra vez (o envio é
+registrado por cliente, mesmo que os dados mudem antes da retomada). A
+execução retomada usa a data de referência da execução original para os
+hashes, o mês da tabela de performance e o nome dos arquivos.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+NOME_DIARIO = ".mmzr_diario.jsonl"
+
+
+def nome_diario_shard(indice: int, total: int) -> str:
+    """Nome do diário de um shard (ex.: ``.mmzr_diario.1de4.jsonl``)."""
+    return f".mmzr_diario.{indice}de{total}.jsonl"
+
+
+class DiarioExecucao:
+    """
+    Diário de uma execução em lote, com o estado de cada cliente.
+
+    Uso::
+
+        diario = DiarioExecucao.abrir(NOME_DIARIO, retomar=True)
+        if not diario.gerado(nome, assinatura):
+            ...  # gravar o relatório
+            diario.registrar('gerado', nome, assinatura, arquivo=caminho)
+        if not diario.enviado(nome):
+            ...  # criar o email
+            diario.registrar('enviado', nome, assinatura, email=email)
+        diario.fechar()
+
+    Attributes:
+        caminho (str): Arquivo JSONL do diário
+        data_ref (datetime): Data de referência da execução (a original, ao retomar)
+        retomada (bool): Se esta execução continua uma execução anterior
+        retomados (int): Clientes pulados nesta execução por já estarem concluídos
+        concluida (bool): Se o diário lido registra o fim da execução
+    """
+
+    # Incrementar quando o formato das linhas mudar
+    VERSAO_FORMATO = 1
+
+    def __init__(self, caminho: str, data_ref: datetime, retomada: bool = False) -> None:
+        """
+        Inicializa o diário (sem abrir o arquivo; ver ``abrir``).
+
+        Args:
+            caminho (str): Arquivo JSONL do diário
+            data_ref (datetime): Data de referência da execução
+            retomada (bool): Se a execução continua uma anterior
+        """
+        self.caminho = caminho
+        self.data_ref = data_ref
+        self.retomada = retomada
+        self.retomados = 0
+        self.concluida = False
+        # (cliente, hash) -> arquivo gravado
+        self._gerados: Dict[Tuple[str, str], str] = {}
+        # Clientes cujo email já foi criado nesta execução (independe dos dados)
+        self._enviados: Set[str] = set()
+        self._trava = threading.Lock()
+        self._arquivo = None
+
+    @classmethod
+    def abrir(cls, caminho: str = NOME_DIARIO, retomar: bool = False, shard: Optional[str] = None) -> "DiarioExecucao":
+        """
+        Abre o diário de uma nova execução ou, com ``retomar``, o da execução interrompida.
+
+        Sem ``retomar`` (ou sem diário anterior compatível), o diário é
+        recomeçado com a data de referência atual. Um diário cuja execução
+        terminou também é recomeçado: ``--resume`` num agendamento mensal não
+        pode herdar a data nem os emails do mês anterior.
+
+        Args:
+            caminho (str): Arquivo JSONL do diário
+            retomar (bool): Continua a execução registrada no diário existente
+            shard (Optional[str]): Shard da execução ("i/N"), gravado no início
+
+        Returns:
+            DiarioExecucao: Diário aberto para acréscimo
+        """
+        if retomar and os.path.exists(caminho):
+            diario = cls._ler(caminho)
+            if diario is None:
+                logger.warning(f"Diário {caminho} incompatível; iniciando uma nova execução")
+            elif diario.concluida:
+                logger.info(f"A execução de {diario.data_ref:%d/%m/%Y %H:%M} ({caminho}) foi concluída; "
+                            f"iniciando uma nova execução")
+            else:
+                diario._arquivo = open(caminho, 'a', encoding='utf-8')
+                logger.info(f"Retomando a execução de {diario.data_ref:%d/%m/%Y %H:%M} ({caminho})")
+                return diario
+        elif retomar:
+            logger.info(f"Nenhum diário encontrado em {caminho}; iniciando uma nova execução")
+
+        diario = cls(caminho, datetime.now())
+        diario._arquivo = open(caminho, 'w', encoding='utf-8')
+        diario._gravar({'tipo': 'inicio', 'versao_formato': cls.VERSAO_FORMATO,
+                        'data_ref': diario.data_ref.isoformat(), 'shard': shard})
+        return diario
+
+    @classmethod
+    def _ler(cls, caminho: str) -> Optional["DiarioExecucao"]:
+        """Reconstrói o estado a partir do diário; ignora uma última linha incompleta."""
+        diario = None
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for numero, linha in enumerate(f, 1):
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    # Linha cortada por uma interrupção durante a gravação
+                    logger.warning(f"Linha {numero} do diário ignorada (incompleta)")
+                    continue
+                if registro.get('tipo') == 'inicio':
+                    if registro.get('versao_formato') != cls.VERSAO_FORMATO:
+                        return None
+                    diario = cls(caminho, datetime.fromisoformat(registro['data_ref']), retomada=True)
+                elif diario is not None:
+                    diario._aplicar(registro)
+        return diario
+
+    def _aplicar(self, registro: Dict[str, Any]) -> None:
+        """Atualiza o estado em memória com uma linha do diário."""
+        if registro.get('tipo') == 'gerado':
+            self._gerados[(registro.get('cliente'), registro.get('hash'))] = registro.get('arquivo')
+        elif registro.get('tipo') == 'enviado':
+            self._enviados.add(registro.get('cliente'))
+        elif registro.get('tipo') == 'fim':
+            self.concluida = True
+
+    def _gravar(self, registro: Dict[str, Any]) -> None:
+        """Acrescenta uma linha ao diário e a descarrega no arquivo."""
+        with self._trava:
+            self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._arquivo.flush()
+
+    def gerado(self, nome_cliente: str, assinatura: str) -> Optional[str]:
+        """
+        Arquivo já gravado para o cliente com esses dados, se ainda existir.
+
+        Args:
+            nome_cliente (str): Nome do cliente
+            assinatura (str): Hash dos dados de entrada (MMZRManifesto.assinatura)
+
+        Returns:
+            Optional[str]: Caminho do relatório gravado, ou None
+        """
+        arquivo = self._gerados.get((nome_cliente, assinatura))
+        if arquivo and os.path.exists(arquivo) and os.path.getsize(arquivo) > 0:
+            return arquivo
+        return None
+
+    def enviado(self, nome_cliente: str) -> bool:
+        """
+        Indica se o email do cliente já foi criado nesta execução.
+
+        Ao contrário de ``gerado``, não depende dos dados: se a planilha for
+        corrigida entre a interrupção e a retomada, o relatório é regravado,
+        mas o cliente não recebe um segundo email.
+
+        Args:
+            nome_cliente (str): Nome do cliente
+
+        Returns:
+            bool: True se o envio já está registrado no diário
+        """
+        return nome_cliente in self._enviados
+
+    def registrar(self, tipo: str, nome_cliente: str, assinatura: str, **detalhes: Any) -> None:
+        """
+        Registra a conclusão de uma etapa para um cliente.
+
+        Args:
+            tipo (str): 'gerado', 'enviado' ou 'erro'
+            nome_cliente (str): Nome do cliente
+            assinatura (str): Hash dos dados de entrada
+            **detalhes: Campos adicionais (ex.: arquivo, email, etapa, mensagem)
+        """
+        registro = {'tipo': tipo, 'cliente': nome_cliente, 'hash': assinatura, **detalhes}
+        self._gravar(registro)
+        self._aplicar(registro)
+
+    def fechar(self, concluida: bool = True) -> None:
+        """
+        Fecha o diário.
+
+        Args:
+            concluida (bool): Registra o fim da execução (não registrado quando
+                o lote foi interrompido por um erro)
+        """
+        if self._arquivo is None:
+            return
+        if concluida:
+            self._gravar({'tipo': 'fim', 'data': datetime.now().isoformat(timespec='seconds')})
+        self._arquivo.close()
+        self._arquivo = None
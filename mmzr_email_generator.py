@@ -9,13 +9,21 @@ Versão: 2.0.0
 Data: 2025-01-11
 """
 
+import io
 import os
+import re
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import IO, Callable, Dict, Iterator, List, Optional, Any, Tuple, Union
 import numpy as np
 import pandas as pd
 from datetime import date, datetime, timedelta
-import base64
+from email.message import EmailMessage
+
+from mmzr_ativos import interpretar_ativo
+from mmzr_dataset import MMZRDataset
+from mmzr_logo import CONTENT_ID_LOGO, MODOS_LOGO, Logo, carregar_logo
+from mmzr_modelos import DadosCarteira, LinhaPerformance, RelatorioCarteira, como_carteira
+from mmzr_template import MemoriaSecoes, MMZRTemplate
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -32,53 +40,95 @@ class MMZREmailGenerator:
     Attributes:
         meses_pt (Dict[int, str]): Mapeamento de números dos meses para nomes em português
         logo_base64 (str): Logo convertida em base64 para emails
+        logo (Optional[Logo]): Arquivo da logo (compartilhado no processo)
+        logo_mode (str): "inline" (base64 no HTML) ou "cid" (anexo referenciado)
+        template (MMZRTemplate): Partes fixas do HTML compiladas para este gerador
+        secoes (MemoriaSecoes): Seções iguais para todos os clientes do mês de referência
     """
     
-    def __init__(self) -> None:
-        """Inicializa o gerador de emails com configurações padrão."""
+    def __init__(self, logo_mode: str = "inline", compacto: bool = False) -> None:
+        """
+        Inicializa o gerador de emails com configurações padrão.
+        
+        Args:
+            logo_mode (str): "inline" embute a logo em base64 em cada HTML;
+                "cid" referencia um anexo com Content-ID (ver ``build_mime_message``)
+            compacto (bool): Gera o HTML minificado (sem comentários, espaços
+                entre tags e com estilos abreviados), com a mesma renderização
+            
+        Raises:
+            ValueError: Se o modo da logo for inválido
+        """
+        if logo_mode not in MODOS_LOGO:
+            raise ValueError(f"Modo de logo inválido: {logo_mode} (use {' ou '.join(MODOS_LOGO)})")
+        
         self.meses_pt: Dict[int, str] = {
             1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril',
             5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
             9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
         }
+        # Nomes dos meses em minúsculas, para localizar o período mensal na tabela de performance
+        self._padrao_meses = re.compile("|".join(re.escape(m.lower()) for m in self.meses_pt.values()))
+        self.logo_mode = logo_mode
         self.logo_base64 = self._load_logo_as_base64()
+        if logo_mode == "cid" and self.logo is not None:
+            self.template = MMZRTemplate.para_logo(self.logo.src_cid, compacto)
+        else:
+            self.template = MMZRTemplate.para_logo(self.logo_base64, compacto)
+        self.secoes = MemoriaSecoes()
         logger.info("MMZREmailGenerator inicializado com sucesso")
     
     def _load_logo_as_base64(self) -> str:
         """
         Carrega a logo e converte para base64 para uso em emails.
         
+        A conversão é feita uma única vez por processo (ver ``carregar_logo``)
+        e reaproveitada por todos os geradores enquanto o arquivo não mudar.
+        
         Returns:
             str: Logo convertida em base64 ou string vazia se não encontrar
         """
-        logo_paths = [
-            "documentos/img/logo-MMZR-azul.png",
-            "documentos/img/LogoAzul_MMZR.jpg"
-        ]
+        self.logo = carregar_logo()
+        if self.logo is None:
+            logger.warning("Nenhuma logo encontrada. Emails serão gerados sem logo.")
+            return ""
+        return self.logo.data_uri
+    
+    def build_mime_message(self, html_content: str, destinatario: str, assunto: str,
+                           remetente: Optional[str] = None) -> EmailMessage:
+        """
+        Monta a mensagem MIME de um relatório.
         
-        for logo_path in logo_paths:
-            try:
-                if os.path.exists(logo_path):
-                    with open(logo_path, "rb") as image_file:
-                        base64_string = base64.b64encode(image_file.read()).decode('utf-8')
-                        
-                        # Determinar o tipo MIME baseado na extensão
-                        if logo_path.lower().endswith('.png'):
-                            mime_type = 'image/png'
-                        elif logo_path.lower().endswith('.jpg') or logo_path.lower().endswith('.jpeg'):
-                            mime_type = 'image/jpeg'
-                        else:
-                            mime_type = 'image/png'  # default
-                        
-                        logger.info(f"Logo carregada e convertida para base64: {logo_path}")
-                        return f"data:{mime_type};base64,{base64_string}"
-                        
-            except Exception as e:
-                logger.warning(f"Erro ao carregar logo {logo_path}: {e}")
-                continue
+        No modo ``logo_mode="cid"`` a logo é anexada uma única vez à mensagem
+        (multipart/related) com o Content-ID referenciado pelo HTML; no modo
+        ``inline`` a mensagem contém apenas o HTML, com a logo embutida.
         
-        logger.warning("Nenhuma logo encontrada. Emails serão gerados sem logo.")
-        return ""
+        Args:
+            html_content (str): HTML do relatório
+            destinatario (str): Email do destinatário
+            assunto (str): Assunto do email
+            remetente (Optional[str]): Email do remetente
+            
+        Returns:
+            EmailMessage: Mensagem pronta para envio (ex.: ``smtplib.SMTP.send_message``)
+        """
+        mensagem = EmailMessage()
+        if remetente:
+            mensagem['From'] = remetente
+        mensagem['To'] = destinatario
+        mensagem['Subject'] = assunto
+        mensagem.set_content(html_content, subtype='html')
+        
+        if self.logo_mode == "cid" and self.logo is not None:
+            maintype, subtype = self.logo.mime_type.split('/', 1)
+            mensagem.add_related(
+                self.logo.conteudo,
+                maintype=maintype,
+                subtype=subtype,
+                cid=f"<{CONTENT_ID_LOGO}>",
+                filename=os.path.basename(self.logo.caminho),
+            )
+        return mensagem
     
     def load_excel_data(self, filepath: str) -> Optional[pd.ExcelFile]:
         """
@@ -107,12 +157,47 @@ class MMZREmailGenerator:
             logger.error(f"Erro ao carregar arquivo {filepath}: {e}")
             return None
     
-    def extract_performance_data(self, df: pd.DataFrame) -> List[Dict[str, Union[str, float]]]:
+    def indexar_ancoras(self, df: pd.DataFrame) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Localiza de uma só vez as células-âncora usadas pelos métodos extract_*.
+        
+        As células são convertidas uma única vez em textos (células vazias viram
+        "") e cada palavra-chave é procurada de forma vetorizada. Os textos
+        ficam como objetos Python: um array de largura fixa reservaria, para
+        cada célula, o espaço do texto mais longo da planilha (ex.: um
+        comentário extenso). As posições de cada âncora vêm na mesma ordem da
+        varredura linha a linha (linha, depois coluna). Para ler várias seções
+        da mesma aba, calcule o índice uma vez e passe-o a cada extract_*.
+        
+        Args:
+            df (pd.DataFrame): DataFrame contendo os dados financeiros
+            
+        Returns:
+            Dict[str, List[Tuple[int, int]]]: Posições (linha, coluna) por tipo de âncora:
+                'performance', 'retorno', 'estrategias', 'promotores' e 'detratores'
+        """
+        celulas = pd.Series(df.to_numpy(dtype=object).ravel(), dtype=object)
+        textos = celulas.where(celulas.notna(), "").astype(str)
+        
+        def contem(palavra: str) -> np.ndarray:
+            return textos.str.contains(palavra, regex=False).to_numpy(dtype=bool).reshape(df.shape)
+        
+        mascaras = {
+            'performance': contem('Performance'),
+            'retorno': contem('Retorno') & ~contem('Período'),
+            'estrategias': contem('Estratégias de Destaque') | contem('Destaques'),
+            'promotores': contem('Promotores'),
+            'detratores': contem('Detratores'),
+        }
+        return {chave: [(int(i), int(j)) for i, j in np.argwhere(mascara)] for chave, mascara in mascaras.items()}
+    
+    def extract_performance_data(self, df: pd.DataFrame, ancoras: Optional[Dict[str, List[Tuple[int, int]]]] = None) -> List[Dict[str, Union[str, float]]]:
         """
         Extrai dados de performance do DataFrame (apenas Mês atual e No ano).
         
         Args:
             df (pd.DataFrame): DataFrame contendo os dados financeiros
+            ancoras (Optional[Dict]): Índice de âncoras já calculado (ver indexar_ancoras)
             
         Returns:
             List[Dict[str, Union[str, float]]]: Lista com dados de performance
@@ -123,47 +208,46 @@ class MMZREmailGenerator:
         performance_data: List[Dict[str, Union[str, float]]] = []
         
         try:
-            # Procurar pela palavra "Performance" no DataFrame
-            for i in range(len(df)):
-                for j in range(len(df.columns)):
-                    cell_value = str(df.iloc[i, j])
-                    if 'Performance' in cell_value:
-                        # Encontrou a seção de performance
-                        start_row = i + 2
+            # Percorrer as células que contêm "Performance"
+            if ancoras is None:
+                ancoras = self.indexar_ancoras(df)
+            for i, j in ancoras['performance']:
+                # Encontrou a seção de performance
+                start_row = i + 2
+                
+                # Extrair dados das próximas linhas
+                for k in range(start_row, min(start_row + 5, len(df))):
+                    row = df.iloc[k]
+                    if pd.notna(row.iloc[0]):
+                        periodo = str(row.iloc[0]).lower()
                         
-                        # Extrair dados das próximas linhas
-                        for k in range(start_row, min(start_row + 5, len(df))):
-                            row = df.iloc[k]
-                            if pd.notna(row.iloc[0]):
-                                periodo = str(row.iloc[0]).lower()
-                                
-                                # Filtrar apenas "Mês atual" e "No ano"
-                                if "mês" in periodo or "mes" in periodo:
-                                    mes_atual = self.meses_pt[datetime.now().month]
-                                    periodo = f"{mes_atual}:"
-                                elif "ano" in periodo:
-                                    periodo = "No ano:"
-                                else:
-                                    continue
-                                    
-                                try:
-                                    carteira = float(row.iloc[1]) if pd.notna(row.iloc[1]) else 0.0
-                                    benchmark = float(row.iloc[2]) if pd.notna(row.iloc[2]) else 0.0
-                                    diferenca = float(row.iloc[3]) if pd.notna(row.iloc[3]) and len(row) > 3 else carteira - benchmark
-                                    
-                                    performance_data.append({
-                                        'periodo': periodo,
-                                        'carteira': carteira,
-                                        'benchmark': benchmark,
-                                        'diferenca': diferenca
-                                    })
-                                except (ValueError, TypeError) as e:
-                                    logger.warning(f"Erro ao converter valores numéricos: {e}")
-                                    continue
+                        # Filtrar apenas "Mês atual" e "No ano"
+                        if "mês" in periodo or "mes" in periodo:
+                            mes_atual = self.meses_pt[datetime.now().month]
+                            periodo = f"{mes_atual}:"
+                        elif "ano" in periodo:
+                            periodo = "No ano:"
+                        else:
+                            continue
                         
-                        if performance_data:
-                            logger.info(f"Extraídos {len(performance_data)} registros de performance")
-                            return performance_data
+                        try:
+                            carteira = float(row.iloc[1]) if pd.notna(row.iloc[1]) else 0.0
+                            benchmark = float(row.iloc[2]) if pd.notna(row.iloc[2]) else 0.0
+                            diferenca = float(row.iloc[3]) if pd.notna(row.iloc[3]) and len(row) > 3 else carteira - benchmark
+                            
+                            performance_data.append({
+                                'periodo': periodo,
+                                'carteira': carteira,
+                                'benchmark': benchmark,
+                                'diferenca': diferenca
+                            })
+                        except (ValueError, TypeError) as e:
+                            logger.warning(f"Erro ao converter valores numéricos: {e}")
+                            continue
+                
+                if performance_data:
+                    logger.info(f"Extraídos {len(performance_data)} registros de performance")
+                    return performance_data
             
             # Se não encontrou, lançar erro
             error_msg = "Não foi possível encontrar dados de 'Performance' na planilha"
@@ -174,12 +258,13 @@ class MMZREmailGenerator:
             logger.error(f"Erro ao extrair dados de performance: {e}")
             raise
     
-    def extract_financial_return(self, df: pd.DataFrame) -> float:
+    def extract_financial_return(self, df: pd.DataFrame, ancoras: Optional[Dict[str, List[Tuple[int, int]]]] = None) -> float:
         """
         Extrai dados de retorno financeiro do DataFrame.
         
         Args:
             df (pd.DataFrame): DataFrame contendo os dados financeiros
+            ancoras (Optional[Dict]): Índice de âncoras já calculado (ver indexar_ancoras)
             
         Returns:
             float: Valor do retorno financeiro
@@ -188,21 +273,20 @@ class MMZREmailGenerator:
             ValueError: Se não encontrar dados de retorno financeiro
         """
         try:
-            # Procurar pelo termo "Retorno Financeiro"
-            for i in range(len(df)):
-                for j in range(len(df.columns)):
-                    cell_value = str(df.iloc[i, j]) if pd.notna(df.iloc[i, j]) else ""
-                    if ('Retorno Financeiro' in cell_value or 'Retorno' in cell_value) and 'Período' not in cell_value:
-                        # Verificar células adjacentes
-                        for di, dj in [(1, 0), (0, 1)]:  # Abaixo e à direita
-                            ni, nj = i + di, j + dj
-                            if ni < len(df) and nj < len(df.columns) and pd.notna(df.iloc[ni, nj]):
-                                try:
-                                    financial_return = float(df.iloc[ni, nj])
-                                    logger.info(f"Retorno financeiro extraído: {financial_return}")
-                                    return financial_return
-                                except (ValueError, TypeError):
-                                    continue
+            # Percorrer as células com "Retorno" (exceto as de "Período")
+            if ancoras is None:
+                ancoras = self.indexar_ancoras(df)
+            for i, j in ancoras['retorno']:
+                # Verificar células adjacentes
+                for di, dj in [(1, 0), (0, 1)]:  # Abaixo e à direita
+                    ni, nj = i + di, j + dj
+                    if ni < len(df) and nj < len(df.columns) and pd.notna(df.iloc[ni, nj]):
+                        try:
+                            financial_return = float(df.iloc[ni, nj])
+                            logger.info(f"Retorno financeiro extraído: {financial_return}")
+                            return financial_return
+                        except (ValueError, TypeError):
+                            continue
             
             error_msg = "Não foi possível encontrar 'Retorno Financeiro' na planilha"
             logger.error(error_msg)
@@ -212,12 +296,13 @@ class MMZREmailGenerator:
             logger.error(f"Erro ao extrair retorno financeiro: {e}")
             raise
     
-    def extract_highlight_strategies(self, df: pd.DataFrame) -> List[str]:
+    def extract_highlight_strategies(self, df: pd.DataFrame, ancoras: Optional[Dict[str, List[Tuple[int, int]]]] = None) -> List[str]:
         """
         Extrai estratégias de destaque (máximo 2).
         
         Args:
             df (pd.DataFrame): DataFrame contendo os dados financeiros
+            ancoras (Optional[Dict]): Índice de âncoras já calculado (ver indexar_ancoras)
             
         Returns:
             List[str]: Lista com estratégias de destaque (máximo 2)
@@ -228,29 +313,27 @@ class MMZREmailGenerator:
         strategies: List[str] = []
         
         try:
-            # Procurar por "Estratégias de Destaque" ou similar
-            for i in range(len(df)):
-                for j in range(len(df.columns)):
-                    if i < len(df) and j < len(df.columns):
-                        cell_value = str(df.iloc[i, j]) if pd.notna(df.iloc[i, j]) else ""
-                        if 'Estratégias de Destaque' in cell_value or 'Destaques' in cell_value:
-                            # Extrair estratégias das linhas seguintes
-                            start_row = i + 1
-                            
-                            for k in range(start_row, min(start_row + 5, len(df))):
-                                if k < len(df) and len(strategies) < 2:  # Limitar a 2 estratégias
-                                    row = df.iloc[k]
-                                    for l in range(min(len(row), 3)):  # Limitar a 3 colunas para evitar dados não relacionados
-                                        if pd.notna(row.iloc[l]) and str(row.iloc[l]).strip() != '' and len(strategies) < 2:
-                                            strategy = str(row.iloc[l])
-                                            if not any(s.lower() in strategy.lower() for s in ['estratégia', 'destaque', 'promotor', 'detrator']):
-                                                strategies.append(strategy)
-                                                if len(strategies) >= 2:  # Parar ao atingir 2 estratégias
-                                                    break
-                            
-                            if strategies:
-                                logger.info(f"Extraídas {len(strategies)} estratégias de destaque")
-                                return strategies[:2]  # Garantir máximo 2 estratégias
+            # Percorrer as células com "Estratégias de Destaque" ou similar
+            if ancoras is None:
+                ancoras = self.indexar_ancoras(df)
+            for i, j in ancoras['estrategias']:
+                # Extrair estratégias das linhas seguintes
+                start_row = i + 1
+                
+                for k in range(start_row, min(start_row + 5, len(df))):
+                    if k < len(df) and len(strategies) < 2:  # Limitar a 2 estratégias
+                        row = df.iloc[k]
+                        for l in range(min(len(row), 3)):  # Limitar a 3 colunas para evitar dados não relacionados
+                            if pd.notna(row.iloc[l]) and str(row.iloc[l]).strip() != '' and len(strategies) < 2:
+                                strategy = str(row.iloc[l])
+                                if not any(s.lower() in strategy.lower() for s in ['estratégia', 'destaque', 'promotor', 'detrator']):
+                                    strategies.append(strategy)
+                                    if len(strategies) >= 2:  # Parar ao atingir 2 estratégias
+                                        break
+                
+                if strategies:
+                    logger.info(f"Extraídas {len(strategies)} estratégias de destaque")
+                    return strategies[:2]  # Garantir máximo 2 estratégias
             
             # Se não encontrou, lançar erro
             error_msg = "Não foi possível encontrar 'Estratégias de Destaque' na planilha"
@@ -261,12 +344,13 @@ class MMZREmailGenerator:
             logger.error(f"Erro ao extrair estratégias de destaque: {e}")
             raise
     
-    def extract_promoter_assets(self, df: pd.DataFrame) -> List[str]:
+    def extract_promoter_assets(self, df: pd.DataFrame, ancoras: Optional[Dict[str, List[Tuple[int, int]]]] = None) -> List[str]:
         """
         Extrai ativos promotores (apenas os positivos, máximo 2).
         
         Args:
             df (pd.DataFrame): DataFrame contendo os dados financeiros
+            ancoras (Optional[Dict]): Índice de âncoras já calculado (ver indexar_ancoras)
             
         Returns:
             List[str]: Lista com ativos promotores (máximo 2)
@@ -277,40 +361,31 @@ class MMZREmailGenerator:
         assets: List[str] = []
         
         try:
-            # Procurar por "Ativos Promotores" ou similar
-            for i in range(len(df)):
-                for j in range(len(df.columns)):
-                    if i < len(df) and j < len(df.columns):
-                        cell_value = str(df.iloc[i, j]) if pd.notna(df.iloc[i, j]) else ""
-                        if 'Ativos Promotores' in cell_value or 'Promotores' in cell_value:
-                            # Extrair ativos das linhas seguintes
-                            start_row = i + 1
-                            
-                            for k in range(start_row, min(start_row + 10, len(df))):
-                                if k < len(df) and len(assets) < 2:  # Limitar a 2 ativos
-                                    row = df.iloc[k]
-                                    for l in range(min(len(row), 5)):  # Verificar até 5 colunas
-                                        if pd.notna(row.iloc[l]) and str(row.iloc[l]).strip() != '':
-                                            asset = str(row.iloc[l])
-                                            # Verificar se não contém palavras-chave
-                                            if not any(s.lower() in asset.lower() for s in ['ativo', 'promotor', 'detrator', 'estratégia']):
-                                                # Verificar se o ativo tem porcentagem positiva
-                                                import re
-                                                percentage_match = re.search(r'\(([-+]?\d+[.,]?\d*)%\)', asset)
-                                                if percentage_match:
-                                                    percentage_str = percentage_match.group(1).replace(',', '.')
-                                                    try:
-                                                        percentage = float(percentage_str)
-                                                        if percentage > 0:  # Somente incluir se for positivo
-                                                            assets.append(asset)
-                                                            if len(assets) >= 2:  # Limitar a 2 ativos
-                                                                break
-                                                    except ValueError:
-                                                        continue
-                            
-                            if assets:
-                                logger.info(f"Extraídos {len(assets)} ativos promotores")
-                                return assets[:2]  # Garantir máximo de 2 ativos
+            # Percorrer as células com "Ativos Promotores" ou similar
+            if ancoras is None:
+                ancoras = self.indexar_ancoras(df)
+            for i, j in ancoras['promotores']:
+                # Extrair ativos das linhas seguintes
+                start_row = i + 1
+                
+                for k in range(start_row, min(start_row + 10, len(df))):
+                    if k < len(df) and len(assets) < 2:  # Limitar a 2 ativos
+                        row = df.iloc[k]
+                        for l in range(min(len(row), 5)):  # Verificar até 5 colunas
+                            if pd.notna(row.iloc[l]) and str(row.iloc[l]).strip() != '':
+                                asset = str(row.iloc[l])
+                                # Verificar se não contém palavras-chave
+                                if not any(s.lower() in asset.lower() for s in ['ativo', 'promotor', 'detrator', 'estratégia']):
+                                    # Verificar se o ativo tem porcentagem positiva
+                                    percentage = interpretar_ativo(asset).percentual
+                                    if percentage is not None and percentage > 0:  # Somente incluir se for positivo
+                                        assets.append(asset)
+                                        if len(assets) >= 2:  # Limitar a 2 ativos
+                                            break
+                
+                if assets:
+                    logger.info(f"Extraídos {len(assets)} ativos promotores")
+                    return assets[:2]  # Garantir máximo de 2 ativos
             
             # Se não encontrou, lançar erro
             error_msg = "Não foi possível encontrar 'Ativos Promotores' na planilha ou nenhum ativo com rendimento positivo foi encontrado"
@@ -321,12 +396,13 @@ class MMZREmailGenerator:
             logger.error(f"Erro ao extrair ativos promotores: {e}")
             raise
     
-    def extract_detractor_assets(self, df: pd.DataFrame) -> List[str]:
+    def extract_detractor_assets(self, df: pd.DataFrame, ancoras: Optional[Dict[str, List[Tuple[int, int]]]] = None) -> List[str]:
         """
         Extrai ativos detratores (apenas os negativos, máximo 2).
         
         Args:
             df (pd.DataFrame): DataFrame contendo os dados financeiros
+            ancoras (Optional[Dict]): Índice de âncoras já calculado (ver indexar_ancoras)
             
         Returns:
             List[str]: Lista com ativos detratores (máximo 2)
@@ -337,40 +413,31 @@ class MMZREmailGenerator:
         assets: List[str] = []
         
         try:
-            # Procurar por "Ativos Detratores" ou similar
-            for i in range(len(df)):
-                for j in range(len(df.columns)):
-                    if i < len(df) and j < len(df.columns):
-                        cell_value = str(df.iloc[i, j]) if pd.notna(df.iloc[i, j]) else ""
-                        if 'Ativos Detratores' in cell_value or 'Detratores' in cell_value:
-                            # Extrair ativos das linhas seguintes
-                            start_row = i + 1
-                            
-                            for k in range(start_row, min(start_row + 10, len(df))):
-                                if k < len(df) and len(assets) < 2:  # Limitar a 2 ativos
-                                    row = df.iloc[k]
-                                    for l in range(min(len(row), 5)):  # Verificar até 5 colunas
-                                        if pd.notna(row.iloc[l]) and str(row.iloc[l]).strip() != '':
-                                            asset = str(row.iloc[l])
-                                            # Verificar se não contém palavras-chave
-                                            if not any(s.lower() in asset.lower() for s in ['ativo', 'detrator', 'promotor', 'estratégia']):
-                                                # Verificar se o ativo tem porcentagem negativa
-                                                import re
-                                                percentage_match = re.search(r'\(([-+]?\d+[.,]?\d*)%\)', asset)
-                                                if percentage_match:
-                                                    percentage_str = percentage_match.group(1).replace(',', '.')
-                                                    try:
-                                                        percentage = float(percentage_str)
-                                                        if percentage < 0:  # Somente incluir se for negativo
-                                                            assets.append(asset)
-                                                            if len(assets) >= 2:  # Limitar a 2 ativos
-                                                                break
-                                                    except ValueError:
-                                                        continue
-                            
-                            if assets:
-                                logger.info(f"Extraídos {len(assets)} ativos detratores")
-                                return assets[:2]  # Garantir máximo de 2 ativos
+            # Percorrer as células com "Ativos Detratores" ou similar
+            if ancoras is None:
+                ancoras = self.indexar_ancoras(df)
+            for i, j in ancoras['detratores']:
+                # Extrair ativos das linhas seguintes
+                start_row = i + 1
+                
+                for k in range(start_row, min(start_row + 10, len(df))):
+                    if k < len(df) and len(assets) < 2:  # Limitar a 2 ativos
+                        row = df.iloc[k]
+                        for l in range(min(len(row), 5)):  # Verificar até 5 colunas
+                            if pd.notna(row.iloc[l]) and str(row.iloc[l]).strip() != '':
+                                asset = str(row.iloc[l])
+                                # Verificar se não contém palavras-chave
+                                if not any(s.lower() in asset.lower() for s in ['ativo', 'detrator', 'promotor', 'estratégia']):
+                                    # Verificar se o ativo tem porcentagem negativa
+                                    percentage = interpretar_ativo(asset).percentual
+                                    if percentage is not None and percentage < 0:  # Somente incluir se for negativo
+                                        assets.append(asset)
+                                        if len(assets) >= 2:  # Limitar a 2 ativos
+                                            break
+                
+                if assets:
+                    logger.info(f"Extraídos {len(assets)} ativos detratores")
+                    return assets[:2]  # Garantir máximo de 2 ativos
             
             # Se não encontrou, lançar erro
             error_msg = "Não foi possível encontrar 'Ativos Detratores' na planilha ou nenhum ativo com rendimento negativo foi encontrado"
@@ -411,266 +478,207 @@ class MMZREmailGenerator:
         else:
             return f"{value:.2f}%"
     
-    def generate_html_email(self, client_name: str, data_ref: datetime, portfolios_data: List[Dict[str, Any]]) -> str:
+    def generate_html_email(self, client_name: str, data_ref: datetime, portfolios_data: List[DadosCarteira]) -> str:
         """
         Gera o HTML completo do email.
         
         Args:
             client_name (str): Nome do cliente
             data_ref (datetime): Data de referência do relatório
-            portfolios_data (List[Dict[str, Any]]): Dados das carteiras do cliente
+            portfolios_data (List[DadosCarteira]): Carteiras do cliente (registros ou dicionários)
             
         Returns:
             str: HTML completo do email
         """
         try:
-            # Configurar mês/ano
-            mes = self.meses_pt[data_ref.month]
-            ano = data_ref.year
+            return "".join(self._renderizar_email([], client_name, data_ref, portfolios_data))
+        
+        except Exception as e:
+            logger.error(f"Erro ao gerar HTML do email: {e}")
+            return ""
+    
+    def iter_html_email(self, client_name: str, data_ref: datetime, portfolios_data: List[DadosCarteira]) -> Iterator[str]:
+        """
+        Gera o HTML do email em fragmentos, sem montar o documento inteiro.
+        
+        Os fragmentos são produzidos seção a seção (cabeçalho, cada carteira,
+        seções finais); as partes fixas são os próprios objetos do template,
+        sem cópia. Ao contrário de ``generate_html_email``, erros de geração
+        são propagados para quem consome o iterador.
+        
+        Args:
+            client_name (str): Nome do cliente
+            data_ref (datetime): Data de referência do relatório
+            portfolios_data (List[DadosCarteira]): Carteiras do cliente (registros ou dicionários)
             
-            logger.info(f"Gerando HTML para {client_name} - {mes}/{ano}")
+        Yields:
+            str: Fragmentos do HTML, na ordem do documento
+        """
+        for secao in self._secoes_email(client_name, data_ref, portfolios_data):
+            yield from secao
+    
+    def write_html_email(self, sink: IO, client_name: str, data_ref: datetime,
+                         portfolios_data: List[DadosCarteira]) -> int:
+        """
+        Escreve o HTML do email diretamente em um arquivo ou objeto similar.
+        
+        Destinos binários (abertos com "b", BytesIO, sockets) recebem bytes
+        UTF-8, com as partes fixas já pré-codificadas pelo template; destinos
+        de texto recebem str.
+        
+        Args:
+            sink (IO): Destino com método ``write``
+            client_name (str): Nome do cliente
+            data_ref (datetime): Data de referência do relatório
+            portfolios_data (List[DadosCarteira]): Carteiras do cliente (registros ou dicionários)
             
-            # HTML Header
-            html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="color-scheme" content="light">
-    <meta name="supported-color-schemes" content="light">
-    <!--[if mso]>
-    <style type="text/css">
-    body, table, td {{font-family: Arial, Helvetica, sans-serif !important;}}
-    .logo-img {{
-        width: 100px !important;
-        height: 50px !important;
-        max-width: 100px !important;
-        max-height: 50px !important;
-    }}
-    .logo-container {{
-        width: 110px !important;
-        min-width: 110px !important;
-        max-width: 110px !important;
-    }}
-    </style>
-    <![endif]-->
-    <style>
-    /* Estilos para forçar modo claro em dispositivos com tema escuro */
-    :root {{
-        color-scheme: light;
-        supported-color-schemes: light;
-    }}
-    /* CSS responsivo para logo */
-    .logo-container {{
-        width: 110px !important;
-        min-width: 110px !important;
-        max-width: 110px !important;
-    }}
-    .logo-img {{
-        width: 100px !important;
-        height: 50px !important;
-        max-width: 100px !important;
-        max-height: 50px !important;
-        display: block !important;
-        object-fit: contain !important;
-    }}
-    @media only screen and (max-width: 600px) {{
-        .logo-container {{
-            width: 80px !important;
-            min-width: 80px !important;
-            max-width: 80px !important;
-        }}
-        .logo-img {{
-            width: 75px !important;
-            max-width: 75px !important;
-            max-height: 38px !important;
-        }}
-        .header-text {{
-            font-size: 18px !important;
-        }}
-        .header-subtext {{
-            font-size: 12px !important;
-        }}
-    }}
-    @media (prefers-color-scheme: dark) {{
-        body,
-        .body-wrapper {{
-            background-color: #f4f4f4 !important;
-        }}
-        .content-wrapper {{
-            background-color: #ffffff !important;
-            color: #333333 !important;
-        }}
-        .header-bg {{
-            background-color: #0D2035 !important;
-        }}
-        .header-text {{
-            color: #ffffff !important;
-        }}
-        .section-bg {{
-            background-color: #ffffff !important;
-        }}
-        .performance-header {{
-            color: #0D2035 !important;
-            border-bottom-color: #e0e0e0 !important;
-        }}
-        .data-table {{
-            background-color: #ffffff !important;
-        }}
-        .table-header {{
-            background-color: #f8f9fa !important;
-            color: #0D2035 !important;
-        }}
-        .highlight-section {{
-            background-color: #f8f9fa !important;
-        }}
-        .promoters-section {{
-            background-color: #e8f5e9 !important;
-        }}
-        .detractors-section {{
-            background-color: #ffebee !important;
-        }}
-        td, th, p, h1, h2, h3, h4, h5, h6, li {{
-            color: inherit !important;
-        }}
-        .portfolio-header {{
-            background-color: #0D2035 !important;
-            color: #ffffff !important;
-        }}
-    </style>
-</head>
-<body class="body-wrapper" style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Helvetica', 'Arial', sans-serif; line-height: 1.4; color: #333333; background-color: #f4f4f4;">
-    <table role="presentation" style="width: 100%; border-collapse: collapse; border: 0; border-spacing: 0; background: #f4f4f4;">
-        <tr>
-            <td align="center" style="padding: 0;">
-                <table role="presentation" class="content-wrapper" style="width: 100%; max-width: 800px; border-collapse: collapse; border: 0; border-spacing: 0; text-align: left; background: #ffffff; box-shadow: 0 2px 10px rgba(0,0,0,0.1);">
-                    <!-- Header -->
-                    <tr>
-                        <td style="padding: 0;">
-                            <table role="presentation" class="header-bg" style="width: 100%; border-collapse: collapse; background: #0D2035;">
-                                <tr>
-                                    <td style="padding: 10px;">
-                                        <table role="presentation" style="width: 100%; border-collapse: collapse;">
-                                            <tr>
-                                                <td style="width: 110px; max-width: 110px; min-width: 110px; vertical-align: middle;">
-                                                    <table role="presentation" style="width: 110px; max-width: 110px; border-collapse: collapse;">
-                                                        <tr>
-                                                            <td style="width: 110px; max-width: 110px; text-align: left; padding: 3px;">
-                                                                {f'<img src="{self.logo_base64}" alt="MMZR Family Office" width="100" height="50" style="width: 100px !important; height: 50px !important; max-width: 100px !important; max-height: 50px !important; display: block !important; border: 0 !important;" border="0">' if self.logo_base64 else '<div style="width: 100px; height: 50px; display: block; background-color: #ffffff; border: 1px solid #ffffff; border-radius: 4px; display: flex; align-items: center; justify-content: center; color: #0D2035; font-weight: bold; font-size: 12px; text-align: center;">MMZR<br>Family<br>Office</div>'}
-                                                            </td>
-                                                        </tr>
-                                                    </table>
-                                                </td>
-                                                <td style="text-align: left; vertical-align: middle; padding-left: 15px;">
-                                                    <p class="header-text" style="margin: 0; font-size: 21px; color: #ffffff; opacity: 0.9; line-height: 1.2;">MMZR Family Office</p>
-                                                    <p class="header-text header-subtext" style="margin: 0; font-size: 14px; color: #ffffff; opacity: 0.9; line-height: 1.2;">Relatório Mensal de Performance - {mes} de {ano}</p>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                    </td>
-                                </tr>
-                            </table>
-                        </td>
-                    </tr>
-                    
-                    <!-- Content -->
-                    <tr>
-                        <td class="section-bg" style="padding: 20px 20px; background-color: #ffffff;">
-                            <h2 style="font-size: 15px; color: #0D2035; margin-bottom: 12px; margin-top: 0;">Olá {client_name},</h2>
-                            
-                            <p style="margin-top: 0; margin-bottom: 9px; ">Segue o relatório mensal com o desempenho de suas carteiras referente a <strong>{data_ref.strftime('%d/%m/%Y')}</strong>.</p>"""
-        
-            # Adicionar cada carteira
-            for portfolio in portfolios_data:
-                html += self.generate_portfolio_section(portfolio)
-        
-            # Coletar todos os comentários das carteiras
-            comentarios_todos = []
-            for portfolio in portfolios_data:
-                comentario = portfolio.get('comentarios', '')
-                if comentario and comentario.strip():
-                    comentarios_todos.append(comentario.strip())
+        Returns:
+            int: Quantidade de bytes (destino binário) ou caracteres (destino de texto) escritos
+        """
+        binario = isinstance(sink, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(sink, 'mode', '')
+        escritos = 0
+        for secao in self._secoes_email(client_name, data_ref, portfolios_data):
+            if binario:
+                secao = self.template.codificar(secao)
+            for fragmento in secao:
+                sink.write(fragmento)
+                escritos += len(fragmento)
+        return escritos
+    
+    def _renderizar_email(self, saida: List[str], client_name: str, data_ref: datetime,
+                          portfolios_data: List[DadosCarteira]) -> List[str]:
+        """
+        Anexa a ``saida`` os fragmentos do HTML completo do email.
+        
+        Args:
+            saida (List[str]): Lista de fragmentos em construção
+            client_name (str): Nome do cliente
+            data_ref (datetime): Data de referência do relatório
+            portfolios_data (List[DadosCarteira]): Carteiras do cliente (registros ou dicionários)
             
-            # Juntar comentários se houver múltiplos
-            comentario_final = ' | '.join(comentarios_todos) if comentarios_todos else ""
-        
-            # Adicionar seções que faltaram
-            html += self.generate_observacoes_section(comentario_final)
-            html += self.generate_principais_indicadores_section()
-            html += self.generate_botao_carta_section(mes, ano)
-        
-            # Footer
-            html += f"""
-                        </td>
-                    </tr>
-                    
-                    <!-- Footer -->
-                    <tr>
-                        <td style="background-color: #f8f9fa; padding: 12px 20px; text-align: center;">
-                            <p style="margin: 0 0 3px 0; color: #666666; font-size: 11px;">MMZR Family Office | Gestão de Patrimônio</p>
-                            <p style="margin: 0 0 3px 0; color: #666666; font-size: 11px;">Este é um email automático. Por favor, não responda.</p>
-                            <p style="margin: 0; color: #666666; font-size: 11px;">© {ano} MMZR Family Office. Todos os direitos reservados.</p>
-                        </td>
-                    </tr>
-                </table>
-            </td>
-        </tr>
-    </table>
-</body>
-</html>"""
+        Returns:
+            List[str]: A própria lista de saída
+        """
+        for secao in self._secoes_email(client_name, data_ref, portfolios_data):
+            saida += secao
+        return saida
+    
+    def _secoes_email(self, client_name: str, data_ref: datetime,
+                      portfolios_data: List[DadosCarteira]) -> Iterator[List[str]]:
+        """
+        Produz o HTML do email como uma lista de fragmentos por seção.
+        
+        Args:
+            client_name (str): Nome do cliente
+            data_ref (datetime): Data de referência do relatório
+            portfolios_data (List[DadosCarteira]): Carteiras do cliente (registros ou dicionários)
             
-            return html
+        Yields:
+            List[str]: Fragmentos do cabeçalho, de cada carteira e das seções finais
+        """
+        # Configurar mês/ano
+        mes = self.meses_pt[data_ref.month]
+        ano = data_ref.year
         
-        except Exception as e:
-            logger.error(f"Erro ao gerar HTML do email: {e}")
-            return ""
+        logger.info(f"Gerando HTML para {client_name} - {mes}/{ano}")
+        # Passada explicitamente: o gerador é compartilhado entre threads (servidor)
+        referencia = (ano, data_ref.month)
+        
+        # HTML Header
+        yield self.template.cabecalho.renderizar([], mes=mes, ano=ano, nome_cliente=client_name,
+                                                 data=data_ref.strftime('%d/%m/%Y'))
+        
+        # Adicionar cada carteira
+        carteiras = [como_carteira(portfolio) for portfolio in portfolios_data]
+        for carteira in carteiras:
+            yield self._renderizar_carteira([], carteira)
+        
+        # Coletar todos os comentários das carteiras
+        comentarios_todos = []
+        for carteira in carteiras:
+            comentario = carteira.comentarios
+            if comentario and comentario.strip():
+                comentarios_todos.append(comentario.strip())
+        
+        # Juntar comentários se houver múltiplos
+        comentario_final = ' | '.join(comentarios_todos) if comentarios_todos else ""
+        
+        # Adicionar seções que faltaram (as que não dependem do cliente vêm da memória do mês)
+        saida: List[str] = []
+        if comentario_final:
+            self._renderizar_observacoes(saida, comentario_final)
+        else:
+            self._memorizar(saida, referencia, 'observacoes', self._renderizar_observacoes)
+        self._memorizar(saida, referencia, 'principais_indicadores', self._renderizar_principais_indicadores)
+        self._memorizar(saida, referencia, 'botao_carta', self._renderizar_botao_carta, mes, ano)
+        
+        # Footer
+        yield self.template.rodape.renderizar(saida, ano=ano)
     
-    def generate_portfolio_section(self, portfolio: Dict[str, Any]) -> str:
+    def _memorizar(self, saida: List[str], referencia: Tuple[int, int], nome: str,
+                   renderizar: Callable[..., List[str]], *argumentos: Any) -> List[str]:
+        """
+        Anexa a ``saida`` uma seção que não depende do cliente, renderizando-a
+        apenas uma vez por mês de referência e versão do template.
+        
+        Args:
+            saida (List[str]): Lista de fragmentos em construção
+            referencia (Tuple[int, int]): Ano e mês de referência do relatório
+            nome (str): Nome da seção (parte da chave)
+            renderizar (Callable[..., List[str]]): Método ``_renderizar_*`` da seção
+            *argumentos (Any): Argumentos da seção (parte da chave)
+            
+        Returns:
+            List[str]: A própria lista de saída
+        """
+        fragmentos = self.secoes.obter(
+            (referencia, self.template.versao),
+            (nome,) + argumentos,
+            lambda: tuple(renderizar([], *argumentos)),
+        )
+        saida.extend(fragmentos)
+        return saida
+    
+    def generate_portfolio_section(self, portfolio: DadosCarteira) -> str:
         """
         Gera a seção HTML de uma carteira específica.
         
         Args:
-            portfolio (Dict[str, Any]): Dados da carteira
+            portfolio (DadosCarteira): Dados da carteira (registro ou dicionário)
             
         Returns:
             str: HTML da seção da carteira
         """
-        name = portfolio.get('name', 'Carteira')
-        portfolio_type = portfolio.get('type', 'Diversificada')
-        comentarios = portfolio.get('comentarios', '')  # Comentários específicos da carteira
-        data = portfolio.get('data', {})
-        
-        performance_data = data.get('performance', [])
-        retorno_financeiro = data.get('retorno_financeiro', 0)
-        estrategias_destaque = data.get('estrategias_destaque', [])
-        ativos_promotores = data.get('ativos_promotores', [])
-        ativos_detratores = data.get('ativos_detratores', [])
-        
-        html = f"""
-                            <!-- Carteira: {name} -->
-                            <table role="presentation" style="width: 100%; margin: 20px 0 0 0; border: 1px solid #e0e0e0; border-radius: 8px; overflow: hidden; box-shadow: 0 1px 3px rgba(0,0,0,0.1); background-color: #ffffff;">
-                                <tr>
-                                    <td class="header-bg portfolio-header" style="background-color: #0D2035; color: #ffffff; padding: 10px 15px;">
-                                        <h3 style="margin: 0; font-size: 16px; font-weight: 500;">{name} <span style="font-weight: 300; font-size: 13px; margin-left: 8px; opacity: 0.8;">| {portfolio_type}</span></h3>
-                                    </td>
-                                </tr>
-                                <tr>
-                                    <td class="section-bg" style="padding: 15px; background-color: #ffffff;">
-                                        {self.generate_performance_table(performance_data, retorno_financeiro)}
-                                        
-                                        {self.generate_highlight_strategies_section(estrategias_destaque)}
-                                        
-                                        {self.generate_promoter_assets_section(ativos_promotores)}
-                                        
-                                        {self.generate_detractor_assets_section(ativos_detratores)}
-                                    </td>
-                                </tr>
-                            </table>
-"""
-        return html
+        return "".join(self._renderizar_carteira([], como_carteira(portfolio)))
+    
+    def _renderizar_carteira(self, saida: List[str], carteira: RelatorioCarteira) -> List[str]:
+        """Anexa a ``saida`` os fragmentos da seção de uma carteira."""
+        self.template.carteira_inicio.renderizar(saida, nome=carteira.nome, tipo=carteira.tipo)
+        self._renderizar_performance(saida, carteira.performance, carteira.retorno_financeiro, carteira.retorno_formatado)
+        self.template.carteira_separador.renderizar(saida)
+        self._renderizar_lista(saida, self.template.estrategias_inicio, carteira.estrategias_destaque)
+        self.template.carteira_separador.renderizar(saida)
+        self._renderizar_lista(saida, self.template.promotores_inicio, self._rotulos_promotores(carteira.ativos_promotores))
+        self.template.carteira_separador.renderizar(saida)
+        self._renderizar_lista(saida, self.template.detratores_inicio, carteira.ativos_detratores)
+        return self.template.carteira_fim.renderizar(saida)
     
     def generate_performance_table(self, performance_data, retorno_financeiro=None):
         """Gera a tabela HTML de performance, incluindo retorno financeiro"""
+        linhas = [linha if isinstance(linha, LinhaPerformance) else LinhaPerformance.de_dict(linha)
+                  for linha in performance_data]
+        return "".join(self._renderizar_performance([], linhas, retorno_financeiro))
+    
+    def _renderizar_performance(self, saida, performance_data, retorno_financeiro=None, retorno_formatado=None):
+        """
+        Anexa a ``saida`` os fragmentos da tabela de performance.
+        
+        Textos e cores já calculados em bloco (ver ``mmzr_apresentacao``) são
+        usados diretamente: ``LinhaPerformance.formatado`` traz
+        (cor_carteira, carteira, benchmark, cor_diferenca, diferenca) e
+        ``retorno_formatado`` traz (cor, retorno). Sem eles, os valores são
+        formatados aqui.
+        """
         
         # Filtrar apenas os períodos necessários (Mês atual e No ano) sem duplicações
         filtered_data = []
@@ -678,10 +686,10 @@ class MMZREmailGenerator:
         ano_adicionado = False
         
         for item in performance_data:
-            periodo = item['periodo'].lower() if isinstance(item['periodo'], str) else ""
+            periodo = item.periodo.lower() if isinstance(item.periodo, str) else ""
             
             # Verificar se é mês atual
-            if ":" in periodo and any(m.lower() in periodo for m in self.meses_pt.values()) and not mes_adicionado:
+            if ":" in periodo and self._padrao_meses.search(periodo) and not mes_adicionado:
                 filtered_data.append(item)
                 mes_adicionado = True
             # Verificar se é ano atual
@@ -693,205 +701,95 @@ class MMZREmailGenerator:
             if mes_adicionado and ano_adicionado:
                 break
         
-        html = """
-                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 0 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Performance</h4>
-                                        <table role="presentation" class="data-table" style="width: 100%; border-collapse: collapse; font-size: 13px; margin-bottom: 15px; background-color: #ffffff;">
-                                            <thead>
-                                                <tr>
-                                                    <th class="table-header" style="background-color: #f8f9fa; color: #0D2035; font-weight: 600; padding: 8px 6px; text-align: left; border-bottom: 1px solid #dee2e6;">Período</th>
-                                                    <th class="table-header" style="background-color: #f8f9fa; color: #0D2035; font-weight: 600; padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6;">Carteira</th>
-                                                    <th class="table-header" style="background-color: #f8f9fa; color: #0D2035; font-weight: 600; padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6;">Benchmark</th>
-                                                    <th class="table-header" style="background-color: #f8f9fa; color: #0D2035; font-weight: 600; padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6;">Carteira vs. Benchmark</th>
-                                                </tr>
-                                            </thead>
-                                            <tbody>
-"""
+        self.template.performance_inicio.renderizar(saida)
         
         # Adicionar cada linha de performance
         for item in filtered_data:
-            periodo = item['periodo']
-            carteira = item['carteira']
-            benchmark = item['benchmark']
-            diferenca = item['diferenca']
-            
-            # Determinar cores com base nos valores
-            carteira_color = "#28a745" if carteira > 0 else "#dc3545" if carteira < 0 else "#333333"
-            diferenca_color = "#28a745" if diferenca > 0 else "#dc3545" if diferenca < 0 else "#333333"
-            
-            html += f"""
-                                                <tr>
-                                                    <td style="padding: 8px 6px; text-align: left; border-bottom: 1px solid #dee2e6; background-color: #ffffff;">{periodo}</td>
-                                                    <td style="padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6; color: {carteira_color}; font-weight: 500; background-color: #ffffff;">{self.format_percentage(carteira)}</td>
-                                                    <td style="padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6; background-color: #ffffff;">{self.format_percentage(benchmark)}</td>
-                                                    <td style="padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6; color: {diferenca_color}; font-weight: 500; background-color: #ffffff;">{self.format_percentage(diferenca).replace('%', ' p.p.')}</td>
-                                                </tr>
-"""
+            formatado = item.formatado
+            if formatado is None:
+                carteira = item.carteira
+                diferenca = item.diferenca
+                
+                # Determinar cores com base nos valores
+                formatado = (
+                    "#28a745" if carteira > 0 else "#dc3545" if carteira < 0 else "#333333",
+                    self.format_percentage(carteira),
+                    self.format_percentage(item.benchmark),
+                    "#28a745" if diferenca > 0 else "#dc3545" if diferenca < 0 else "#333333",
+                    self.format_percentage(diferenca).replace('%', ' p.p.'),
+                )
+            self.template.performance_linha.renderizar(saida, item.periodo, *formatado)
         
         # Adicionar linha de retorno financeiro se disponível
         if retorno_financeiro is not None:
-            color = "#28a745" if retorno_financeiro > 0 else "#dc3545" if retorno_financeiro < 0 else "#333333"
-            html += f"""
-                                                <tr>
-                                                    <td style="padding: 8px 6px; text-align: left; border-bottom: 1px solid #dee2e6; font-weight: 500; background-color: #ffffff;">Retorno Financeiro:</td>
-                                                    <td style="padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6; color: {color}; font-weight: 500; background-color: #ffffff;" colspan="3">{self.format_currency(retorno_financeiro)}</td>
-                                                </tr>
-"""
+            if retorno_formatado is None:
+                retorno_formatado = (
+                    "#28a745" if retorno_financeiro > 0 else "#dc3545" if retorno_financeiro < 0 else "#333333",
+                    self.format_currency(retorno_financeiro),
+                )
+            self.template.performance_retorno.renderizar(saida, *retorno_formatado)
         
-        html += """
-                                            </tbody>
-                                        </table>
-"""
-        return html
+        return self.template.performance_fim.renderizar(saida)
     
     def generate_financial_return_section(self, retorno_financeiro):
         """Gera a seção de retorno financeiro"""
-        
-        html = f"""
-                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 20px 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Retorno Financeiro</h4>
-                                        <p style="font-size: 15px; margin: 8px 0 15px 0; padding: 10px; background-color: #f8f9fa; border-radius: 5px; text-align: center; font-weight: 500; color: #0D2035;">
-                                            {self.format_currency(retorno_financeiro)}
-                                        </p>
-"""
-        return html
+        return "".join(self.template.retorno_financeiro.renderizar([], retorno=self.format_currency(retorno_financeiro)))
+    
+    def _renderizar_lista(self, saida, inicio, itens):
+        """Anexa a ``saida`` uma seção em lista (título do trecho ``inicio`` e um <li> por item)"""
+        inicio.renderizar(saida)
+        for item in itens:
+            self.template.lista_item.renderizar(saida, item=item)
+        return self.template.lista_fim.renderizar(saida)
+    
+    def _rotulos_promotores(self, ativos):
+        """Rótulos exibidos para os ativos promotores"""
+        # Adicionar o símbolo "+" antes da porcentagem se for um valor positivo
+        return [interpretar_ativo(ativo).rotulo_promotor for ativo in ativos]
     
     def generate_highlight_strategies_section(self, estrategias):
         """Gera a seção de estratégias de destaque"""
-        
-        html = """
-                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 20px 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Estratégias de Destaque</h4>
-                                        <ul class="highlight-section" style="margin: 8px 0 15px 0; padding: 10px 10px 10px 30px; background-color: #f8f9fa; border-radius: 5px; color: #333333;">
-"""
-        
-        for estrategia in estrategias:
-            html += f"""
-                                            <li style="margin-bottom: 6px; font-size: 13px;">{estrategia}</li>
-"""
-        
-        html += """
-                                        </ul>
-"""
-        return html
+        return "".join(self._renderizar_lista([], self.template.estrategias_inicio, estrategias))
     
     def generate_promoter_assets_section(self, ativos):
         """Gera a seção de ativos promotores"""
-        
-        html = """
-                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 20px 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Ativos Promotores</h4>
-                                        <ul class="promoters-section" style="margin: 8px 0 15px 0; padding: 10px 10px 10px 30px; background-color: #e8f5e9; border-radius: 5px; color: #2e7d32;">
-"""
-        
-        for ativo in ativos:
-            # Adicionar o símbolo "+" antes da porcentagem se for um valor positivo
-            import re
-            ativo_formatado = ativo
-            percentage_match = re.search(r'\(([-+]?\d+[.,]?\d*)%\)', ativo)
-            if percentage_match:
-                percentage_str = percentage_match.group(1).replace(',', '.')
-                try:
-                    percentage = float(percentage_str)
-                    if percentage > 0 and not percentage_str.startswith('+'):
-                        # Substituir a porcentagem sem o "+" por uma com o "+"
-                        ativo_formatado = ativo.replace(f"({percentage_str}%)", f"(+{percentage_str}%)")
-                except ValueError:
-                    pass
-                    
-            html += f"""
-                                            <li style="margin-bottom: 6px; font-size: 13px;">{ativo_formatado}</li>
-"""
-        
-        html += """
-                                        </ul>
-"""
-        return html
+        return "".join(self._renderizar_lista([], self.template.promotores_inicio, self._rotulos_promotores(ativos)))
     
     def generate_detractor_assets_section(self, ativos):
         """Gera a seção de ativos detratores"""
-        
-        html = """
-                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 20px 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Ativos Detratores</h4>
-                                        <ul class="detractors-section" style="margin: 8px 0 15px 0; padding: 10px 10px 10px 30px; background-color: #ffebee; border-radius: 5px; color: #c62828;">
-"""
-        
-        for ativo in ativos:
-            html += f"""
-                                            <li style="margin-bottom: 6px; font-size: 13px;">{ativo}</li>
-"""
-        
-        html += """
-                                        </ul>
-"""
-        return html
+        return "".join(self._renderizar_lista([], self.template.detratores_inicio, ativos))
     
     def generate_observacoes_section(self, comentario_adicional: str = "") -> str:
         """Gera a seção de observações incluindo comentário adicional da planilha."""
-        
-        html = """
-                            <!-- Observações finais -->
-                            <table role="presentation" style="width: 100%; margin-top: 20px; border-collapse: collapse; background-color: #f8f9fa; border: 1px solid #e9ecef;">
-                                <tr>
-                                    <td style="padding: 15px;">
-                                        <p style="margin: 0 0 12px 0; color: #555555; font-size: 13px; line-height: 18px;">
-                                            <strong style="font-weight: bold;">Obs.:</strong> Eventuais ajustes retroativos do IPCA, após a divulgação oficial do indicador, podem impactar marginalmente a rentabilidade do portfólio no mês anterior.
-                                        </p>
-                                        <p style="margin: 0; color: #555555; font-size: 12px; font-style: italic; line-height: 16px;">
-                                            <strong style="font-weight: bold;">Obs.:</strong> Conforme solicitado, deixo o Felipe e Fernandito em cópia para também receberem as informações.
-                                        </p>"""
-        
         if comentario_adicional:
-            html += f"""
-                                        <p style="margin: 12px 0 0 0; color: #555555; font-size: 13px; line-height: 18px;">
-                                            <strong style="font-weight: bold;">Comentário:</strong> {comentario_adicional}
-                                        </p>"""
-        
-        html += """
-                                    </td>
-                                </tr>
-                            </table>
-"""
-        return html
+            return "".join(self._renderizar_observacoes([], comentario_adicional))
+        return "".join(self._renderizar_observacoes([]))
+    
+    def _renderizar_observacoes(self, saida: List[str], comentario_adicional: str = "") -> List[str]:
+        """Anexa a ``saida`` os fragmentos da seção de observações."""
+        self.template.observacoes_inicio.renderizar(saida)
+        if comentario_adicional:
+            self.template.observacoes_comentario.renderizar(saida, comentario=comentario_adicional)
+        return self.template.observacoes_fim.renderizar(saida)
     
     def generate_principais_indicadores_section(self) -> str:
         """Gera a seção de principais indicadores."""
-        
-        html = """
-                            <!-- Principais indicadores -->
-                            <table role="presentation" style="width: 100%; margin-top: 15px; border-collapse: collapse; background-color: #f8f9fa; border: 1px solid #e9ecef;">
-                                <tr>
-                                    <td style="padding: 12px;">
-                                        <p style="margin: 0 0 8px 0; font-weight: bold; color: #333333; font-size: 13px; line-height: 16px;">Principais indicadores:</p>
-                                        <p style="margin: 0; color: #555555; font-size: 11px; line-height: 15px;">
-                                            Locais: CDI: +1,06%, Ibovespa: +3,69%, Prefixados (IRF-M): +2,99%, Ativos IPCA (IMA-B): +2,09%, Imobiliários (IFIX): +3,01%, Dólar (Ptax): -1,42%, Multimercados (IHFA): +3,85%<br>
-                                            Internacionais: MSCI AC: +0,77%, S&P 500 -0,76%, Euro Stoxx 600 -1,21%, MSCI China -4,55%, MSCI EM +1,04%, Ouro +5,29%, Petróleo BRENT -14,97%, Minério de ferro -2,68% e Bitcoin (IBIT) +14,31%
-                                        </p>
-                                    </td>
-                                </tr>
-                            </table>
-"""
-        return html
+        return "".join(self._renderizar_principais_indicadores([]))
+    
+    def _renderizar_principais_indicadores(self, saida: List[str]) -> List[str]:
+        """Anexa a ``saida`` a seção de principais indicadores."""
+        return self.template.indicadores.renderizar(saida)
     
     def generate_botao_carta_section(self, mes: str, ano: int) -> str:
         """Gera a seção do botão da carta mensal."""
-        
+        return "".join(self._renderizar_botao_carta([], mes, ano))
+    
+    def _renderizar_botao_carta(self, saida: List[str], mes: str, ano: int) -> List[str]:
+        """Anexa a ``saida`` os fragmentos do botão da carta mensal."""
         mes_lowercase = mes.lower()
         carta_link = f"https://www.mmzrfo.com.br/post/carta-mensal-{mes_lowercase}-{ano}"
         
-        html = f"""
-                            <!-- Link para carta mensal como botão azul -->
-                            <table role="presentation" style="width: 100%; margin-top: 25px; border-collapse: collapse;">
-                                <tr>
-                                    <td align="center" style="padding: 0;">
-                                        <table role="presentation" style="border-collapse: collapse; background-color: #0D2035; border-radius: 4px;">
-                                            <tr>
-                                                <td style="padding: 12px 24px; text-align: center;">
-                                                    <a href="{carta_link}" target="_blank" style="color: #ffffff; text-decoration: none; font-weight: bold; font-size: 14px; line-height: 18px;">Confira nossa carta completa: Carta {mes} {ano}</a>
-                                                </td>
-                                            </tr>
-                                        </table>
-                                    </td>
-                                </tr>
-                            </table>
-"""
-        return html
+        return self.template.botao_carta.renderizar(saida, carta_link=carta_link, mes=mes, ano=ano)
     
     def generate_email_subject(self, data_ref: datetime) -> str:
         """
@@ -904,20 +802,28 @@ class MMZREmailGenerator:
             str: Assunto formatado para o email
         """
         try:
-            mes_nome = self.meses_pt[data_ref.month]
-            ano = data_ref.year
-            
-            # Formato: "MMZR Family Office - Relatório de Performance - Junho/2025"
-            assunto = f"MMZR Family Office - Relatório de Performance - {mes_nome}/{ano}"
-            
-            logger.info(f"Assunto do email gerado: {assunto}")
-            return assunto
+            return self.secoes.obter(
+                ((data_ref.year, data_ref.month), self.template.versao),
+                ('assunto',),
+                lambda: self._montar_assunto(data_ref),
+            )
             
         except Exception as e:
             logger.error(f"Erro ao gerar assunto do email: {e}")
             # Fallback para assunto básico
             return "MMZR Family Office - Relatório de Performance"
     
+    def _montar_assunto(self, data_ref: datetime) -> str:
+        """Monta o assunto do email (chamado uma vez por mês de referência)."""
+        mes_nome = self.meses_pt[data_ref.month]
+        ano = data_ref.year
+        
+        # Formato: "MMZR Family Office - Relatório de Performance - Junho/2025"
+        assunto = f"MMZR Family Office - Relatório de Performance - {mes_nome}/{ano}"
+        
+        logger.info(f"Assunto do email gerado: {assunto}")
+        return assunto
+    
     def save_email_to_file(self, html_content: str, client_name: str, output_path: Optional[str] = None) -> str:
         """
         Salva o conteúdo HTML do e-mail em um arquivo.
@@ -934,17 +840,7 @@ class MMZREmailGenerator:
             IOError: Se não conseguir salvar o arquivo
         """
         try:
-            # Remover caracteres inválidos para nome de arquivo
-            safe_client_name = "".join([c if c.isalnum() or c in [' ', '_'] else '_' for c in client_name])
-            safe_client_name = safe_client_name.replace(' ', '_')
-            
-            # Data atual para nome do arquivo
-            date_str = datetime.now().strftime("%Y%m%d")
-            
-            # Caminho de saída
-            if not output_path:
-                filename = f"relatorio_mensal_{safe_client_name}_{date_str}.html"
-                output_path = filename
+            output_path = self.caminho_relatorio(client_name, output_path)
             
             # Salvar o arquivo
             with open(output_path, 'w', encoding='utf-8') as f:
@@ -956,15 +852,82 @@ class MMZREmailGenerator:
         except Exception as e:
             logger.error(f"Erro ao salvar arquivo: {e}")
             raise IOError(f"Não foi possível salvar o arquivo: {e}")
+    
+    def stream_email_to_file(self, client_name: str, data_ref: datetime, portfolios_data: List[DadosCarteira],
+                             output_path: Optional[str] = None) -> Optional[str]:
+        """
+        Gera o HTML do email escrevendo-o diretamente no arquivo de saída.
+        
+        Equivale a ``save_email_to_file(generate_html_email(...))``, mas sem
+        montar o documento inteiro em memória. Se a geração ou a gravação
+        falhar no meio, o arquivo parcial é removido.
+        
+        Args:
+            client_name (str): Nome do cliente
+            data_ref (datetime): Data de referência do relatório
+            portfolios_data (List[DadosCarteira]): Carteiras do cliente (registros ou dicionários)
+            output_path (Optional[str]): Caminho de saída personalizado
+            
+        Returns:
+            Optional[str]: Caminho do arquivo salvo, ou None se a geração do HTML falhar
+            
+        Raises:
+            IOError: Se não conseguir salvar o arquivo
+        """
+        output_path = self.caminho_relatorio(client_name, output_path)
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                self.write_html_email(f, client_name, data_ref, portfolios_data)
+        except Exception as e:
+            # Nunca deixar um relatório pela metade (ou vazio) no disco
+            try:
+                os.remove(output_path)
+            except OSError:
+                pass
+            if isinstance(e, OSError):
+                logger.error(f"Erro ao salvar arquivo: {e}")
+                raise IOError(f"Não foi possível salvar o arquivo: {e}")
+            logger.error(f"Erro ao gerar HTML do email: {e}")
+            return None
+        
+        logger.info(f"Relatório salvo em: {output_path}")
+        return output_path
+    
+    def caminho_relatorio(self, client_name: str, output_path: Optional[str] = None,
+                          data_ref: Optional[datetime] = None) -> str:
+        """
+        Retorna o caminho do arquivo do relatório (nome do cliente + data de referência).
+        
+        Args:
+            client_name (str): Nome do cliente
+            output_path (Optional[str]): Caminho de saída personalizado
+            data_ref (Optional[datetime]): Data usada no nome do arquivo (padrão: data atual)
+            
+        Returns:
+            str: ``output_path`` ou relatorio_mensal_<cliente>_<AAAAMMDD>.html
+        """
+        if output_path:
+            return output_path
+        
+        # Remover caracteres inválidos para nome de arquivo
+        safe_client_name = "".join([c if c.isalnum() or c in [' ', '_'] else '_' for c in client_name])
+        safe_client_name = safe_client_name.replace(' ', '_')
+        
+        # Data de referência (ou atual) para nome do arquivo
+        date_str = (data_ref or datetime.now()).strftime("%Y%m%d")
+        
+        return f"relatorio_mensal_{safe_client_name}_{date_str}.html"
 
 
-def process_and_generate_report(excel_path: str, client_config: Dict[str, Any]) -> Union[str, bool]:
+def process_and_generate_report(excel_path: Optional[str], client_config: Dict[str, Any], dataset: Optional[MMZRDataset] = None) -> Union[str, bool]:
     """
     Processa os dados e gera o relatório de e-mail.
     
     Args:
-        excel_path (str): Caminho para o arquivo Excel
+        excel_path (Optional[str]): Caminho para o arquivo Excel (padrão: planilha base do dataset)
         client_config (Dict[str, Any]): Configuração do cliente
+        dataset (Optional[MMZRDataset]): Dados já carregados; se informado, as abas
+            são obtidas dele em vez de relidas do arquivo
         
     Returns:
         Union[str, bool]: Caminho do arquivo gerado ou False se houver erro
@@ -973,9 +936,19 @@ def process_and_generate_report(excel_path: str, client_config: Dict[str, Any])
         # Criar o gerador
         generator = MMZREmailGenerator()
         
-        # Carregar o Excel
-        excel_file = generator.load_excel_data(excel_path)
-        if not excel_file:
+        # Obter as abas pelo dataset compartilhado (carregado aqui se não informado)
+        if dataset is None:
+            if not excel_path or not os.path.exists(excel_path):
+                logger.error(f"Arquivo não encontrado: {excel_path}")
+                logger.error("Erro ao carregar arquivo Excel.")
+                return False
+            dataset = MMZRDataset(excel_path)
+        
+        try:
+            sheet_names = dataset.listar_abas(excel_path)
+            logger.info(f"Abas disponíveis: {sheet_names}")
+        except Exception as e:
+            logger.error(f"Erro ao carregar arquivo {excel_path or dataset.planilha_base}: {e}")
             logger.error("Erro ao carregar arquivo Excel.")
             return False
         
@@ -993,23 +966,24 @@ def process_and_generate_report(excel_path: str, client_config: Dict[str, Any])
             # Buscar a aba correspondente no Excel
             sheet_name = portfolio_config.get('sheet_name', '')
             
-            if sheet_name and sheet_name in excel_file.sheet_names:
-                # Ler os dados da aba
-                df = pd.read_excel(excel_file, sheet_name=sheet_name)
+            if sheet_name and sheet_name in sheet_names:
+                # Ler os dados da aba (memorizada no dataset)
+                df = dataset.ler_aba(sheet_name, excel_path)
+                
+                # Localizar todas as âncoras da aba em uma única passada
+                ancoras = generator.indexar_ancoras(df)
                 
                 # Extrair todos os dados necessários
-                portfolio_data = {
-                    'name': portfolio_config.get('name', 'Carteira'),
-                    'type': portfolio_config.get('type', 'Diversificada'),
-                    'comentarios': portfolio_config.get('comentarios', ''),  # Adicionar suporte a comentários
-                    'data': {
-                        'performance': generator.extract_performance_data(df),
-                        'retorno_financeiro': generator.extract_financial_return(df),
-                        'estrategias_destaque': generator.extract_highlight_strategies(df),
-                        'ativos_promotores': generator.extract_promoter_assets(df),
-                        'ativos_detratores': generator.extract_detractor_assets(df)
-                    }
-                }
+                portfolio_data = RelatorioCarteira(
+                    nome=portfolio_config.get('name', 'Carteira'),
+                    tipo=portfolio_config.get('type', 'Diversificada'),
+                    comentarios=portfolio_config.get('comentarios', ''),  # Adicionar suporte a comentários
+                    performance=[LinhaPerformance.de_dict(linha) for linha in generator.extract_performance_data(df, ancoras)],
+                    retorno_financeiro=generator.extract_financial_return(df, ancoras),
+                    estrategias_destaque=generator.extract_highlight_strategies(df, ancoras),
+                    ativos_promotores=generator.extract_promoter_assets(df, ancoras),
+                    ativos_detratores=generator.extract_detractor_assets(df, ancoras)
+                )
                 
                 portfolios_data.append(portfolio_data)
             else:
@@ -1017,11 +991,10 @@ def process_and_generate_report(excel_path: str, client_config: Dict[str, Any])
                 logger.error(error_msg)
                 raise ValueError(error_msg)
         
-        # Gerar o HTML do e-mail
-        html_content = generator.generate_html_email(client_name, data_ref, portfolios_data)
-        
-        # Salvar o e-mail em um arquivo
-        output_file = generator.save_email_to_file(html_content, client_name)
+        # Gerar o HTML do e-mail direto no arquivo
+        output_file = generator.stream_email_to_file(client_name, data_ref, portfolios_data)
+        if output_file is None:
+            return False
         
         logger.info(f"Relatório gerado com sucesso para {client_name}!")
         return output_file
@@ -0,0 +1,266 @@
+"""
+MMZR Family Office - Escrita dos Relatórios em Segundo Plano
+
+Este módulo grava os arquivos HTML dos relatórios em threads de segundo
+plano (write-behind), para que a renderização do próximo cliente não espere
+pelo disco. Os relatórios renderizados entram em uma fila limitada (quando
+ela enche, quem renderiza aguarda, o que limita a memória usada) e um pequeno
+grupo de threads os grava.
+
+Cada arquivo é escrito primeiro em um temporário na mesma pasta e depois
+renomeado para o nome final (``os.replace``, atômico), de modo que uma
+interrupção nunca deixa um relatório gravado pela metade. A pasta de saída
+é configurável e pode ser dividida em subpastas (ex.: ``3f/relatorio...html``)
+para não acumular milhares de arquivos em um único diretório.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import os
+import time
+import queue
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+THREADS_PADRAO = 2
+TAMANHO_FILA_PADRAO = 64
+
+# Marcador de fim para as threads de escrita
+_FIM = None
+
+
+def caminho_saida(diretorio: str, nome_arquivo: str, subpastas: bool = False) -> str:
+    """
+    Caminho em que um relatório é gravado na pasta de saída.
+
+    Args:
+        diretorio (str): Pasta de saída
+        nome_arquivo (str): Nome do arquivo (sem pasta)
+        subpastas (bool): Se os arquivos são distribuídos em 256 subpastas
+            (2 dígitos hexadecimais do hash do nome do arquivo)
+
+    Returns:
+        str: Pasta de saída [+ subpasta] + nome do arquivo
+    """
+    if not subpastas:
+        return os.path.join(diretorio, nome_arquivo)
+    subpasta = hashlib.md5(nome_arquivo.encode('utf-8')).hexdigest()[:2]
+    return os.path.join(diretorio, subpasta, nome_arquivo)
+
+
+def gravar_atomico(caminho: str, conteudo: Union[str, bytes]) -> int:
+    """
+    Grava um arquivo em um temporário na mesma pasta e o renomeia para o nome final.
+
+    A pasta precisa existir. Um leitor nunca encontra o arquivo pela metade:
+    ou vê a versão anterior, ou a nova completa.
+
+    Args:
+        caminho (str): Arquivo final
+        conteudo (Union[str, bytes]): Conteúdo; str é gravado como em um arquivo
+            de texto UTF-8 (quebras de linha da plataforma)
+
+    Returns:
+        int: Bytes gravados
+    """
+    if isinstance(conteudo, str):
+        # Mesma conversão de um arquivo aberto em modo texto
+        if os.linesep != '\n':
+            conteudo = conteudo.replace('\n', os.linesep)
+        conteudo = conteudo.encode('utf-8')
+
+    # Nome exclusivo por processo/thread; open (e não mkstemp) mantém as
+    # permissões padrão (umask) de um arquivo de relatório comum
+    pasta, nome = os.path.split(caminho)
+    caminho_tmp = os.path.join(pasta, f".{nome}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(caminho_tmp, 'wb') as f:
+            f.write(conteudo)
+        os.replace(caminho_tmp, caminho)
+    except BaseException:
+        try:
+            os.remove(caminho_tmp)
+        except OSError:
+            pass
+        raise
+    return len(conteudo)
+
+
+class EscritorRelatorios:
+    """
+    Gravação assíncrona e atômica dos arquivos de relatório.
+
+    Uso::
+
+        with EscritorRelatorios("saida", subpastas=True) as escritor:
+            escritor.enviar("relatorio_mensal_X_20261017.html", html)
+        print(escritor.estatisticas())
+
+    Attributes:
+        diretorio (str): Pasta de saída
+        subpastas (bool): Se os arquivos são distribuídos em subpastas
+        erros (List[Tuple[str, str]]): (caminho, mensagem) das gravações que falharam
+    """
+
+    def __init__(self, diretorio: str = ".", subpastas: bool = False, threads: int = THREADS_PADRAO,
+                 tamanho_fila: int = TAMANHO_FILA_PADRAO) -> None:
+        """
+        Cria a pasta de saída e inicia as threads de escrita.
+
+        Args:
+            diretorio (str): Pasta de saída
+            subpastas (bool): Distribui os arquivos em 256 subpastas (2 dígitos
+                hexadecimais do hash do nome do arquivo)
+            threads (int): Quantidade de threads de escrita
+            tamanho_fila (int): Relatórios aguardando gravação antes de
+                ``enviar`` bloquear
+        """
+        self.diretorio = diretorio
+        self.subpastas = subpastas
+        self.erros: List[Tuple[str, str]] = []
+
+        self._fila: "queue.Queue[Optional[Tuple[str, Union[str, bytes], Optional[Callable[[str], Any]]]]]" = \
+            queue.Queue(maxsize=max(1, tamanho_fila))
+        self._trava = threading.Lock()
+        self._pastas_criadas = set()
+        self._fila_maxima = 0
+        self._gravados = 0
+        self._bytes_gravados = 0
+        self._segundos_escrita = 0.0
+        self._inicio = time.perf_counter()
+        self._fim: Optional[float] = None
+
+        os.makedirs(diretorio, exist_ok=True)
+        self._threads = [
+            threading.Thread(target=self._trabalhar, name=f"mmzr-escrita-{i}", daemon=True)
+            for i in range(max(1, threads))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> "EscritorRelatorios":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.fechar()
+
+    def caminho_final(self, nome_arquivo: str) -> str:
+        """
+        Caminho em que um relatório será gravado.
+
+        Args:
+            nome_arquivo (str): Nome do arquivo (sem pasta)
+
+        Returns:
+            str: Pasta de saída [+ subpasta] + nome do arquivo
+        """
+        return caminho_saida(self.diretorio, nome_arquivo, self.subpastas)
+
+    def enviar(self, nome_arquivo: str, conteudo: Union[str, bytes],
+               ao_concluir: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Coloca um relatório na fila de gravação (bloqueia se a fila estiver cheia).
+
+        Args:
+            nome_arquivo (str): Nome do arquivo (sem pasta)
+            conteudo (Union[str, bytes]): HTML do relatório; str é gravado como em
+                um arquivo de texto UTF-8 (quebras de linha da plataforma)
+            ao_concluir (Optional[Callable[[str], Any]]): Chamado com o caminho
+                final depois da gravação, na thread de escrita (uma chamada por vez)
+
+        Returns:
+            str: Caminho final do arquivo
+        """
+        if self._fim is not None:
+            raise RuntimeError("Escritor de relatórios já foi fechado")
+        caminho = self.caminho_final(nome_arquivo)
+        self._fila.put((caminho, conteudo, ao_concluir))
+
+        profundidade = self._fila.qsize()
+        if profundidade > self._fila_maxima:
+            self._fila_maxima = profundidade
+        return caminho
+
+    def _trabalhar(self) -> None:
+        """Laço das threads de escrita."""
+        while True:
+            item = self._fila.get()
+            try:
+                if item is _FIM:
+                    return
+                caminho, conteudo, ao_concluir = item
+                inicio = time.perf_counter()
+                try:
+                    tamanho = self._gravar(caminho, conteudo)
+                except Exception as e:
+                    logger.error(f"Erro ao gravar {caminho}: {e}")
+                    with self._trava:
+                        self.erros.append((caminho, str(e)))
+                    continue
+
+                with self._trava:
+                    self._gravados += 1
+                    self._bytes_gravados += tamanho
+                    self._segundos_escrita += time.perf_counter() - inicio
+                    if ao_concluir is not None:
+                        try:
+                            ao_concluir(caminho)
+                        except Exception as e:
+                            logger.warning(f"Erro após gravar {caminho}: {e}")
+            finally:
+                self._fila.task_done()
+
+    def _gravar(self, caminho: str, conteudo: Union[str, bytes]) -> int:
+        """Cria a subpasta (uma vez) e grava o arquivo de forma atômica."""
+        pasta = os.path.dirname(caminho) or "."
+        if pasta not in self._pastas_criadas:
+            os.makedirs(pasta, exist_ok=True)
+            self._pastas_criadas.add(pasta)
+        return gravar_atomico(caminho, conteudo)
+
+    def aguardar(self) -> None:
+        """Espera até que todos os relatórios já enviados estejam gravados."""
+        self._fila.join()
+
+    def fechar(self) -> None:
+        """Grava o que estiver na fila e encerra as threads de escrita."""
+        if self._fim is not None:
+            return
+        for _ in self._threads:
+            self._fila.put(_FIM)
+        for thread in self._threads:
+            thread.join()
+        self._fim = time.perf_counter()
+        if self.erros:
+            logger.error(f"{len(self.erros)} relatórios não puderam ser gravados")
+
+    def estatisticas(self) -> Dict[str, float]:
+        """
+        Situação da fila e vazão da gravação.
+
+        Returns:
+            Dict[str, float]: 'fila' (relatórios aguardando agora), 'fila_maxima',
+                'gravados', 'erros', 'bytes', 'segundos' (desde a criação),
+                'segundos_escrita' (soma do tempo gasto pelas threads),
+                'relatorios_por_segundo' e 'mb_por_segundo'
+        """
+        with self._trava:
+            segundos = (self._fim or time.perf_counter()) - self._inicio
+            return {
+                'fila': self._fila.qsize(),
+                'fila_maxima': self._fila_maxima,
+                'gravados': self._gravados,
+                'erros': len(self.erros),
+                'bytes': self._bytes_gravados,
+                'segundos': segundos,
+                'segundos_escrita': self._segundos_escrita,
+                'relatorios_por_segundo': self._gravados / segundos if segundos else 0.0,
+                'mb_por_segundo': self._bytes_gravados / 1024 / 1024 / segundos if segundos else 0.0,
+            }
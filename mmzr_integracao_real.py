@@ -1,116 +1,658 @@
-# import os
+import os
 import json
+import time
+import threading
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from mmzr_email_generator import MMZREmailGenerator
 from mmzr_compatibilidade import MMZRCompatibilidade
+from mmzr_dataset import MMZRDataset
+from mmzr_ativos import interpretar_coluna
+from mmzr_logo import CONTENT_ID_LOGO
+from mmzr_manifesto import MMZRManifesto, NOME_MANIFESTO, NOME_MANIFESTO_JUNTADO, juntar_manifestos, nome_manifesto_shard
+from mmzr_pacote import PacoteRelatorios
+from mmzr_escrita import EscritorRelatorios, caminho_saida, gravar_atomico
+from mmzr_modelos import LinhaPerformance, RelatorioCarteira, RelatorioCliente
+from mmzr_pipeline import Etapa, PipelineAssincrono
+from mmzr_diario import DiarioExecucao, NOME_DIARIO, nome_diario_shard
 
-def gerar_relatorio_integrado(planilha_base=None, planilha_rentabilidade=None, nome_ou_email_cliente=None, enviar_email=False):
-    """Gera relatório integrando dados das planilhas"""
-    generator = MMZREmailGenerator()
+# Clientes por lote enviado a cada processo no modo paralelo
+TAMANHO_LOTE_PADRAO = 50
+
+# Serializa as mensagens de progresso emitidas por várias threads (modo pipeline)
+_TRAVA_SAIDA = threading.Lock()
+
+def gerar_relatorio_integrado(planilha_base=None, planilha_rentabilidade=None, nome_ou_email_cliente=None, enviar_email=False, usar_cache=True, dataset=None, streaming=False, logo_mode="inline", compacto=False, incremental=True, pacote=None, saida=None, subpastas=False, workers=1, tamanho_lote=TAMANHO_LOTE_PADRAO, pipeline=False, shard=None, retomar=False, medir_compactacao=False):
+    """
+    Gera relatório integrando dados das planilhas (reutiliza o dataset, se informado).
+    
+    Com ``incremental`` (padrão), clientes cujos dados não mudaram desde a
+    última execução reaproveitam o relatório já gravado (ver MMZRManifesto).
+    Com ``pacote`` (caminho .zip), todos os relatórios são gravados em um único
+    arquivo zip com índice (ver PacoteRelatorios), sempre regenerados.
+    Com ``saida`` (pasta), os arquivos são gravados em segundo plano, de forma
+    atômica, nessa pasta (em subpastas, se ``subpastas``), enquanto os
+    próximos clientes são renderizados (ver EscritorRelatorios). O manifesto
+    e o diário da execução ficam sempre na pasta dos relatórios.
+    Com ``workers`` > 1, os clientes são distribuídos em lotes de
+    ``tamanho_lote`` entre processos (ver _gerar_relatorios_paralelo); o
+    resultado é o mesmo da geração sequencial. Não se aplica ao modo pacote.
+    Com ``pipeline``, montagem, renderização, gravação e envio rodam como
+    etapas simultâneas ligadas por filas limitadas (ver _gerar_relatorios_pipeline).
+    Com ``shard`` = (i, N), só os clientes do shard i de N são gerados (ver
+    MMZRDataset.filtrar_shard), com um manifesto próprio do shard.
+    Com ``compacto`` e ``medir_compactacao``, cada relatório também é
+    renderizado sem compactação para medir a economia em disco e no envio
+    (o que dobra o custo de renderização; por isso é opcional).
+    
+    Cada execução em lote (todos os clientes ou um shard) mantém um diário
+    (ver DiarioExecucao) com os relatórios gravados e os emails criados. Com
+    ``retomar``, uma execução interrompida continua de onde parou: clientes
+    já concluídos são pulados e nenhum email é criado duas vezes.
+    
+    Returns:
+        bool: True se a geração terminou; False se o cliente não foi encontrado
+            ou se houve um erro (já informado na saída)
+    """
+    generator = MMZREmailGenerator(logo_mode=logo_mode, compacto=compacto)
+    tamanhos = _iniciar_tamanhos(logo_mode, compacto and medir_compactacao)
+    manifesto = None
+    if not pacote:
+        caminho_manifesto = _caminho_controle(saida, nome_manifesto_shard(*shard) if shard else NOME_MANIFESTO)
+        if saida:
+            os.makedirs(saida, exist_ok=True)
+        manifesto = MMZRManifesto.carregar(generator, caminho_manifesto, reaproveitar=incremental)
+        if shard:
+            manifesto.shard = f"{shard[0]}/{shard[1]}"
     
-    if not planilha_base or not planilha_rentabilidade:
-        planilha_base, planilha_rentabilidade = MMZRCompatibilidade.get_planilhas_path()
+    if pacote and enviar_email:
+        print("AVISO: o envio de emails não está disponível no modo pacote; os emails não serão criados")
+        enviar_email = False
     
     try:
-        # Carregar planilha base
-        excel_base = pd.ExcelFile(planilha_base)
-        
-        # Carregar a aba Base Clientes
-        if "Base Clientes" in excel_base.sheet_names:
-            df_clientes = pd.read_excel(excel_base, sheet_name="Base Clientes")
-            df_clientes['Nome cliente'] = df_clientes['Nome cliente'].str.strip()
-            df_clientes = df_clientes[df_clientes['Nome cliente'] != 'Nome Cliente']
-            
-            # Carregar a aba Base Consolidada para obter os emails
-            if "Base Consolidada" in excel_base.sheet_names:
-                df_consolidada = pd.read_excel(excel_base, sheet_name="Base Consolidada")
-                df_consolidada['NomeCompletoCliente'] = df_consolidada['NomeCompletoCliente'].str.strip()
-                
-                df_clientes = df_clientes.merge(
-                    df_consolidada[['NomeCompletoCliente', 'EmailCliente']], 
-                    left_on='Nome cliente', 
-                    right_on='NomeCompletoCliente', 
-                    how='left'
-                )
-                
-                df_clientes['Email cliente'] = df_clientes['EmailCliente']
-                
-                # Criar emails fictícios para clientes sem email
-                clientes_sem_email = df_clientes['Email cliente'].isna()
-                if clientes_sem_email.any():
-                    df_clientes.loc[clientes_sem_email, 'Email cliente'] = df_clientes.loc[clientes_sem_email, 'Nome cliente'].apply(
-                        lambda nome: f"{nome.lower().replace(' ', '.')}@example.com"
-                    )
-            else:
-                df_clientes['Email cliente'] = df_clientes['Nome cliente'].apply(
-                    lambda nome: f"{nome.lower().replace(' ', '.')}@example.com"
-                )
-        else:
-            print("ERRO: Aba 'Base Clientes' não encontrada na planilha base")
-            return
+        if dataset is None:
+            dataset = MMZRDataset.carregar(planilha_base, planilha_rentabilidade, usar_cache, carregar_rentabilidade=not streaming)
         
-        # Carregar planilha de rentabilidade
-        excel_rent = pd.ExcelFile(planilha_rentabilidade)
-        primeira_aba = excel_rent.sheet_names[0]
-        df_rentabilidade = pd.read_excel(excel_rent, sheet_name=primeira_aba)
+        df_clientes = dataset.clientes
         
         # Processar cliente específico ou todos
         if nome_ou_email_cliente:
             nome_ou_email_cliente = nome_ou_email_cliente.strip()
-            df_cliente = df_clientes[
-                (df_clientes['Nome cliente'] == nome_ou_email_cliente) | 
-                (df_clientes['Email cliente'] == nome_ou_email_cliente)
-            ]
+            df_clientes = dataset.filtrar_cliente(nome_ou_email_cliente)
             
-            if len(df_cliente) == 0:
+            if len(df_clientes) == 0:
                 print(f"ERRO: Cliente '{nome_ou_email_cliente}' não encontrado")
-                return
-            
-            clientes_agrupados = df_cliente.groupby('Nome cliente')
-        else:
-            clientes_agrupados = df_clientes.groupby('Nome cliente')
+                return False
         
-        # Processar cada cliente
-        for nome_cliente, carteiras_cliente in clientes_agrupados:
-            email_cliente = carteiras_cliente['Email cliente'].iloc[0]
-            portfolios_data = []
-            
-            # Processar cada carteira do cliente
-            for _, cliente_row in carteiras_cliente.iterrows():
-                codigo_carteira = cliente_row['Código carteira smart']
-                df_rent_cliente = df_rentabilidade[df_rentabilidade['Código carteira smart'] == codigo_carteira]
-                
-                if len(df_rent_cliente) == 0:
-                    continue
-                
-                portfolio_data = obter_dados_carteira(cliente_row, df_rent_cliente.iloc[0], generator)
-                if portfolio_data:
-                    portfolios_data.append(portfolio_data)
-            
-            # Gerar relatório se há dados
-            if portfolios_data:
-                html_content = generator.generate_html_email(nome_cliente, datetime.now(), portfolios_data)
-                output_file = generator.save_email_to_file(html_content, nome_cliente)
-                print(f"Relatório gerado: {output_file}")
-                
-                # Enviar email se solicitado
-                if enviar_email:
-                    assunto = generator.generate_email_subject(datetime.now())
-                    enviado = MMZRCompatibilidade.enviar_email(
-                        destinatario=email_cliente, 
-                        assunto=assunto, 
-                        caminho_html=output_file
-                    )
-                    
-                    if enviado:
-                        print(f"Email criado para {email_cliente}")
+        if shard:
+            total_clientes = df_clientes['Nome cliente'].nunique()
+            df_clientes = dataset.filtrar_shard(shard[0], shard[1], df_clientes)
+            print(f"Shard {shard[0]}/{shard[1]}: {df_clientes['Nome cliente'].nunique()} de {total_clientes} clientes")
+        
+        # Modo streaming: relatórios gerados à medida que a rentabilidade é lida
+        if pacote:
+            _gerar_pacote(dataset, df_clientes, generator, pacote, streaming)
+            return True
+        
+        # Diário da execução em lote (uma geração avulsa não altera o diário do lote)
+        diario = None
+        if not nome_ou_email_cliente:
+            caminho_diario = _caminho_controle(saida, nome_diario_shard(*shard) if shard else NOME_DIARIO)
+            diario = DiarioExecucao.abrir(caminho_diario, retomar, manifesto.shard)
+            if diario.retomada:
+                print(f"Retomando a execução iniciada em {diario.data_ref:%d/%m/%Y %H:%M}")
+        # Uma execução retomada usa a data da original (mês das tabelas e nome dos arquivos)
+        data_ref = diario.data_ref if diario is not None else None
+        
+        paralelo = workers > 1 or pipeline
+        escritor = EscritorRelatorios(saida, subpastas) if saida and not paralelo else None
+        concluida = False
+        try:
+            if paralelo:
+                if streaming:
+                    relatorios = _iterar_relatorios_streaming(dataset, df_clientes, generator, data_ref)
+                else:
+                    relatorios = montar_carteiras(dataset, df_clientes, generator, data_ref)
+                if workers > 1:
+                    _gerar_relatorios_paralelo(relatorios, generator, compacto, enviar_email, tamanhos, manifesto,
+                                               workers, tamanho_lote, saida, subpastas, diario)
+                else:
+                    _gerar_relatorios_pipeline(relatorios, generator, enviar_email, tamanhos, manifesto, saida, subpastas, diario)
+            elif streaming:
+                _gerar_relatorios_streaming(dataset, df_clientes, generator, enviar_email, tamanhos, manifesto, escritor, diario)
+            else:
+                # Montar todas as carteiras de uma vez e gerar cada relatório
+                for relatorio in montar_carteiras(dataset, df_clientes, generator, data_ref):
+                    _emitir_relatorio(generator, relatorio.nome, relatorio.email, relatorio.carteiras, enviar_email,
+                                      tamanhos, manifesto, escritor, diario)
+            concluida = True
+        finally:
+            # Gravar o que já foi gerado, mesmo que o lote seja interrompido
+            if escritor is not None:
+                escritor.fechar()
+            manifesto.salvar()
+            if diario is not None:
+                diario.fechar(concluida)
+        
+        if manifesto.reaproveitados:
+            print(f"\n{manifesto.reaproveitados} relatórios sem alterações foram reaproveitados "
+                  f"({manifesto.gerados} gerados)")
+        if diario is not None and diario.retomados:
+            print(f"\n{diario.retomados} clientes já concluídos antes da interrupção foram pulados")
+        if escritor is not None and (escritor.estatisticas()['gravados'] or escritor.erros):
+            _resumir_escrita(escritor)
+        _resumir_tamanhos(tamanhos)
+        return True
         
     except Exception as e:
         print(f"ERRO: {str(e)}")
+        return False
+
+def _gerar_pacote(dataset, df_clientes, generator, caminho_pacote, streaming=False):
+    """Grava os relatórios de todos os clientes em um único pacote zip"""
+    with PacoteRelatorios(caminho_pacote) as pacote:
+        if streaming:
+            relatorios = _iterar_relatorios_streaming(dataset, df_clientes, generator)
+        else:
+            relatorios = montar_carteiras(dataset, df_clientes, generator)
+        for relatorio in relatorios:
+            pacote.adicionar(generator, relatorio.nome, relatorio.email, datetime.now(), relatorio.carteiras)
+    
+    tamanho_total = sum(entrada['tamanho'] for entrada in pacote.indice.values())
+    tamanho_pacote = os.path.getsize(caminho_pacote)
+    print(f"Pacote gerado: {caminho_pacote} ({len(pacote.indice)} relatórios, "
+          f"{tamanho_total / 1024:,.1f} KB em HTML, {tamanho_pacote / 1024:,.1f} KB comprimido)")
+
+def juntar_shards(caminhos, destino=NOME_MANIFESTO_JUNTADO):
+    """Combina os manifestos dos shards de uma execução e mostra o resumo"""
+    try:
+        resumo = juntar_manifestos(caminhos, destino)
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        return None
+    
+    print(f"\nManifesto combinado: {destino}")
+    for shard in resumo['shards']:
+        print(f"  {shard['arquivo']} (shard {shard['shard'] or '-'}): {shard['clientes']} clientes, "
+              f"{shard['gerados']} gerados, {shard['reaproveitados']} reaproveitados")
+    print(f"Total: {resumo['clientes']} clientes, {resumo['bytes'] / 1024:,.1f} KB em relatórios "
+          f"(referência: {', '.join(resumo['referencias']) or '-'})")
+    if resumo['repetidos']:
+        print(f"AVISO: {resumo['repetidos']} clientes aparecem em mais de um manifesto")
+    if resumo['faltando']:
+        print(f"AVISO: shards sem manifesto: {', '.join(map(str, resumo['faltando']))}")
+    return resumo
+
+def _caminho_controle(saida, nome):
+    """
+    Caminho de um arquivo de controle da execução (manifesto, diário).
+    
+    Os arquivos de controle ficam sempre junto dos relatórios: na pasta
+    ``saida``, quando informada, ou na pasta atual, onde os relatórios são
+    gravados sem ela.
+    """
+    return os.path.join(saida, nome) if saida else nome
+
+def _iniciar_tamanhos(logo_mode, medir_compactacao):
+    """
+    Prepara os contadores de tamanho do lote.
+    
+    Com ``medir_compactacao`` (modo compacto), um gerador sem compactação
+    serve de referência para medir a economia em disco e no envio (tamanho
+    da mensagem MIME).
+    """
+    return {
+        'relatorios': 0,
+        'bytes': 0,
+        'referencia': MMZREmailGenerator(logo_mode=logo_mode) if medir_compactacao else None,
+        'bytes_sem_compactar': 0,
+        'mime': 0,
+        'mime_sem_compactar': 0,
+    }
+
+def _registrar_tamanho(tamanhos, generator, output_file, nome_cliente, email_cliente, data_ref, portfolios_data, html=None):
+    """Soma ao lote o tamanho do relatório gerado (e o da versão sem compactação)"""
+    tamanhos['relatorios'] += 1
+    tamanhos['bytes'] += os.path.getsize(output_file) if html is None else len(html.encode('utf-8'))
+    
+    referencia = tamanhos['referencia']
+    if referencia is None:
+        return
+    assunto = generator.generate_email_subject(data_ref)
+    html_compacto = html
+    if html_compacto is None:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            html_compacto = f.read()
+    html_original = referencia.generate_html_email(nome_cliente, data_ref, portfolios_data)
+    tamanhos['bytes_sem_compactar'] += len(html_original.encode('utf-8'))
+    tamanhos['mime'] += len(generator.build_mime_message(html_compacto, email_cliente, assunto).as_bytes())
+    tamanhos['mime_sem_compactar'] += len(referencia.build_mime_message(html_original, email_cliente, assunto).as_bytes())
+
+def _resumir_tamanhos(tamanhos):
+    """Mostra o tamanho médio dos relatórios do lote e, se medida, a economia da compactação"""
+    quantidade = tamanhos['relatorios']
+    if quantidade == 0:
+        return
+    
+    print(f"\nTamanho médio: {tamanhos['bytes'] / quantidade:,.0f} bytes por relatório "
+          f"({quantidade} relatórios, {tamanhos['bytes'] / 1024:,.1f} KB no total)")
+    
+    if tamanhos['referencia'] is None:
+        return
+    economia_disco = 1 - tamanhos['bytes'] / tamanhos['bytes_sem_compactar']
+    economia_envio = 1 - tamanhos['mime'] / tamanhos['mime_sem_compactar']
+    print(f"Sem compactação: {tamanhos['bytes_sem_compactar'] / quantidade:,.0f} bytes por relatório "
+          f"(economia em disco: {economia_disco:.1%}, "
+          f"{(tamanhos['bytes_sem_compactar'] - tamanhos['bytes']) / 1024:,.1f} KB)")
+    print(f"Mensagem MIME: {tamanhos['mime'] / quantidade:,.0f} bytes por email, "
+          f"contra {tamanhos['mime_sem_compactar'] / quantidade:,.0f} sem compactação "
+          f"(economia no envio: {economia_envio:.1%})")
+
+def _resumir_escrita(escritor):
+    """Mostra a vazão e a profundidade máxima da fila da escrita em segundo plano"""
+    estatisticas = escritor.estatisticas()
+    print(f"\nEscrita em segundo plano: {estatisticas['gravados']} arquivos, "
+          f"{estatisticas['bytes'] / 1024 / 1024:,.1f} MB em {estatisticas['segundos']:.1f}s "
+          f"({estatisticas['relatorios_por_segundo']:,.0f} relatórios/s, {estatisticas['mb_por_segundo']:,.1f} MB/s); "
+          f"fila máxima: {estatisticas['fila_maxima']}")
+    if estatisticas['erros']:
+        print(f"ERRO: {estatisticas['erros']} relatórios não puderam ser gravados (ver log)")
+
+def _imprimir(mensagem):
+    """Mostra uma mensagem de progresso inteira, sem intercalar com as de outras threads"""
+    with _TRAVA_SAIDA:
+        print(mensagem)
+
+def _registrar_gravado(manifesto, nome_cliente, assinatura, data_ref, output_file, diario=None):
+    """Registra o relatório gravado no manifesto e no diário; um relatório válido nunca é vazio (vazio indica falha na geração)"""
+    if os.path.getsize(output_file) > 0:
+        manifesto.registrar(nome_cliente, assinatura, data_ref, output_file)
+        if diario is not None:
+            diario.registrar('gerado', nome_cliente, assinatura, arquivo=output_file)
+    else:
+        manifesto.esquecer(nome_cliente)
+        if diario is not None:
+            diario.registrar('erro', nome_cliente, assinatura, etapa='gerar')
+
+def _registrar_falha(manifesto, nome_cliente, assinatura, diario=None):
+    """Informa que o relatório do cliente não foi gerado (nenhum arquivo fica no disco)"""
+    _imprimir(f"ERRO: relatório de {nome_cliente} não foi gerado (ver log)")
+    if manifesto is not None:
+        manifesto.esquecer(nome_cliente)
+        if diario is not None:
+            diario.registrar('erro', nome_cliente, assinatura, etapa='gerar')
+
+def _ja_gerado(diario, manifesto, nome_cliente, assinatura, data_ref):
+    """Relatório gravado antes da interrupção de uma execução retomada (ou None)"""
+    if diario is None:
+        return None
+    arquivo = diario.gerado(nome_cliente, assinatura)
+    if arquivo is not None:
+        diario.retomados += 1
+        manifesto.registrar(nome_cliente, assinatura, data_ref, arquivo)
+        _imprimir(f"Relatório já gerado antes da interrupção: {arquivo}")
+    return arquivo
+
+def _emitir_relatorio(generator, nome_cliente, email_cliente, portfolios_data, enviar_email, tamanhos=None, manifesto=None, escritor=None, diario=None):
+    """
+    Gera (ou reaproveita, se nada mudou), salva e (opcionalmente) envia o relatório de um cliente.
+    
+    Com um ``escritor``, o arquivo é gravado em segundo plano e o registro no
+    manifesto acontece quando a gravação termina. Com um ``diario``, a data
+    de referência é a da execução, e um cliente já concluído antes de uma
+    interrupção é pulado.
+    """
+    data_ref = diario.data_ref if diario is not None else datetime.now()
+    output_file = generator.caminho_relatorio(nome_cliente, data_ref=data_ref)
+    if escritor is not None:
+        output_file = escritor.caminho_final(output_file)
+    
+    reaproveitado = False
+    assinatura = None
+    if manifesto is not None:
+        assinatura = manifesto.assinatura(nome_cliente, portfolios_data, data_ref)
+        arquivo_anterior = _ja_gerado(diario, manifesto, nome_cliente, assinatura, data_ref)
+        if arquivo_anterior is not None:
+            output_file = arquivo_anterior
+            reaproveitado = True
+        elif manifesto.inalterado(nome_cliente, assinatura, data_ref, output_file):
+            manifesto.reaproveitados += 1
+            print(f"Relatório inalterado: {output_file}")
+            reaproveitado = True
+    
+    if not reaproveitado and escritor is not None:
+        html = generator.generate_html_email(nome_cliente, data_ref, portfolios_data)
+        if not html:
+            _registrar_falha(manifesto, nome_cliente, assinatura, diario)
+            return
+        ao_concluir = None
+        if manifesto is not None:
+            manifesto.gerados += 1
+            ao_concluir = lambda caminho: _registrar_gravado(manifesto, nome_cliente, assinatura, data_ref, caminho, diario)
+        escritor.enviar(os.path.basename(output_file), html, ao_concluir)
+        print(f"Relatório gerado: {output_file}")
+        
+        if tamanhos is not None:
+            _registrar_tamanho(tamanhos, generator, output_file, nome_cliente, email_cliente, data_ref, portfolios_data, html)
+    elif not reaproveitado:
+        output_file = generator.stream_email_to_file(nome_cliente, data_ref, portfolios_data, output_file)
+        if output_file is None:
+            _registrar_falha(manifesto, nome_cliente, assinatura, diario)
+            return
+        print(f"Relatório gerado: {output_file}")
+        
+        if manifesto is not None:
+            manifesto.gerados += 1
+            _registrar_gravado(manifesto, nome_cliente, assinatura, data_ref, output_file, diario)
+        
+        if tamanhos is not None:
+            _registrar_tamanho(tamanhos, generator, output_file, nome_cliente, email_cliente, data_ref, portfolios_data)
+    
+    # Enviar email se solicitado
+    if enviar_email:
+        if escritor is not None:
+            # O arquivo precisa estar gravado antes de ser anexado ao email
+            escritor.aguardar()
+        if manifesto is not None:
+            _enviar_pendente(generator, diario, nome_cliente, email_cliente, assinatura, output_file, data_ref)
+        else:
+            _enviar_relatorio(generator, email_cliente, output_file, data_ref)
+
+def _enviar_pendente(generator, diario, nome_cliente, email_cliente, assinatura, output_file, data_ref=None):
+    """Cria o email do cliente, a menos que o diário registre que ele já foi criado nesta execução"""
+    if diario is not None and diario.enviado(nome_cliente):
+        _imprimir(f"Email já criado antes da interrupção: {email_cliente}")
+        return
+    enviado = _enviar_relatorio(generator, email_cliente, output_file, data_ref)
+    if diario is not None:
+        if enviado:
+            diario.registrar('enviado', nome_cliente, assinatura, email=email_cliente)
+        else:
+            diario.registrar('erro', nome_cliente, assinatura, etapa='enviar', email=email_cliente)
+
+def _enviar_relatorio(generator, email_cliente, output_file, data_ref=None):
+    """Cria o email do cliente com o relatório já gravado; retorna se o email foi criado"""
+    assunto = generator.generate_email_subject(data_ref or datetime.now())
+    # No modo "cid" a logo vai como anexo referenciado pelo HTML
+    imagens_cid = None
+    if generator.logo_mode == "cid" and generator.logo is not None:
+        imagens_cid = {CONTENT_ID_LOGO: generator.logo.caminho}
+    
+    enviado = MMZRCompatibilidade.enviar_email(
+        destinatario=email_cliente, 
+        assunto=assunto, 
+        caminho_html=output_file,
+        imagens_cid=imagens_cid
+    )
+    
+    if enviado:
+        _imprimir(f"Email criado para {email_cliente}")
+    return enviado
+
+# Gerador (e gerador de referência do modo compacto) de cada processo do modo paralelo
+_GERADOR_PROCESSO = None
+_REFERENCIA_PROCESSO = None
+
+def _iniciar_processo(logo_mode, compacto, medir_compactacao=False):
+    """Cria, uma vez por processo, o gerador usado em todos os lotes desse processo"""
+    global _GERADOR_PROCESSO, _REFERENCIA_PROCESSO
+    _GERADOR_PROCESSO = MMZREmailGenerator(logo_mode=logo_mode, compacto=compacto)
+    _REFERENCIA_PROCESSO = _iniciar_tamanhos(logo_mode, medir_compactacao)['referencia']
+
+def _gerar_lote_processo(tarefas, atomico=False):
+    """
+    Gera e grava um lote de relatórios (executado em um processo do pool).
+    
+    Cada tarefa é (nome, email, data de referência, carteiras, arquivo, assinatura).
+    Com ``atomico``, o arquivo é gravado em um temporário e renomeado.
+    Retorna os relatórios gravados, os que falharam e os contadores do lote.
+    """
+    generator = _GERADOR_PROCESSO
+    tamanhos = dict(_iniciar_tamanhos(generator.logo_mode, False), referencia=_REFERENCIA_PROCESSO)
+    gravados = []
+    falhas = []
+    inicio = time.perf_counter()
+    for nome_cliente, email_cliente, data_ref, portfolios_data, output_file, assinatura in tarefas:
+        if atomico:
+            html = generator.generate_html_email(nome_cliente, data_ref, portfolios_data)
+            if not html:
+                falhas.append((nome_cliente, assinatura))
+                continue
+            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+            gravar_atomico(output_file, html)
+            _registrar_tamanho(tamanhos, generator, output_file, nome_cliente, email_cliente, data_ref, portfolios_data, html)
+        else:
+            output_file = generator.stream_email_to_file(nome_cliente, data_ref, portfolios_data, output_file)
+            if output_file is None:
+                falhas.append((nome_cliente, assinatura))
+                continue
+            _registrar_tamanho(tamanhos, generator, output_file, nome_cliente, email_cliente, data_ref, portfolios_data)
+        gravados.append((nome_cliente, email_cliente, data_ref, output_file, assinatura))
+    
+    del tamanhos['referencia']
+    return {
+        'processo': os.getpid(),
+        'gravados': gravados,
+        'falhas': falhas,
+        'segundos': time.perf_counter() - inicio,
+        'tamanhos': tamanhos,
+    }
+
+def _gerar_relatorios_paralelo(relatorios, generator, compacto, enviar_email, tamanhos, manifesto, workers, tamanho_lote=TAMANHO_LOTE_PADRAO, saida=None, subpastas=False, diario=None):
+    """
+    Gera os relatórios distribuindo lotes de clientes entre processos.
+    
+    Cada processo tem o seu MMZREmailGenerator e grava os arquivos que gera;
+    este processo monta os lotes, consulta e atualiza o manifesto e cria os
+    emails (a automação do Outlook não pode ser compartilhada entre
+    processos). No máximo dois lotes por processo ficam aguardando, o que
+    limita a memória quando os relatórios vêm do modo streaming.
+    """
+    desempenho = {}
+    inicio = time.perf_counter()
+    
+    def concluir(futuro):
+        resultado = futuro.result()
+        for nome_cliente, email_cliente, data_ref, output_file, assinatura in resultado['gravados']:
+            print(f"Relatório gerado: {output_file}")
+            manifesto.gerados += 1
+            _registrar_gravado(manifesto, nome_cliente, assinatura, data_ref, output_file, diario)
+            if enviar_email:
+                _enviar_pendente(generator, diario, nome_cliente, email_cliente, assinatura, output_file, data_ref)
+        for nome_cliente, assinatura in resultado['falhas']:
+            _registrar_falha(manifesto, nome_cliente, assinatura, diario)
+        for chave, valor in resultado['tamanhos'].items():
+            tamanhos[chave] += valor
+        
+        processo = desempenho.setdefault(resultado['processo'], {'relatorios': 0, 'bytes': 0, 'segundos': 0.0})
+        processo['relatorios'] += len(resultado['gravados'])
+        processo['bytes'] += resultado['tamanhos']['bytes']
+        processo['segundos'] += resultado['segundos']
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_processo,
+                             initargs=(generator.logo_mode, compacto, tamanhos['referencia'] is not None)) as executor:
+        pendentes = set()
+        lote = []
+        for relatorio in relatorios:
+            data_ref = diario.data_ref if diario is not None else datetime.now()
+            output_file = generator.caminho_relatorio(relatorio.nome, data_ref=data_ref)
+            if saida:
+                output_file = caminho_saida(saida, output_file, subpastas)
+            assinatura = manifesto.assinatura(relatorio.nome, relatorio.carteiras, data_ref)
+            arquivo_anterior = _ja_gerado(diario, manifesto, relatorio.nome, assinatura, data_ref)
+            if arquivo_anterior is None and manifesto.inalterado(relatorio.nome, assinatura, data_ref, output_file):
+                manifesto.reaproveitados += 1
+                print(f"Relatório inalterado: {output_file}")
+                arquivo_anterior = output_file
+            if arquivo_anterior is not None:
+                if enviar_email:
+                    _enviar_pendente(generator, diario, relatorio.nome, relatorio.email, assinatura, arquivo_anterior, data_ref)
+                continue
+            
+            lote.append((relatorio.nome, relatorio.email, data_ref, relatorio.carteiras, output_file, assinatura))
+            if len(lote) < tamanho_lote:
+                continue
+            if len(pendentes) >= 2 * workers:
+                concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    concluir(futuro)
+            pendentes.add(executor.submit(_gerar_lote_processo, lote, bool(saida)))
+            lote = []
+        
+        if lote:
+            pendentes.add(executor.submit(_gerar_lote_processo, lote, bool(saida)))
+        while pendentes:
+            concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                concluir(futuro)
+    
+    _resumir_processos(desempenho, workers, tamanho_lote, time.perf_counter() - inicio)
+
+def _resumir_processos(desempenho, workers, tamanho_lote, segundos):
+    """Mostra a vazão total e a de cada processo do modo paralelo"""
+    total = sum(processo['relatorios'] for processo in desempenho.values())
+    if total == 0:
+        return
+    print(f"\nGeração paralela: {total} relatórios em {segundos:.1f}s ({total / segundos:,.0f} relatórios/s) "
+          f"com {workers} processos e lotes de {tamanho_lote} clientes")
+    for pid, processo in sorted(desempenho.items()):
+        vazao = processo['relatorios'] / processo['segundos'] if processo['segundos'] else 0.0
+        print(f"  Processo {pid}: {processo['relatorios']} relatórios em {processo['segundos']:.1f}s "
+              f"({vazao:,.0f} relatórios/s, {processo['bytes'] / 1024 / 1024:,.1f} MB)")
+
+def _gerar_relatorios_pipeline(relatorios, generator, enviar_email, tamanhos, manifesto, saida=None, subpastas=False, diario=None):
+    """
+    Gera os relatórios em um pipeline assíncrono: carregar → montar → renderizar → gravar → enviar.
+    
+    As etapas se sobrepõem (a gravação e a criação dos emails não param a
+    renderização dos próximos clientes), com filas limitadas entre elas.
+    Renderizar usa uma única thread (o trabalho é de CPU); gravar usa duas.
+    As mensagens de progresso das etapas passam por ``_imprimir``, para que
+    as linhas de threads diferentes não se misturem.
+    Ao final são mostradas a profundidade das filas e a latência de cada etapa.
+    """
+    def montar(relatorio):
+        data_ref = diario.data_ref if diario is not None else datetime.now()
+        output_file = generator.caminho_relatorio(relatorio.nome, data_ref=data_ref)
+        if saida:
+            output_file = caminho_saida(saida, output_file, subpastas)
+        assinatura = manifesto.assinatura(relatorio.nome, relatorio.carteiras, data_ref)
+        arquivo_anterior = _ja_gerado(diario, manifesto, relatorio.nome, assinatura, data_ref)
+        reaproveitado = arquivo_anterior is not None
+        if reaproveitado:
+            output_file = arquivo_anterior
+        elif manifesto.inalterado(relatorio.nome, assinatura, data_ref, output_file):
+            manifesto.reaproveitados += 1
+            _imprimir(f"Relatório inalterado: {output_file}")
+            reaproveitado = True
+        return {'relatorio': relatorio, 'data_ref': data_ref, 'arquivo': output_file,
+                'assinatura': assinatura, 'reaproveitado': reaproveitado, 'html': None}
+    
+    def renderizar(tarefa):
+        if not tarefa['reaproveitado']:
+            relatorio = tarefa['relatorio']
+            tarefa['html'] = generator.generate_html_email(relatorio.nome, tarefa['data_ref'], relatorio.carteiras)
+            if not tarefa['html']:
+                _registrar_falha(manifesto, relatorio.nome, tarefa['assinatura'], diario)
+                return None
+            manifesto.gerados += 1
+            _registrar_tamanho(tamanhos, generator, tarefa['arquivo'], relatorio.nome, relatorio.email,
+                               tarefa['data_ref'], relatorio.carteiras, tarefa['html'])
+        return tarefa
+    
+    def gravar(tarefa):
+        if not tarefa['reaproveitado']:
+            output_file = tarefa['arquivo']
+            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+            gravar_atomico(output_file, tarefa.pop('html'))
+            _imprimir(f"Relatório gerado: {output_file}")
+            _registrar_gravado(manifesto, tarefa['relatorio'].nome, tarefa['assinatura'], tarefa['data_ref'], output_file, diario)
+        return tarefa if enviar_email else None
+    
+    def enviar(tarefa):
+        relatorio = tarefa['relatorio']
+        _enviar_pendente(generator, diario, relatorio.nome, relatorio.email, tarefa['assinatura'], tarefa['arquivo'],
+                         tarefa['data_ref'])
+    
+    etapas = [Etapa("montar", montar, threads=0), Etapa("renderizar", renderizar), Etapa("gravar", gravar, threads=2)]
+    if enviar_email:
+        # A automação do Outlook fica em uma única thread
+        etapas.append(Etapa("enviar", enviar, inicializador=MMZRCompatibilidade.preparar_thread_email))
+    
+    pipeline = PipelineAssincrono(etapas)
+    pipeline.executar(relatorios, nome_fonte="carregar")
+    _resumir_pipeline(pipeline)
+
+def _resumir_pipeline(pipeline):
+    """Mostra, por etapa, a fila de entrada, a latência e o tempo bloqueado pela etapa seguinte"""
+    print(f"\nPipeline: {pipeline.segundos:.1f}s")
+    print(f"  {'Etapa':<11} {'Itens':>6} {'Fila máx':>8} {'Fila méd':>8} {'Lat. méd':>9} {'Lat. máx':>9} "
+          f"{'Bloqueada':>9} {'Ocupação':>8}")
+    for etapa in pipeline.estatisticas():
+        print(f"  {etapa['etapa']:<11} {etapa['processados']:>6} {etapa['fila_maxima']:>8} {etapa['fila_media']:>8.1f} "
+              f"{etapa['latencia_media'] * 1000:>7.2f}ms {etapa['latencia_maxima'] * 1000:>7.1f}ms "
+              f"{etapa['bloqueado']:>8.1f}s {etapa['ocupacao']:>8.0%}")
+        if etapa['erros']:
+            print(f"  ERRO: {etapa['erros']} itens falharam na etapa '{etapa['etapa']}' (ver log)")
+
+def _gerar_relatorios_streaming(dataset, df_clientes, generator, enviar_email, tamanhos=None, manifesto=None, escritor=None, diario=None):
+    """Gera os relatórios enquanto a planilha de rentabilidade é lida linha a linha"""
+    data_ref = diario.data_ref if diario is not None else None
+    for relatorio in _iterar_relatorios_streaming(dataset, df_clientes, generator, data_ref):
+        _emitir_relatorio(generator, relatorio.nome, relatorio.email, relatorio.carteiras, enviar_email,
+                          tamanhos, manifesto, escritor, diario)
+
+def _iterar_relatorios_streaming(dataset, df_clientes, generator, data_ref=None):
+    """
+    Produz os relatórios dos clientes enquanto a rentabilidade é lida linha a linha.
+    
+    Um cliente é emitido assim que todas as suas carteiras chegam; só ficam em
+    memória as carteiras de clientes ainda incompletos. Para códigos repetidos
+    vale a primeira linha, como no modo normal. ``data_ref`` define o mês da
+    tabela de performance (padrão: mês atual).
+    """
+    # Carteiras esperadas por código e carteiras pendentes por cliente
+    carteiras_por_codigo = {}
+    pendentes = {}
+    emails = {}
+    for posicao, (_, cliente_row) in enumerate(df_clientes.iterrows()):
+        nome_cliente = cliente_row['Nome cliente']
+        if pd.isna(nome_cliente):
+            continue
+        carteiras_por_codigo.setdefault(cliente_row['Código carteira smart'], []).append((posicao, cliente_row))
+        pendentes.setdefault(nome_cliente, set()).add(posicao)
+        emails.setdefault(nome_cliente, cliente_row['Email cliente'])
+    
+    recebidas = {}
+    
+    def emitir(nome_cliente):
+        carteiras = recebidas.pop(nome_cliente, {})
+        portfolios_data = [carteiras[posicao] for posicao in sorted(carteiras)]
+        return RelatorioCliente(nome_cliente, emails[nome_cliente], portfolios_data) if portfolios_data else None
+    
+    for registro in dataset.iterar_rentabilidade():
+        for posicao, cliente_row in carteiras_por_codigo.pop(registro['Código carteira smart'], []):
+            nome_cliente = cliente_row['Nome cliente']
+            portfolio_data = obter_dados_carteira(cliente_row, registro, generator, data_ref)
+            if portfolio_data:
+                recebidas.setdefault(nome_cliente, {})[posicao] = portfolio_data
+            
+            pendentes[nome_cliente].discard(posicao)
+            if not pendentes[nome_cliente]:
+                del pendentes[nome_cliente]
+                relatorio = emitir(nome_cliente)
+                if relatorio is not None:
+                    yield relatorio
+    
+    # Clientes com carteiras sem rentabilidade: gerar com as carteiras encontradas
+    for nome_cliente in sorted(pendentes):
+        relatorio = emitir(nome_cliente)
+        if relatorio is not None:
+            yield relatorio
 
-def obter_dados_carteira(dados_cliente, dados_rentabilidade, generator):
-    """Processa os dados de uma carteira e retorna os dados formatados"""
+def obter_dados_carteira(dados_cliente, dados_rentabilidade, generator, data_ref=None):
+    """Processa os dados de uma carteira e retorna os dados formatados (mês de ``data_ref`` ou o atual)"""
     try:
         nome_carteira = dados_cliente['Nome carteira']
         estrategia = dados_cliente['Estratégia carteira']
@@ -118,18 +660,18 @@ def obter_dados_carteira(dados_cliente, dados_rentabilidade, generator):
         
         # Criar dados de performance
         performance_data = [
-            {
-                'periodo': f"{generator.meses_pt[datetime.now().month]}:",
-                'carteira': dados_rentabilidade['Rentabilidade Carteira Mês'],
-                'benchmark': dados_rentabilidade['Benchmark Mês'],
-                'diferenca': dados_rentabilidade['Variação Relativa Mês']
-            },
-            {
-                'periodo': "No ano:",
-                'carteira': dados_rentabilidade['Rentabilidade Carteira No Ano'],
-                'benchmark': dados_rentabilidade['Benchmark No Ano'],
-                'diferenca': dados_rentabilidade['Variação Relativa No Ano']
-            }
+            LinhaPerformance(
+                periodo=f"{generator.meses_pt[(data_ref or datetime.now()).month]}:",
+                carteira=dados_rentabilidade['Rentabilidade Carteira Mês'],
+                benchmark=dados_rentabilidade['Benchmark Mês'],
+                diferenca=dados_rentabilidade['Variação Relativa Mês']
+            ),
+            LinhaPerformance(
+                periodo="No ano:",
+                carteira=dados_rentabilidade['Rentabilidade Carteira No Ano'],
+                benchmark=dados_rentabilidade['Benchmark No Ano'],
+                diferenca=dados_rentabilidade['Variação Relativa No Ano']
+            )
         ]
         
         # Extrair estratégias de destaque
@@ -161,18 +703,16 @@ def obter_dados_carteira(dados_cliente, dados_rentabilidade, generator):
                 comentarios_cliente = str(comentarios_raw).strip()
         
         # Criar dados da carteira
-        portfolio_data = {
-            'name': nome_carteira,
-            'type': estrategia,
-            'comentarios': comentarios_cliente,
-            'data': {
-                'performance': performance_data,
-                'retorno_financeiro': dados_rentabilidade['Retorno Financeiro'] if pd.notna(dados_rentabilidade['Retorno Financeiro']) else 0,
-                'estrategias_destaque': estrategias if estrategias else ["Sem estratégias de destaque"],
-                'ativos_promotores': promotores if promotores else ["Sem ativos promotores"],
-                'ativos_detratores': detratores if detratores else ["Sem ativos detratores"]
-            }
-        }
+        portfolio_data = RelatorioCarteira(
+            nome=nome_carteira,
+            tipo=estrategia,
+            comentarios=comentarios_cliente,
+            performance=performance_data,
+            retorno_financeiro=dados_rentabilidade['Retorno Financeiro'] if pd.notna(dados_rentabilidade['Retorno Financeiro']) else 0,
+            estrategias_destaque=estrategias if estrategias else ["Sem estratégias de destaque"],
+            ativos_promotores=promotores if promotores else ["Sem ativos promotores"],
+            ativos_detratores=detratores if detratores else ["Sem ativos detratores"]
+        )
         
         return portfolio_data
         
@@ -180,47 +720,105 @@ def obter_dados_carteira(dados_cliente, dados_rentabilidade, generator):
         print(f"ERRO ao processar carteira {dados_cliente['Nome carteira']}: {str(e)}")
         return None
 
-def listar_clientes_disponiveis():
-    """Lista os clientes disponíveis para relatório"""
+def _colunas_para_listas(df, colunas, vazio):
+    """Converte colunas '... 1'/'... 2' em uma lista por linha, sem os valores vazios"""
+    valores = df[colunas].to_numpy(dtype=object)
+    preenchidos = df[colunas].notna().to_numpy()
+    return [list(linha[mascara]) or [vazio] for linha, mascara in zip(valores, preenchidos)]
+
+def montar_carteiras(dataset, df_clientes, generator, data_ref=None):
+    """
+    Monta os dados de todas as carteiras de uma vez, com operações sobre colunas.
+    
+    A Base Clientes é alinhada à rentabilidade pelo índice de códigos do dataset
+    (primeira ocorrência em códigos repetidos) e as listas de estratégias e
+    ativos são extraídas das colunas '... 1'/'... 2'. Produz exatamente as mesmas
+    estruturas que obter_dados_carteira, na ordem de grupos do groupby por cliente.
+    O período mensal da tabela de performance é o mês de ``data_ref`` (padrão: mês atual).
+    
+    Returns:
+        list: RelatorioCliente de cada cliente, ordenados por nome
+    """
+    df_clientes = df_clientes[df_clientes['Nome cliente'].notna()]
+    
+    # Junção com a rentabilidade (carteiras sem dados são descartadas)
+    posicoes = df_clientes['Código carteira smart'].map(dataset.indice_rentabilidade)
+    com_dados = posicoes.notna().to_numpy()
+    carteiras = df_clientes[com_dados]
+    posicoes = posicoes[com_dados].astype(int).to_numpy()
+    rent = dataset.rentabilidade.iloc[posicoes]
+    
+    if len(carteiras) == 0:
+        return []
+    
+    # Estratégias e ativos a partir das colunas numeradas
+    estrategias = _colunas_para_listas(rent, ['Estratégia de Destaque 1', 'Estratégia de Destaque 2'], "Sem estratégias de destaque")
+    promotores = _colunas_para_listas(rent, ['Ativo Promotor 1', 'Ativo Promotor 2'], "Sem ativos promotores")
+    detratores = _colunas_para_listas(rent, ['Ativo Detrator 1', 'Ativo Detrator 2'], "Sem ativos detratores")
+    
+    # Interpretar em bloco os rótulos de promotores; a renderização os lê do cache
+    interpretar_coluna(pd.concat([rent['Ativo Promotor 1'], rent['Ativo Promotor 2']]))
+    
+    retorno = rent['Retorno Financeiro']
+    retornos = retorno.astype(object).where(retorno.notna(), 0).tolist()
+    
+    # Textos e cores da tabela de performance, formatados em bloco para toda a planilha
+    apresentacao = dataset.apresentacao.iloc[posicoes]
+    formatados_performance = zip(*(
+        zip(*(apresentacao[f'{coluna}_{periodo}'].tolist()
+              for coluna in ('cor_carteira', 'carteira', 'benchmark', 'cor_diferenca', 'diferenca')))
+        for periodo in ('mes', 'ano')
+    ))
+    formatados_retorno = zip(apresentacao['cor_retorno'].tolist(), apresentacao['retorno'].tolist())
+    
+    # Comentários da planilha (texto sem espaços nas pontas, ou None)
+    if 'Comentários' in carteiras.columns:
+        comentarios_raw = carteiras['Comentários']
+        comentarios_txt = comentarios_raw.astype(str).str.strip()
+        comentarios = comentarios_txt.where(comentarios_raw.notna() & (comentarios_txt != ''), None).tolist()
+    else:
+        comentarios = [None] * len(carteiras)
+    
+    periodo_mes = f"{generator.meses_pt[(data_ref or datetime.now()).month]}:"
+    colunas_performance = zip(
+        rent['Rentabilidade Carteira Mês'].tolist(), rent['Benchmark Mês'].tolist(), rent['Variação Relativa Mês'].tolist(),
+        rent['Rentabilidade Carteira No Ano'].tolist(), rent['Benchmark No Ano'].tolist(), rent['Variação Relativa No Ano'].tolist(),
+    )
+    
+    carteiras_por_cliente = {}
+    for nome_cliente, nome_carteira, estrategia, comentario, (cart_mes, bench_mes, dif_mes, cart_ano, bench_ano, dif_ano), \
+            (formatado_mes, formatado_ano), retorno_financeiro, retorno_formatado, \
+            estrategias_destaque, ativos_promotores, ativos_detratores in zip(
+                carteiras['Nome cliente'].tolist(), carteiras['Nome carteira'].tolist(), carteiras['Estratégia carteira'].tolist(),
+                comentarios, colunas_performance, formatados_performance, retornos, formatados_retorno,
+                estrategias, promotores, detratores):
+        carteiras_por_cliente.setdefault(nome_cliente, []).append(RelatorioCarteira(
+            nome=nome_carteira,
+            tipo=estrategia,
+            comentarios=comentario,
+            performance=[
+                LinhaPerformance(periodo_mes, cart_mes, bench_mes, dif_mes, formatado_mes),
+                LinhaPerformance("No ano:", cart_ano, bench_ano, dif_ano, formatado_ano),
+            ],
+            retorno_financeiro=retorno_financeiro,
+            retorno_formatado=retorno_formatado,
+            estrategias_destaque=estrategias_destaque,
+            ativos_promotores=ativos_promotores,
+            ativos_detratores=ativos_detratores,
+        ))
+    
+    # Email do cliente: o da primeira linha do cliente no cadastro
+    emails = df_clientes.drop_duplicates('Nome cliente').set_index('Nome cliente')['Email cliente']
+    return [RelatorioCliente(nome, emails[nome], carteiras_por_cliente[nome]) for nome in sorted(carteiras_por_cliente)]
+
+def listar_clientes_disponiveis(usar_cache=True, dataset=None):
+    """Lista os clientes disponíveis para relatório (reutiliza o dataset, se informado)"""
     try:
-        planilha_base, planilha_rentabilidade = MMZRCompatibilidade.get_planilhas_path()
-        
-        excel_base = pd.ExcelFile(planilha_base)
-        df_clientes = pd.read_excel(excel_base, sheet_name="Base Clientes")
-        df_clientes['Nome cliente'] = df_clientes['Nome cliente'].str.strip()
-        df_clientes = df_clientes[df_clientes['Nome cliente'] != 'Nome Cliente']
-        
-        if "Base Consolidada" in excel_base.sheet_names:
-            df_consolidada = pd.read_excel(excel_base, sheet_name="Base Consolidada")
-            df_consolidada['NomeCompletoCliente'] = df_consolidada['NomeCompletoCliente'].str.strip()
-            
-            df_clientes = df_clientes.merge(
-                df_consolidada[['NomeCompletoCliente', 'EmailCliente']], 
-                left_on='Nome cliente', 
-                right_on='NomeCompletoCliente', 
-                how='left'
-            )
-            
-            df_clientes['Email cliente'] = df_clientes['EmailCliente']
-            
-            clientes_sem_email = df_clientes['Email cliente'].isna()
-            if clientes_sem_email.any():
-                df_clientes.loc[clientes_sem_email, 'Email cliente'] = df_clientes.loc[clientes_sem_email, 'Nome cliente'].apply(
-                    lambda nome: f"{nome.lower().replace(' ', '.')}@example.com"
-                )
-        else:
-            df_clientes['Email cliente'] = df_clientes['Nome cliente'].apply(
-                lambda nome: f"{nome.lower().replace(' ', '.')}@example.com"
-            )
-        
-        # Carregar planilha de rentabilidade
-        excel_rent = pd.ExcelFile(planilha_rentabilidade)
-        primeira_aba = excel_rent.sheet_names[0]
-        df_rentabilidade = pd.read_excel(excel_rent, sheet_name=primeira_aba)
+        if dataset is None:
+            dataset = MMZRDataset.carregar(usar_cache=usar_cache)
         
         # Identificar clientes com dados de rentabilidade disponíveis
-        codigos_com_rentabilidade = set(df_rentabilidade['Código carteira smart'])
-        df_clientes_com_rentabilidade = df_clientes[df_clientes['Código carteira smart'].isin(codigos_com_rentabilidade)]
+        df_clientes_com_rentabilidade = dataset.clientes_com_rentabilidade
         
         clientes_por_nome = df_clientes_com_rentabilidade.groupby('Nome cliente')
         
@@ -249,31 +847,163 @@ if __name__ == "__main__":
     compat = MMZRCompatibilidade.testar_compatibilidade()
     
     # Processar argumentos de linha de comando
+    usar_cache = "--sem-cache" not in sys.argv
+    if not usar_cache:
+        sys.argv.remove("--sem-cache")
+    
+    streaming = "--streaming" in sys.argv
+    if streaming:
+        sys.argv.remove("--streaming")
+    
+    logo_mode = "cid" if "--logo-cid" in sys.argv else "inline"
+    if logo_mode == "cid":
+        sys.argv.remove("--logo-cid")
+    
+    compacto = "--compacto" in sys.argv
+    if compacto:
+        sys.argv.remove("--compacto")
+    
+    medir_compactacao = "--medir-compactacao" in sys.argv
+    if medir_compactacao:
+        sys.argv.remove("--medir-compactacao")
+    
+    incremental = "--forcar" not in sys.argv
+    if not incremental:
+        sys.argv.remove("--forcar")
+    
+    pacote = None
+    if "--pacote" in sys.argv:
+        indice_opcao = sys.argv.index("--pacote")
+        if indice_opcao + 1 >= len(sys.argv):
+            print("ERRO: informe o arquivo do pacote (ex.: --pacote relatorios.zip)")
+            sys.exit(1)
+        pacote = sys.argv[indice_opcao + 1]
+        del sys.argv[indice_opcao:indice_opcao + 2]
+    
+    saida = None
+    if "--saida" in sys.argv:
+        indice_opcao = sys.argv.index("--saida")
+        if indice_opcao + 1 >= len(sys.argv):
+            print("ERRO: informe a pasta de saída (ex.: --saida relatorios)")
+            sys.exit(1)
+        saida = sys.argv[indice_opcao + 1]
+        del sys.argv[indice_opcao:indice_opcao + 2]
+    
+    subpastas = "--subpastas" in sys.argv
+    if subpastas:
+        sys.argv.remove("--subpastas")
+    
+    pipeline = "--pipeline" in sys.argv
+    if pipeline:
+        sys.argv.remove("--pipeline")
+    
+    retomar = "--resume" in sys.argv
+    if retomar:
+        sys.argv.remove("--resume")
+    
+    # Todos os clientes sem perguntas (cron, shards, --resume em segundo plano)
+    todos = "--todos" in sys.argv
+    if todos:
+        sys.argv.remove("--todos")
+    
+    shard = None
+    if "--shard" in sys.argv:
+        indice_opcao = sys.argv.index("--shard")
+        try:
+            shard = tuple(int(parte) for parte in sys.argv[indice_opcao + 1].split("/"))
+            if len(shard) != 2 or not 1 <= shard[0] <= shard[1]:
+                raise ValueError
+        except (IndexError, ValueError):
+            print("ERRO: informe o shard como i/N, com 1 <= i <= N (ex.: --shard 1/4)")
+            sys.exit(1)
+        del sys.argv[indice_opcao:indice_opcao + 2]
+    
+    if "--juntar-manifestos" in sys.argv:
+        # Todos os argumentos seguintes são manifestos de shards
+        indice_opcao = sys.argv.index("--juntar-manifestos")
+        caminhos = sys.argv[indice_opcao + 1:]
+        if not caminhos:
+            print("ERRO: informe os manifestos dos shards (ex.: --juntar-manifestos .mmzr_manifesto.*de4.json)")
+            sys.exit(1)
+        destino = _caminho_controle(saida, NOME_MANIFESTO_JUNTADO)
+        sys.exit(0 if juntar_shards(caminhos, destino) else 1)
+    
+    workers = 1
+    tamanho_lote = TAMANHO_LOTE_PADRAO
+    for opcao in ("--workers", "--lote"):
+        if opcao not in sys.argv:
+            continue
+        indice_opcao = sys.argv.index(opcao)
+        try:
+            valor = int(sys.argv[indice_opcao + 1])
+            if valor < 0 or (opcao == "--lote" and valor == 0):
+                raise ValueError
+        except (IndexError, ValueError):
+            print(f"ERRO: informe um número inteiro positivo para {opcao} (ex.: {opcao} 4)")
+            sys.exit(1)
+        del sys.argv[indice_opcao:indice_opcao + 2]
+        if opcao == "--workers":
+            # --workers 0 usa um processo por núcleo
+            workers = valor or os.cpu_count() or 1
+        else:
+            tamanho_lote = valor
+    
+    # Opções da execução, repassadas a todas as chamadas de gerar_relatorio_integrado abaixo
+    opcoes = dict(usar_cache=usar_cache, streaming=streaming, logo_mode=logo_mode, compacto=compacto,
+                  medir_compactacao=medir_compactacao, incremental=incremental, pacote=pacote, saida=saida,
+                  subpastas=subpastas, workers=workers, tamanho_lote=tamanho_lote, pipeline=pipeline,
+                  shard=shard, retomar=retomar)
+    
     if len(sys.argv) > 1:
         if sys.argv[1] == "--help" or sys.argv[1] == "-h":
             print("\n=== MMZR GERADOR DE RELATÓRIOS ===")
             print("Uso: python mmzr_integracao_real.py [opções]")
             print("\nOpções:")
             print("  --cliente \"[NOME OU EMAIL]\"  Gera relatório para cliente específico")
+            print("  --todos                     Gera os relatórios de todos os clientes, sem perguntas")
             print("  --enviar                    Envia o relatório por email")
             print("  --listar                    Lista clientes disponíveis")
+            print("  --sem-cache                 Ignora o cache e relê as planilhas Excel")
+            print("  --streaming                 Lê a rentabilidade linha a linha (memória constante)")
+            print("  --logo-cid                  Logo como anexo (cid:) em vez de base64 em cada HTML")
+            print("  --compacto                  HTML minificado (menor em disco e no envio)")
+            print("  --medir-compactacao         Com --compacto, mede a economia contra o HTML normal")
+            print("  --forcar                    Regera todos os relatórios, mesmo os sem alterações")
+            print("  --pacote ARQUIVO.zip        Grava todos os relatórios em um único zip com índice")
+            print("  --saida PASTA               Grava os relatórios nessa pasta, em segundo plano")
+            print("  --subpastas                 Com --saida, distribui os arquivos em subpastas")
+            print("  --pipeline                  Sobrepõe montagem, renderização, gravação e envio (filas limitadas)")
+            print("  --resume                    Retoma um lote interrompido (pula clientes já concluídos)")
+            print("  --shard i/N                 Gera só os clientes do shard i de N (divisão estável por nome)")
+            print(f"  --juntar-manifestos ARQ...  Combina os manifestos dos shards em {NOME_MANIFESTO_JUNTADO}, com resumo")
+            print("  --workers N                 Gera os relatórios em N processos (0 = um por núcleo)")
+            print(f"  --lote M                    Clientes por lote enviado a cada processo (padrão: {TAMANHO_LOTE_PADRAO})")
             print("  --help, -h                  Mostra esta ajuda")
             sys.exit(0)
         
         if sys.argv[1] == "--listar":
-            listar_clientes_disponiveis()
+            listar_clientes_disponiveis(usar_cache)
             sys.exit(0)
         
         if sys.argv[1] == "--cliente" and len(sys.argv) > 2:
             nome_ou_email_cliente = sys.argv[2]
             enviar_email = "--enviar" in sys.argv
             
-            planilha_base, planilha_rentabilidade = MMZRCompatibilidade.get_planilhas_path()
-            gerar_relatorio_integrado(planilha_base, planilha_rentabilidade, nome_ou_email_cliente, enviar_email)
+            gerar_relatorio_integrado(nome_ou_email_cliente=nome_ou_email_cliente, enviar_email=enviar_email, **opcoes)
             sys.exit(0)
     
-    # Por padrão, listar clientes disponíveis
-    clientes = listar_clientes_disponiveis()
+    if todos:
+        gerar_relatorio_integrado(enviar_email="--enviar" in sys.argv, **opcoes)
+        sys.exit(0)
+    
+    # Por padrão, listar clientes disponíveis (planilhas lidas uma única vez na sessão)
+    try:
+        dataset = MMZRDataset.carregar(usar_cache=usar_cache)
+    except Exception as e:
+        print(f"ERRO ao carregar planilhas: {str(e)}")
+        sys.exit(1)
+    
+    clientes = listar_clientes_disponiveis(dataset=dataset)
     
     if clientes:
         try:
@@ -281,9 +1011,9 @@ if __name__ == "__main__":
             enviar = input("Criar e-mail? (s/N): ").lower() == 's'
             
             if nome_ou_email.strip():
-                gerar_relatorio_integrado(nome_ou_email_cliente=nome_ou_email, enviar_email=enviar)
+                gerar_relatorio_integrado(nome_ou_email_cliente=nome_ou_email, enviar_email=enviar, dataset=dataset, **opcoes)
             else:
-                gerar_relatorio_integrado(enviar_email=enviar)
+                gerar_relatorio_integrado(enviar_email=enviar, dataset=dataset, **opcoes)
         except KeyboardInterrupt:
             print("\nOperação cancelada.")
             sys.exit(1)
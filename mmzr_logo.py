@@ -0,0 +1,109 @@
+"""
+MMZR Family Office - Logo dos Relatórios
+
+Este módulo localiza a logo usada no cabeçalho dos relatórios e a mantém em
+memória uma única vez por processo. A leitura e a conversão para base64 só
+são refeitas quando o arquivo da logo muda (tamanho ou data de modificação),
+de forma que criar vários geradores na mesma execução não relê o disco.
+
+A logo pode ser referenciada de duas formas no HTML:
+    - ``inline``: data URI base64 embutido em cada relatório (padrão)
+    - ``cid``: referência ``cid:`` a um anexo incluído uma vez por mensagem
+      MIME, o que retira o base64 de cada relatório
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import os
+import base64
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Arquivos procurados, em ordem de preferência
+CAMINHOS_LOGO = [
+    "documentos/img/logo-MMZR-azul.png",
+    "documentos/img/LogoAzul_MMZR.jpg"
+]
+
+# Content-ID do anexo da logo no modo "cid"
+CONTENT_ID_LOGO = "logo-mmzr@mmzrfo.com.br"
+
+MODOS_LOGO = ("inline", "cid")
+
+
+class Logo(NamedTuple):
+    """
+    Logo carregada do disco.
+
+    Attributes:
+        caminho (str): Caminho absoluto do arquivo
+        mime_type (str): Tipo MIME da imagem (ex.: image/png)
+        conteudo (bytes): Bytes da imagem
+        data_uri (str): Imagem como data URI base64
+    """
+    caminho: str
+    mime_type: str
+    conteudo: bytes
+    data_uri: str
+
+    @property
+    def src_cid(self) -> str:
+        """Valor do atributo src que referencia o anexo da logo."""
+        return f"cid:{CONTENT_ID_LOGO}"
+
+
+# Logos já carregadas neste processo: (caminho, tamanho, mtime) -> Logo
+_logos_carregadas: Dict[Tuple[str, int, int], Logo] = {}
+
+
+def _tipo_mime(caminho: str) -> str:
+    """Determina o tipo MIME baseado na extensão."""
+    if caminho.lower().endswith('.png'):
+        return 'image/png'
+    elif caminho.lower().endswith('.jpg') or caminho.lower().endswith('.jpeg'):
+        return 'image/jpeg'
+    return 'image/png'  # default
+
+
+def carregar_logo() -> Optional[Logo]:
+    """
+    Retorna a logo dos relatórios, lendo o arquivo apenas se ele mudou.
+
+    Returns:
+        Optional[Logo]: Logo encontrada ou None se nenhum arquivo existir
+    """
+    for logo_path in CAMINHOS_LOGO:
+        try:
+            if not os.path.exists(logo_path):
+                continue
+
+            caminho_abs = os.path.abspath(logo_path)
+            stat = os.stat(caminho_abs)
+            chave = (caminho_abs, stat.st_size, stat.st_mtime_ns)
+
+            logo = _logos_carregadas.get(chave)
+            if logo is None:
+                with open(caminho_abs, "rb") as image_file:
+                    conteudo = image_file.read()
+                mime_type = _tipo_mime(logo_path)
+                base64_string = base64.b64encode(conteudo).decode('utf-8')
+                logo = Logo(caminho_abs, mime_type, conteudo, f"data:{mime_type};base64,{base64_string}")
+
+                # Versões anteriores do mesmo arquivo deixam de ser úteis
+                for antiga in [c for c in _logos_carregadas if c[0] == caminho_abs]:
+                    del _logos_carregadas[antiga]
+                _logos_carregadas[chave] = logo
+                logger.info(f"Logo carregada e convertida para base64: {logo_path}")
+
+            return logo
+
+        except Exception as e:
+            logger.warning(f"Erro ao carregar logo {logo_path}: {e}")
+            continue
+
+    return None
@@ -0,0 +1,319 @@
+"""
+MMZR Family Office - Manifesto dos Relatórios Gerados
+
+Este módulo registra, para cada cliente, o hash dos dados que entraram no
+relatório, a versão do template e o mês de referência, em um arquivo JSON
+(``.mmzr_manifesto.json``) na pasta em que os relatórios são gravados.
+
+Ao reexecutar o lote (por exemplo, depois de corrigir uma linha da planilha
+de rentabilidade), só os clientes cujo hash mudou são renderizados e
+regravados; os demais reaproveitam o arquivo já existente. O hash cobre
+tudo o que aparece no relatório: nome do cliente, data, carteiras, valores,
+comentários e a configuração do gerador (template, modo compacto e logo).
+
+Em uma execução dividida em shards (``--shard i/N``), cada shard grava o
+próprio manifesto (``.mmzr_manifesto.1de4.json``...), e ``juntar_manifestos``
+os combina em um único manifesto (``.mmzr_manifesto.juntado.json``) com o
+resumo da execução.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from mmzr_modelos import DadosCarteira, como_carteira
+from mmzr_template import TEMPLATE_VERSION
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+NOME_MANIFESTO = ".mmzr_manifesto.json"
+
+# Destino padrão da junção dos manifestos dos shards (nunca um dos manifestos de origem)
+NOME_MANIFESTO_JUNTADO = ".mmzr_manifesto.juntado.json"
+
+
+def nome_manifesto_shard(indice: int, total: int) -> str:
+    """Nome do manifesto de um shard (ex.: ``.mmzr_manifesto.1de4.json``)."""
+    return f".mmzr_manifesto.{indice}de{total}.json"
+
+
+class MMZRManifesto:
+    """
+    Manifesto dos relatórios gerados, indexado pelo nome do cliente.
+
+    Cada entrada guarda o hash dos dados de entrada, a versão do template, o
+    mês de referência (AAAA-MM), o arquivo gravado e o tamanho/data de
+    modificação desse arquivo. Um relatório só é reaproveitado se todos
+    coincidirem, o que também cobre arquivos apagados ou sobrescritos.
+
+    Attributes:
+        caminho (str): Arquivo JSON do manifesto
+        configuracao_gerador (str): Configuração do gerador incluída nos hashes
+        reaproveitar (bool): Se False, todos os relatórios são regenerados
+            (o manifesto continua sendo atualizado)
+        entradas (Dict[str, Dict[str, Any]]): Cliente -> entrada
+        reaproveitados (int): Relatórios reaproveitados nesta execução
+        gerados (int): Relatórios gerados nesta execução
+        shard (Optional[str]): Shard da execução ("i/N"), gravado no resumo
+    """
+
+    # Incrementar quando o formato do arquivo mudar
+    VERSAO_FORMATO = 1
+
+    def __init__(self, caminho: str = NOME_MANIFESTO, configuracao_gerador: str = "",
+                 reaproveitar: bool = True) -> None:
+        """
+        Inicializa um manifesto vazio.
+
+        Args:
+            caminho (str): Arquivo JSON do manifesto
+            configuracao_gerador (str): Configuração do gerador que afeta o HTML
+                (ver ``assinatura_gerador``)
+            reaproveitar (bool): Se relatórios inalterados podem ser pulados
+        """
+        self.caminho = caminho
+        self.configuracao_gerador = configuracao_gerador
+        self.reaproveitar = reaproveitar
+        self.entradas: Dict[str, Dict[str, Any]] = {}
+        self.reaproveitados = 0
+        self.gerados = 0
+        self.shard: Optional[str] = None
+
+    @classmethod
+    def carregar(cls, generator: Any, caminho: str = NOME_MANIFESTO, reaproveitar: bool = True) -> "MMZRManifesto":
+        """
+        Lê o manifesto do disco (ou cria um vazio) para o gerador informado.
+
+        Args:
+            generator (MMZREmailGenerator): Gerador que produzirá os relatórios
+            caminho (str): Arquivo JSON do manifesto
+            reaproveitar (bool): Se relatórios inalterados podem ser pulados
+
+        Returns:
+            MMZRManifesto: Manifesto pronto para consulta
+        """
+        manifesto = cls(caminho, cls.assinatura_gerador(generator), reaproveitar)
+        if not os.path.exists(caminho):
+            return manifesto
+
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                conteudo = json.load(f)
+            if conteudo.get('versao_formato') == cls.VERSAO_FORMATO:
+                manifesto.entradas = conteudo.get('clientes', {})
+            else:
+                logger.info("Manifesto em formato antigo; todos os relatórios serão regenerados")
+        except Exception as e:
+            logger.warning(f"Manifesto inválido, todos os relatórios serão regenerados: {e}")
+        return manifesto
+
+    @staticmethod
+    def assinatura_gerador(generator: Any) -> str:
+        """
+        Resume a configuração do gerador que altera o HTML produzido.
+
+        Args:
+            generator (MMZREmailGenerator): Gerador de emails
+
+        Returns:
+            str: Versão do template, modo compacto, modo e conteúdo da logo
+        """
+        template = generator.template
+        logo = getattr(generator, 'logo', None)
+        hash_logo = hashlib.sha256(logo.conteudo).hexdigest() if logo is not None else ""
+        return f"{template.versao}|{template.compacto}|{generator.logo_mode}|{hash_logo}"
+
+    def assinatura(self, nome_cliente: str, carteiras: Iterable[DadosCarteira], data_ref: datetime) -> str:
+        """
+        Calcula o hash dos dados de entrada do relatório de um cliente.
+
+        Os textos já formatados em bloco não entram no hash, pois derivam dos
+        valores numéricos; assim o modo normal e o modo streaming coincidem.
+
+        Args:
+            nome_cliente (str): Nome do cliente
+            carteiras (Iterable[DadosCarteira]): Carteiras do relatório
+            data_ref (datetime): Data de referência (exibida no relatório)
+
+        Returns:
+            str: Hash SHA-256 hexadecimal
+        """
+        partes = [self.configuracao_gerador, nome_cliente, data_ref.strftime('%Y-%m-%d')]
+        for carteira in map(como_carteira, carteiras):
+            partes.append(repr((
+                carteira.nome, carteira.tipo, carteira.comentarios,
+                [(linha.periodo, linha.carteira, linha.benchmark, linha.diferenca) for linha in carteira.performance],
+                carteira.retorno_financeiro, carteira.estrategias_destaque,
+                carteira.ativos_promotores, carteira.ativos_detratores,
+            )))
+        return hashlib.sha256("\x1f".join(partes).encode('utf-8')).hexdigest()
+
+    def inalterado(self, nome_cliente: str, assinatura: str, data_ref: datetime, arquivo: str) -> bool:
+        """
+        Indica se o relatório já gravado pode ser reaproveitado.
+
+        Args:
+            nome_cliente (str): Nome do cliente
+            assinatura (str): Hash calculado por ``assinatura``
+            data_ref (datetime): Data de referência do relatório
+            arquivo (str): Arquivo em que o relatório seria gravado
+
+        Returns:
+            bool: True se o hash, o template, o mês e o arquivo coincidem
+        """
+        if not self.reaproveitar:
+            return False
+
+        entrada = self.entradas.get(nome_cliente)
+        if entrada is None:
+            return False
+        if (entrada.get('hash') != assinatura
+                or entrada.get('versao_template') != TEMPLATE_VERSION
+                or entrada.get('referencia') != data_ref.strftime('%Y-%m')
+                or entrada.get('arquivo') != arquivo):
+            return False
+
+        try:
+            stat = os.stat(arquivo)
+        except OSError:
+            return False
+        return entrada.get('tamanho') == stat.st_size and entrada.get('mtime_ns') == stat.st_mtime_ns
+
+    def registrar(self, nome_cliente: str, assinatura: str, data_ref: datetime, arquivo: str) -> None:
+        """
+        Registra o relatório recém-gravado de um cliente.
+
+        Args:
+            nome_cliente (str): Nome do cliente
+            assinatura (str): Hash calculado por ``assinatura``
+            data_ref (datetime): Data de referência do relatório
+            arquivo (str): Arquivo gravado
+        """
+        stat = os.stat(arquivo)
+        self.entradas[nome_cliente] = {
+            'hash': assinatura,
+            'versao_template': TEMPLATE_VERSION,
+            'referencia': data_ref.strftime('%Y-%m'),
+            'arquivo': arquivo,
+            'tamanho': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    def esquecer(self, nome_cliente: str) -> None:
+        """Remove a entrada de um cliente (ex.: relatório que falhou)."""
+        self.entradas.pop(nome_cliente, None)
+
+    def resumo(self) -> Dict[str, Any]:
+        """Resumo desta execução, gravado junto com as entradas."""
+        return {
+            'shard': self.shard,
+            'gerados': self.gerados,
+            'reaproveitados': self.reaproveitados,
+            'data': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def salvar(self) -> None:
+        """Grava o manifesto de forma atômica (arquivo temporário + rename)."""
+        _gravar_json(self.caminho, {'versao_formato': self.VERSAO_FORMATO, 'execucao': self.resumo(),
+                                    'clientes': self.entradas})
+
+
+def _gravar_json(caminho: str, conteudo: Dict[str, Any]) -> None:
+    """Grava um manifesto de forma atômica; falhas são registradas no log."""
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    try:
+        fd, caminho_tmp = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(conteudo, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(caminho_tmp, caminho)
+    except Exception as e:
+        logger.warning(f"Não foi possível gravar o manifesto {caminho}: {e}")
+
+
+def juntar_manifestos(caminhos: List[str], destino: str = NOME_MANIFESTO_JUNTADO) -> Dict[str, Any]:
+    """
+    Combina os manifestos dos shards de uma execução em um único manifesto.
+
+    Um cliente presente em mais de um manifesto (shards de execuções com
+    quantidades diferentes de shards, por exemplo) fica com o relatório
+    gravado por último e é contado em 'repetidos'.
+
+    Args:
+        caminhos (List[str]): Manifestos dos shards
+        destino (str): Manifesto combinado a gravar
+
+    Returns:
+        Dict[str, Any]: Resumo da execução: 'shards' (arquivo, shard, clientes,
+            gerados e reaproveitados de cada manifesto), 'clientes', 'bytes',
+            'referencias' (meses), 'repetidos' e 'faltando' (shards de 1..N sem
+            manifesto)
+
+    Raises:
+        ValueError: Se um manifesto não puder ser lido ou tiver outro formato,
+            ou se o destino for um dos manifestos de origem
+    """
+    if os.path.abspath(destino) in {os.path.abspath(caminho) for caminho in caminhos}:
+        raise ValueError(f"O manifesto combinado não pode substituir um dos manifestos de origem: {destino}")
+
+    clientes: Dict[str, Dict[str, Any]] = {}
+    shards = []
+    repetidos = 0
+    totais = set()
+    presentes = set()
+    for caminho in caminhos:
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                conteudo = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Manifesto inválido: {caminho}: {e}")
+        if conteudo.get('versao_formato') != MMZRManifesto.VERSAO_FORMATO:
+            raise ValueError(f"Formato de manifesto não suportado: {caminho}")
+
+        execucao = conteudo.get('execucao') or {}
+        entradas = conteudo.get('clientes', {})
+        for nome, entrada in entradas.items():
+            anterior = clientes.get(nome)
+            if anterior is not None:
+                repetidos += 1
+                if anterior.get('mtime_ns', 0) >= entrada.get('mtime_ns', 0):
+                    continue
+            clientes[nome] = entrada
+
+        shard = execucao.get('shard')
+        if shard:
+            indice, total = (int(parte) for parte in shard.split('/'))
+            presentes.add(indice)
+            totais.add(total)
+        shards.append({
+            'arquivo': caminho,
+            'shard': shard,
+            'clientes': len(entradas),
+            'gerados': execucao.get('gerados'),
+            'reaproveitados': execucao.get('reaproveitados'),
+        })
+
+    faltando = []
+    if len(totais) == 1:
+        faltando = sorted(set(range(1, totais.pop() + 1)) - presentes)
+
+    resumo = {
+        'shards': shards,
+        'clientes': len(clientes),
+        'bytes': sum(entrada.get('tamanho', 0) for entrada in clientes.values()),
+        'referencias': sorted({entrada.get('referencia') for entrada in clientes.values() if entrada.get('referencia')}),
+        'repetidos': repetidos,
+        'faltando': faltando,
+    }
+    _gravar_json(destino, {'versao_formato': MMZRManifesto.VERSAO_FORMATO,
+                           'execucao': {'shards': shards, 'data': datetime.now().isoformat(timespec='seconds')},
+                           'clientes': clientes})
+    return resumo
@@ -0,0 +1,196 @@
+"""
+MMZR Family Office - Modelo de Dados dos Relatórios
+
+Este módulo define os registros que a integração com as planilhas monta e o
+gerador de emails renderiza: uma linha da tabela de performance, uma carteira
+e o relatório de um cliente. São classes com ``__slots__`` (sem ``__dict__``
+por instância), o que reduz a memória ocupada quando o mês inteiro de
+carteiras fica carregado e torna o acesso aos campos mais barato que as
+consultas ``.get`` nos dicionários aninhados usados anteriormente.
+
+O formato em dicionário continua aceito pelo gerador: ``de_dict``/``para_dict``
+fazem a conversão entre os dois formatos.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+class _Registro:
+    """Base dos registros: representação e comparação a partir dos slots."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        campos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+    def __eq__(self, outro: object) -> bool:
+        if type(outro) is not type(self):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(outro, campo) for campo in self.__slots__)
+
+
+class LinhaPerformance(_Registro):
+    """
+    Linha da tabela de performance de uma carteira.
+
+    Attributes:
+        periodo (str): Rótulo do período (ex.: "Outubro:", "No ano:")
+        carteira (float): Rentabilidade da carteira no período (%)
+        benchmark (float): Rentabilidade do benchmark no período (%)
+        diferenca (float): Diferença carteira - benchmark (p.p.)
+        formatado (Optional[Tuple[str, ...]]): Textos e cores já calculados
+            (cor_carteira, carteira, benchmark, cor_diferenca, diferenca), ou None
+    """
+
+    __slots__ = ('periodo', 'carteira', 'benchmark', 'diferenca', 'formatado')
+
+    def __init__(self, periodo: str, carteira: float, benchmark: float, diferenca: float,
+                 formatado: Optional[Tuple[str, ...]] = None) -> None:
+        self.periodo = periodo
+        self.carteira = carteira
+        self.benchmark = benchmark
+        self.diferenca = diferenca
+        self.formatado = formatado
+
+    @classmethod
+    def de_dict(cls, dados: Dict[str, Any]) -> "LinhaPerformance":
+        """
+        Cria a linha a partir do formato em dicionário.
+
+        Args:
+            dados (Dict[str, Any]): Chaves 'periodo', 'carteira', 'benchmark',
+                'diferenca' e, opcionalmente, 'formatado'
+
+        Returns:
+            LinhaPerformance: Linha equivalente
+
+        Raises:
+            KeyError: Se faltar a chave 'periodo'
+        """
+        return cls(dados['periodo'], dados.get('carteira'), dados.get('benchmark'),
+                   dados.get('diferenca'), dados.get('formatado'))
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Converte a linha para o formato em dicionário."""
+        dados = {'periodo': self.periodo, 'carteira': self.carteira,
+                 'benchmark': self.benchmark, 'diferenca': self.diferenca}
+        if self.formatado is not None:
+            dados['formatado'] = self.formatado
+        return dados
+
+
+class RelatorioCarteira(_Registro):
+    """
+    Dados de uma carteira exibidos no relatório.
+
+    Attributes:
+        nome (str): Nome da carteira
+        tipo (str): Estratégia da carteira
+        comentarios (Optional[str]): Comentário da planilha para a carteira
+        performance (List[LinhaPerformance]): Linhas da tabela de performance
+        retorno_financeiro (Optional[float]): Retorno financeiro (None omite a linha)
+        retorno_formatado (Optional[Tuple[str, str]]): (cor, texto) já calculados, ou None
+        estrategias_destaque (List[str]): Estratégias de destaque
+        ativos_promotores (List[str]): Rótulos dos ativos promotores
+        ativos_detratores (List[str]): Rótulos dos ativos detratores
+    """
+
+    __slots__ = ('nome', 'tipo', 'comentarios', 'performance', 'retorno_financeiro', 'retorno_formatado',
+                 'estrategias_destaque', 'ativos_promotores', 'ativos_detratores')
+
+    def __init__(self, nome: str = 'Carteira', tipo: str = 'Diversificada', comentarios: Optional[str] = None,
+                 performance: Optional[List[LinhaPerformance]] = None, retorno_financeiro: Optional[float] = 0,
+                 retorno_formatado: Optional[Tuple[str, str]] = None,
+                 estrategias_destaque: Optional[List[str]] = None, ativos_promotores: Optional[List[str]] = None,
+                 ativos_detratores: Optional[List[str]] = None) -> None:
+        self.nome = nome
+        self.tipo = tipo
+        self.comentarios = comentarios
+        self.performance = performance if performance is not None else []
+        self.retorno_financeiro = retorno_financeiro
+        self.retorno_formatado = retorno_formatado
+        self.estrategias_destaque = estrategias_destaque if estrategias_destaque is not None else []
+        self.ativos_promotores = ativos_promotores if ativos_promotores is not None else []
+        self.ativos_detratores = ativos_detratores if ativos_detratores is not None else []
+
+    @classmethod
+    def de_dict(cls, dados: Dict[str, Any]) -> "RelatorioCarteira":
+        """
+        Cria a carteira a partir do formato em dicionário.
+
+        Segue os mesmos valores padrão que o gerador aplicava ao ler o
+        dicionário ('Carteira', 'Diversificada', retorno 0, listas vazias).
+
+        Args:
+            dados (Dict[str, Any]): {'name', 'type', 'comentarios', 'data': {...}}
+
+        Returns:
+            RelatorioCarteira: Carteira equivalente
+        """
+        data = dados.get('data', {})
+        return cls(
+            nome=dados.get('name', 'Carteira'),
+            tipo=dados.get('type', 'Diversificada'),
+            comentarios=dados.get('comentarios', ''),
+            performance=[LinhaPerformance.de_dict(linha) for linha in data.get('performance', [])],
+            retorno_financeiro=data.get('retorno_financeiro', 0),
+            retorno_formatado=data.get('retorno_formatado'),
+            estrategias_destaque=data.get('estrategias_destaque', []),
+            ativos_promotores=data.get('ativos_promotores', []),
+            ativos_detratores=data.get('ativos_detratores', []),
+        )
+
+    def para_dict(self) -> Dict[str, Any]:
+        """Converte a carteira para o formato em dicionário."""
+        data = {
+            'performance': [linha.para_dict() for linha in self.performance],
+            'retorno_financeiro': self.retorno_financeiro,
+            'estrategias_destaque': self.estrategias_destaque,
+            'ativos_promotores': self.ativos_promotores,
+            'ativos_detratores': self.ativos_detratores,
+        }
+        if self.retorno_formatado is not None:
+            data['retorno_formatado'] = self.retorno_formatado
+        return {'name': self.nome, 'type': self.tipo, 'comentarios': self.comentarios, 'data': data}
+
+
+class RelatorioCliente(_Registro):
+    """
+    Relatório mensal de um cliente.
+
+    Attributes:
+        nome (str): Nome do cliente
+        email (str): Email do cliente
+        carteiras (List[RelatorioCarteira]): Carteiras exibidas, na ordem do relatório
+    """
+
+    __slots__ = ('nome', 'email', 'carteiras')
+
+    def __init__(self, nome: str, email: str, carteiras: Optional[List[RelatorioCarteira]] = None) -> None:
+        self.nome = nome
+        self.email = email
+        self.carteiras = carteiras if carteiras is not None else []
+
+
+# Carteira em qualquer dos formatos aceitos pelo gerador
+DadosCarteira = Union[RelatorioCarteira, Dict[str, Any]]
+
+
+def como_carteira(carteira: DadosCarteira) -> RelatorioCarteira:
+    """
+    Aceita uma carteira em qualquer dos dois formatos.
+
+    Args:
+        carteira (DadosCarteira): RelatorioCarteira ou dicionário no formato antigo
+
+    Returns:
+        RelatorioCarteira: A própria carteira ou sua conversão
+    """
+    if isinstance(carteira, RelatorioCarteira):
+        return carteira
+    return RelatorioCarteira.de_dict(carteira)
@@ -0,0 +1,208 @@
+"""
+MMZR Family Office - Pacote de Relatórios
+
+Este módulo grava todos os relatórios de uma execução em um único arquivo
+zip, em vez de um arquivo HTML por cliente na pasta atual. As entradas são
+gravadas em sequência e comprimidas (deflate), e o pacote termina com um
+índice (``indice.json``) que associa cada cliente à sua entrada.
+
+O formato zip foi escolhido (e não tar.gz) porque guarda um diretório
+central: a leitura de um cliente vai direto à sua entrada, sem descomprimir
+os demais relatórios do pacote.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import io
+import json
+import zipfile
+import logging
+from datetime import datetime
+from typing import Any, Dict, IO, List, Optional
+
+from mmzr_modelos import DadosCarteira
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+NOME_INDICE = "indice.json"
+
+# Nível de compressão do deflate (1 = rápido, 9 = menor)
+NIVEL_COMPRESSAO = 6
+
+
+class PacoteRelatorios:
+    """
+    Escritor de um pacote zip com os relatórios de uma execução.
+
+    Uso::
+
+        with PacoteRelatorios("relatorios_202610.zip") as pacote:
+            pacote.adicionar(generator, nome, email, data_ref, carteiras)
+
+    Attributes:
+        caminho (str): Arquivo zip gravado
+        indice (Dict[str, Dict[str, Any]]): Cliente -> entrada, email e tamanho
+    """
+
+    # Incrementar quando o formato do índice mudar
+    VERSAO_FORMATO = 1
+
+    def __init__(self, caminho: str, nivel_compressao: int = NIVEL_COMPRESSAO) -> None:
+        """
+        Cria o pacote (um arquivo existente é substituído).
+
+        Args:
+            caminho (str): Arquivo zip de saída
+            nivel_compressao (int): Nível do deflate (1 a 9)
+        """
+        self.caminho = caminho
+        self.indice: Dict[str, Dict[str, Any]] = {}
+        self._nomes_usados = set()
+        self._nivel_compressao = nivel_compressao
+        self._zip = zipfile.ZipFile(caminho, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=nivel_compressao)
+
+    def __enter__(self) -> "PacoteRelatorios":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.fechar()
+
+    def _nome_entrada(self, nome_arquivo: str) -> str:
+        """Nome da entrada no zip, sem repetir nomes já usados no pacote."""
+        nome, n = nome_arquivo, 1
+        while nome in self._nomes_usados:
+            n += 1
+            base, _, extensao = nome_arquivo.rpartition('.')
+            nome = f"{base}_{n}.{extensao}"
+        self._nomes_usados.add(nome)
+        return nome
+
+    def adicionar(self, generator: Any, client_name: str, email: str, data_ref: datetime,
+                  portfolios_data: List[DadosCarteira]) -> str:
+        """
+        Gera o relatório de um cliente e o grava como próxima entrada do pacote.
+
+        Como no arquivo individual, uma falha na geração resulta em uma
+        entrada vazia (o erro fica registrado no log do gerador).
+
+        Args:
+            generator (MMZREmailGenerator): Gerador dos relatórios
+            client_name (str): Nome do cliente
+            email (str): Email do cliente (guardado no índice)
+            data_ref (datetime): Data de referência do relatório
+            portfolios_data (List[DadosCarteira]): Carteiras do cliente
+
+        Returns:
+            str: Nome da entrada no pacote
+        """
+        nome_entrada = self._nome_entrada(generator.caminho_relatorio(client_name))
+        conteudo = generator.generate_html_email(client_name, data_ref, portfolios_data).encode('utf-8')
+
+        info = zipfile.ZipInfo(nome_entrada, date_time=data_ref.timetuple()[:6])
+        self._zip.writestr(info, conteudo, compress_type=zipfile.ZIP_DEFLATED, compresslevel=self._nivel_compressao)
+
+        self.indice[client_name] = {'arquivo': nome_entrada, 'email': email, 'tamanho': len(conteudo)}
+        return nome_entrada
+
+    def fechar(self) -> None:
+        """Grava o índice e fecha o pacote."""
+        if self._zip.fp is None:
+            return
+        indice = {'versao_formato': self.VERSAO_FORMATO, 'clientes': self.indice}
+        self._zip.writestr(NOME_INDICE, json.dumps(indice, ensure_ascii=False, indent=1, sort_keys=True))
+        self._zip.close()
+        logger.info(f"Pacote gravado: {self.caminho} ({len(self.indice)} relatórios)")
+
+
+class LeitorPacote:
+    """
+    Leitura de relatórios individuais de um pacote, sem extrair os demais.
+
+    Attributes:
+        caminho (str): Arquivo zip lido
+        indice (Dict[str, Dict[str, Any]]): Cliente -> entrada, email e tamanho
+    """
+
+    def __init__(self, caminho: str) -> None:
+        """
+        Abre o pacote e carrega o índice.
+
+        Args:
+            caminho (str): Arquivo zip gerado por PacoteRelatorios
+
+        Raises:
+            ValueError: Se o arquivo não tiver um índice compatível
+        """
+        self.caminho = caminho
+        self._zip = zipfile.ZipFile(caminho, 'r')
+        try:
+            conteudo = json.loads(self._zip.read(NOME_INDICE).decode('utf-8'))
+        except KeyError:
+            self._zip.close()
+            raise ValueError(f"Pacote sem índice: {caminho}")
+        if conteudo.get('versao_formato') != PacoteRelatorios.VERSAO_FORMATO:
+            self._zip.close()
+            raise ValueError(f"Formato de pacote não suportado: {conteudo.get('versao_formato')}")
+        self.indice: Dict[str, Dict[str, Any]] = conteudo['clientes']
+
+    def __enter__(self) -> "LeitorPacote":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.fechar()
+
+    def clientes(self) -> List[str]:
+        """Nomes dos clientes do pacote, em ordem alfabética."""
+        return sorted(self.indice)
+
+    def _entrada(self, nome_ou_email: str) -> Optional[str]:
+        """Entrada do zip para um cliente, buscando por nome ou email (sem diferenciar maiúsculas)."""
+        entrada = self.indice.get(nome_ou_email)
+        if entrada is not None:
+            return entrada['arquivo']
+        busca = nome_ou_email.strip().lower()
+        for nome, entrada in self.indice.items():
+            if nome.strip().lower() == busca or str(entrada.get('email', '')).strip().lower() == busca:
+                return entrada['arquivo']
+        return None
+
+    def abrir(self, nome_ou_email: str) -> IO[str]:
+        """
+        Abre o relatório de um cliente para leitura em fluxo (texto UTF-8).
+
+        Args:
+            nome_ou_email (str): Nome ou email do cliente
+
+        Returns:
+            IO[str]: Arquivo de texto com o HTML do relatório
+
+        Raises:
+            KeyError: Se o cliente não estiver no pacote
+        """
+        arquivo = self._entrada(nome_ou_email)
+        if arquivo is None:
+            raise KeyError(f"Cliente '{nome_ou_email}' não encontrado no pacote")
+        return io.TextIOWrapper(self._zip.open(arquivo), encoding='utf-8', newline='')
+
+    def ler(self, nome_ou_email: str) -> str:
+        """
+        Retorna o HTML do relatório de um cliente.
+
+        Args:
+            nome_ou_email (str): Nome ou email do cliente
+
+        Returns:
+            str: HTML do relatório
+
+        Raises:
+            KeyError: Se o cliente não estiver no pacote
+        """
+        with self.abrir(nome_ou_email) as f:
+            return f.read()
+
+    def fechar(self) -> None:
+        """Fecha o arquivo do pacote."""
+        self._zip.close()
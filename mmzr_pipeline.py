@@ -0,0 +1,270 @@
+"""
+MMZR Family Office - Pipeline Assíncrono de Geração
+
+Este módulo executa a geração dos relatórios como uma sequência de etapas
+(por exemplo: carregar → montar → renderizar → gravar → enviar) ligadas por
+filas limitadas (``asyncio.Queue`` com tamanho máximo). Cada etapa roda em
+suas próprias threads, de modo que um disco ou um servidor de email lento
+não para a renderização dos próximos clientes; quando uma fila enche, a
+etapa anterior espera (contrapressão), o que limita a memória usada.
+
+Para cada etapa são medidos a profundidade da fila de entrada, o tempo de
+processamento por item e o tempo bloqueado esperando espaço na fila
+seguinte, o que mostra qual etapa limita a vazão de um lote de fim de mês.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+TAMANHO_FILA_PADRAO = 8
+
+# Marcador de fim do fluxo entre as etapas
+_FIM = object()
+
+
+class Etapa:
+    """
+    Uma etapa do pipeline e suas medições.
+
+    A função recebe o item produzido pela etapa anterior e retorna o item
+    entregue à próxima (None descarta o item).
+
+    Attributes:
+        nome (str): Nome exibido nas estatísticas
+        funcao (Callable[[Any], Any]): Processamento de um item
+        threads (int): Threads da etapa (0 executa no próprio laço de eventos,
+            para funções rápidas)
+        inicializador (Optional[Callable[[], Any]]): Chamado em cada thread da etapa
+        processados (int): Itens processados
+        erros (int): Itens que falharam (registrados no log e descartados)
+        segundos (float): Soma do tempo de processamento
+        segundos_maximo (float): Maior tempo de processamento de um item
+        segundos_bloqueado (float): Tempo esperando espaço na fila seguinte
+        fila_maxima (int): Maior profundidade observada da fila de entrada
+    """
+
+    def __init__(self, nome: str, funcao: Callable[[Any], Any], threads: int = 1,
+                 inicializador: Optional[Callable[[], Any]] = None) -> None:
+        """
+        Define a etapa.
+
+        Args:
+            nome (str): Nome exibido nas estatísticas
+            funcao (Callable[[Any], Any]): Processamento de um item
+            threads (int): Threads da etapa (0 = no laço de eventos)
+            inicializador (Optional[Callable[[], Any]]): Chamado em cada thread
+                da etapa (ex.: inicialização do COM para o Outlook)
+        """
+        self.nome = nome
+        self.funcao = funcao
+        self.threads = threads
+        self.inicializador = inicializador
+        self.processados = 0
+        self.erros = 0
+        self.segundos = 0.0
+        self.segundos_maximo = 0.0
+        self.segundos_bloqueado = 0.0
+        self.fila_maxima = 0
+        self._soma_fila = 0
+        self._amostras_fila = 0
+
+    def _medir_fila(self, profundidade: int) -> None:
+        """Registra a profundidade da fila de entrada depois de um novo item."""
+        self._soma_fila += profundidade
+        self._amostras_fila += 1
+        if profundidade > self.fila_maxima:
+            self.fila_maxima = profundidade
+
+    def estatisticas(self, segundos_total: float) -> Dict[str, Any]:
+        """
+        Medições da etapa.
+
+        Args:
+            segundos_total (float): Duração do pipeline
+
+        Returns:
+            Dict[str, Any]: 'etapa', 'processados', 'erros', 'fila_maxima',
+                'fila_media', 'latencia_media' e 'latencia_maxima' (segundos),
+                'bloqueado' (segundos) e 'ocupacao' (fração do tempo total em
+                que as threads da etapa estiveram processando)
+        """
+        paralelas = max(1, self.threads)
+        return {
+            'etapa': self.nome,
+            'processados': self.processados,
+            'erros': self.erros,
+            'fila_maxima': self.fila_maxima,
+            'fila_media': self._soma_fila / self._amostras_fila if self._amostras_fila else 0.0,
+            'latencia_media': self.segundos / self.processados if self.processados else 0.0,
+            'latencia_maxima': self.segundos_maximo,
+            'bloqueado': self.segundos_bloqueado,
+            'ocupacao': self.segundos / (segundos_total * paralelas) if segundos_total else 0.0,
+        }
+
+
+class PipelineAssincrono:
+    """
+    Etapas encadeadas por filas limitadas, alimentadas por um iterável.
+
+    Uso::
+
+        pipeline = PipelineAssincrono([Etapa("renderizar", renderizar), Etapa("gravar", gravar, threads=2)])
+        pipeline.executar(relatorios, nome_fonte="carregar")
+        for linha in pipeline.estatisticas():
+            print(linha)
+
+    O iterável é consumido em uma thread própria (a primeira etapa), pois
+    produzir o próximo item pode envolver leitura de planilha.
+
+    Attributes:
+        etapas (List[Etapa]): Etapas, na ordem em que os itens passam
+        tamanho_fila (int): Itens aguardando entre duas etapas antes de a
+            anterior bloquear
+        segundos (float): Duração da última execução
+    """
+
+    def __init__(self, etapas: List[Etapa], tamanho_fila: int = TAMANHO_FILA_PADRAO) -> None:
+        """
+        Define o pipeline.
+
+        Args:
+            etapas (List[Etapa]): Etapas, na ordem em que os itens passam
+            tamanho_fila (int): Tamanho máximo de cada fila entre etapas
+        """
+        self.etapas = etapas
+        self.tamanho_fila = max(1, tamanho_fila)
+        self.segundos = 0.0
+        self._fonte: Optional[Etapa] = None
+
+    def executar(self, fonte: Iterable[Any], nome_fonte: str = "carregar") -> None:
+        """
+        Passa todos os itens da fonte pelas etapas e espera o fim do processamento.
+
+        Args:
+            fonte (Iterable[Any]): Itens de entrada da primeira etapa
+            nome_fonte (str): Nome da etapa que consome a fonte
+
+        Raises:
+            Exception: O erro da fonte, se a leitura dos itens falhar (os itens
+                já produzidos terminam de passar pelas etapas antes)
+        """
+        self._fonte = Etapa(nome_fonte, None)
+        inicio = time.perf_counter()
+        try:
+            asyncio.run(self._executar(iter(fonte)))
+        finally:
+            self.segundos = time.perf_counter() - inicio
+
+    async def _executar(self, iterador: Any) -> None:
+        """Cria as filas, as threads de cada etapa e as tarefas do laço de eventos."""
+        filas = [asyncio.Queue(maxsize=self.tamanho_fila) for _ in self.etapas]
+        executores = [
+            ThreadPoolExecutor(max_workers=etapa.threads, thread_name_prefix=f"mmzr-{etapa.nome}",
+                               initializer=etapa.inicializador) if etapa.threads > 0 else None
+            for etapa in self.etapas
+        ]
+        executor_fonte = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"mmzr-{self._fonte.nome}")
+        try:
+            tarefas = [asyncio.ensure_future(self._produzir(iterador, executor_fonte, filas[0] if filas else None))]
+            for indice, etapa in enumerate(self.etapas):
+                saida = filas[indice + 1] if indice + 1 < len(filas) else None
+                proxima = self.etapas[indice + 1] if indice + 1 < len(filas) else None
+                ativas = [max(1, etapa.threads)]
+                for _ in range(max(1, etapa.threads)):
+                    tarefas.append(asyncio.ensure_future(
+                        self._trabalhar(etapa, executores[indice], filas[indice], saida, proxima, ativas)))
+            # Os itens já produzidos terminam de passar pelas etapas antes de
+            # um erro da fonte ser propagado
+            for resultado in await asyncio.gather(*tarefas, return_exceptions=True):
+                if isinstance(resultado, BaseException):
+                    raise resultado
+        finally:
+            executor_fonte.shutdown()
+            for executor in executores:
+                if executor is not None:
+                    executor.shutdown()
+
+    async def _entregar(self, origem: Etapa, saida: "asyncio.Queue", proxima: Etapa, item: Any) -> None:
+        """Coloca um item na fila da próxima etapa, medindo a espera e a profundidade."""
+        if saida.full():
+            inicio = time.perf_counter()
+            await saida.put(item)
+            origem.segundos_bloqueado += time.perf_counter() - inicio
+        else:
+            saida.put_nowait(item)
+        proxima._medir_fila(saida.qsize())
+
+    async def _produzir(self, iterador: Any, executor: ThreadPoolExecutor, saida: Optional["asyncio.Queue"]) -> None:
+        """Consome a fonte e alimenta a primeira etapa; sempre sinaliza o fim."""
+        loop = asyncio.get_running_loop()
+        fonte = self._fonte
+        proxima = self.etapas[0] if self.etapas else None
+        try:
+            while True:
+                inicio = time.perf_counter()
+                item = await loop.run_in_executor(executor, next, iterador, _FIM)
+                if item is _FIM:
+                    return
+                decorrido = time.perf_counter() - inicio
+                fonte.processados += 1
+                fonte.segundos += decorrido
+                fonte.segundos_maximo = max(fonte.segundos_maximo, decorrido)
+                if saida is not None:
+                    await self._entregar(fonte, saida, proxima, item)
+        finally:
+            if saida is not None:
+                await saida.put(_FIM)
+
+    async def _trabalhar(self, etapa: Etapa, executor: Optional[ThreadPoolExecutor], entrada: "asyncio.Queue",
+                         saida: Optional["asyncio.Queue"], proxima: Optional[Etapa], ativas: List[int]) -> None:
+        """Laço de uma das tarefas de uma etapa."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await entrada.get()
+            if item is _FIM:
+                # Devolve o marcador para as outras tarefas da etapa; a última
+                # a terminar avisa a próxima etapa
+                ativas[0] -= 1
+                if ativas[0] > 0:
+                    entrada.put_nowait(_FIM)
+                elif saida is not None:
+                    await saida.put(_FIM)
+                return
+
+            inicio = time.perf_counter()
+            try:
+                if executor is None:
+                    resultado = etapa.funcao(item)
+                else:
+                    resultado = await loop.run_in_executor(executor, etapa.funcao, item)
+            except Exception as e:
+                etapa.erros += 1
+                logger.error(f"Erro na etapa '{etapa.nome}': {e}")
+                continue
+            decorrido = time.perf_counter() - inicio
+            etapa.processados += 1
+            etapa.segundos += decorrido
+            etapa.segundos_maximo = max(etapa.segundos_maximo, decorrido)
+
+            if resultado is not None and saida is not None:
+                await self._entregar(etapa, saida, proxima, resultado)
+
+    def estatisticas(self) -> List[Dict[str, Any]]:
+        """
+        Medições de cada etapa da última execução, começando pela fonte.
+
+        Returns:
+            List[Dict[str, Any]]: Uma entrada por etapa (ver ``Etapa.estatisticas``)
+        """
+        etapas = ([self._fonte] if self._fonte is not None else []) + self.etapas
+        return [etapa.estatisticas(self.segundos) for etapa in etapas]
@@ -0,0 +1,180 @@
+"""
+MMZR Family Office - Esquema das Planilhas
+
+Este módulo declara, em um único lugar, as colunas que o sistema realmente usa
+em cada aba das planilhas e o tipo com que cada uma deve ser carregada. As
+leituras passam apenas essas colunas ao ``pd.read_excel`` (usecols/dtype), o
+que evita decodificar e manter em memória as demais colunas das planilhas de
+produção.
+
+Política de tipos:
+    - Nomes de carteira e de estratégia da carteira: ``category`` (poucos valores
+      distintos repetidos em muitas linhas).
+    - Valores numéricos: ``float64``. Todos são exibidos com duas casas
+      decimais e ``float32`` altera o arredondamento em casos de empate
+      (ex.: 1.115 vira 1.12 em vez de 1.11), mudando o texto do relatório.
+      Essas colunas não são convertidas pelo ``pd.read_excel`` (uma única
+      célula como "n/d" faria a leitura da aba inteira falhar): são lidas como
+      vieram e convertidas depois, com os valores não numéricos tratados como
+      vazios e registrados no log.
+    - Demais colunas de texto: tipo inferido pelo pandas (object).
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Tipos aplicados depois da leitura (ver ``EsquemaAba.converter``)
+TIPOS_NUMERICOS = frozenset({'float64'})
+
+# Linhas com valor inválido listadas no log (por coluna)
+MAXIMO_LINHAS_LOG = 10
+
+
+class EsquemaAba:
+    """
+    Colunas e tipos esperados em uma aba de planilha.
+
+    Attributes:
+        nome (str): Nome descritivo da aba (usado em mensagens de erro)
+        colunas (Dict[str, Optional[str]]): Coluna -> dtype (None = inferido)
+        opcionais (frozenset): Colunas que podem não existir na planilha
+    """
+
+    def __init__(self, nome: str, colunas: Dict[str, Optional[str]], opcionais: Iterable[str] = ()) -> None:
+        """
+        Inicializa o esquema.
+
+        Args:
+            nome (str): Nome descritivo da aba
+            colunas (Dict[str, Optional[str]]): Coluna -> dtype (None = inferido)
+            opcionais (Iterable[str]): Colunas que podem estar ausentes
+        """
+        self.nome = nome
+        self.colunas = dict(colunas)
+        self.opcionais = frozenset(opcionais)
+
+    def __repr__(self) -> str:
+        # Representação estável: faz parte da chave do MMZRCache
+        return f"EsquemaAba({self.nome!r}, {sorted(self.colunas.items())!r}, {sorted(self.opcionais)!r})"
+
+    @property
+    def obrigatorias(self) -> List[str]:
+        """Colunas que precisam existir na aba."""
+        return [coluna for coluna in self.colunas if coluna not in self.opcionais]
+
+    def opcoes_leitura(self) -> Dict[str, Any]:
+        """
+        Retorna os argumentos de ``pd.read_excel`` que restringem a leitura ao esquema.
+
+        As colunas numéricas ficam fora de ``dtype`` e são convertidas por
+        ``converter`` depois da leitura.
+
+        Returns:
+            Dict[str, Any]: Argumentos ``usecols`` e ``dtype``
+        """
+        colunas = self.colunas
+        return {
+            'usecols': lambda coluna: coluna in colunas,
+            'dtype': {coluna: dtype for coluna, dtype in colunas.items()
+                      if dtype is not None and dtype not in TIPOS_NUMERICOS},
+        }
+
+    @property
+    def numericas(self) -> List[str]:
+        """Colunas convertidas para número depois da leitura."""
+        return [coluna for coluna, dtype in self.colunas.items() if dtype in TIPOS_NUMERICOS]
+
+    def converter(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converte as colunas numéricas de um DataFrame já lido.
+
+        Valores que não são números (ex.: "n/d") viram NaN, como uma célula
+        vazia, e as linhas afetadas são registradas no log.
+
+        Args:
+            df (pd.DataFrame): DataFrame lido da planilha (alterado no lugar)
+
+        Returns:
+            pd.DataFrame: O próprio DataFrame, para encadear chamadas
+        """
+        for coluna in self.numericas:
+            if coluna not in df.columns or df[coluna].dtype == self.colunas[coluna]:
+                continue
+            convertida = pd.to_numeric(df[coluna], errors='coerce')
+            invalidas = convertida.isna() & df[coluna].notna()
+            if invalidas.any():
+                # Linha da planilha: índice + 2 (cabeçalho na linha 1)
+                linhas = [str(posicao + 2) for posicao in invalidas.to_numpy().nonzero()[0][:MAXIMO_LINHAS_LOG]]
+                reticencias = "..." if invalidas.sum() > MAXIMO_LINHAS_LOG else ""
+                logger.warning(f"Aba '{self.nome}', coluna '{coluna}': {int(invalidas.sum())} valores não "
+                               f"numéricos ignorados (linhas {', '.join(linhas)}{reticencias})")
+            df[coluna] = convertida.astype(self.colunas[coluna])
+        return df
+
+    def validar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Verifica se o DataFrame lido contém todas as colunas obrigatórias.
+
+        Args:
+            df (pd.DataFrame): DataFrame lido da planilha
+
+        Returns:
+            pd.DataFrame: O próprio DataFrame, para encadear chamadas
+
+        Raises:
+            ValueError: Se faltar alguma coluna obrigatória
+        """
+        faltantes = [coluna for coluna in self.obrigatorias if coluna not in df.columns]
+        if faltantes:
+            raise ValueError(f"Colunas obrigatórias ausentes na aba '{self.nome}': {', '.join(faltantes)}")
+        return df
+
+
+ESQUEMA_BASE_CLIENTES = EsquemaAba(
+    "Base Clientes",
+    {
+        'Código carteira smart': None,
+        'Nome cliente': None,
+        'Nome carteira': 'category',
+        'Estratégia carteira': 'category',
+        'Comentários': None,
+    },
+    opcionais=('Comentários',),
+)
+
+ESQUEMA_BASE_CONSOLIDADA = EsquemaAba(
+    "Base Consolidada",
+    {
+        'NomeCompletoCliente': None,
+        'EmailCliente': None,
+    },
+)
+
+ESQUEMA_RENTABILIDADE = EsquemaAba(
+    "Rentabilidade",
+    {
+        'Código carteira smart': None,
+        'Rentabilidade Carteira Mês': 'float64',
+        'Rentabilidade Carteira No Ano': 'float64',
+        'Benchmark Mês': 'float64',
+        'Benchmark No Ano': 'float64',
+        'Variação Relativa Mês': 'float64',
+        'Variação Relativa No Ano': 'float64',
+        'Retorno Financeiro': 'float64',
+        'Estratégia de Destaque 1': None,
+        'Estratégia de Destaque 2': None,
+        'Ativo Promotor 1': None,
+        'Ativo Promotor 2': None,
+        'Ativo Detrator 1': None,
+        'Ativo Detrator 2': None,
+    },
+)
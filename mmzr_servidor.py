@@ -0,0 +1,447 @@
+"""
+MMZR Family Office - Servidor de Relatórios
+
+Este módulo mantém as planilhas carregadas em memória em um processo de longa
+duração e entrega os relatórios por HTTP local. Em vez de pagar, a cada
+pedido de um assessor, a inicialização do Python e do pandas, a detecção e a
+leitura das planilhas, o servidor monta uma única vez as carteiras de todos
+os clientes; cada relatório é então apenas renderizado (poucos milissegundos).
+
+Endpoints:
+    GET  /clientes                   Lista os clientes (JSON)
+    GET  /relatorio?cliente=<nome>   HTML do relatório (nome ou email)
+    POST /lote                       Dispara a geração em lote (corpo JSON com
+                                     as opções permitidas em OPCOES_LOTE)
+    GET  /lote                       Situação do último lote
+    GET  /estado                     Planilhas, clientes e recargas
+
+Uma thread verifica periodicamente o tamanho e a data de modificação das
+planilhas; quando mudam (e ficam estáveis por uma verificação, para não ler
+um arquivo ainda sendo salvo), os dados são recarregados e substituídos sem
+interromper os pedidos em andamento.
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from mmzr_compatibilidade import MMZRCompatibilidade
+from mmzr_dataset import MMZRDataset, normalizar_nome_cliente
+from mmzr_email_generator import MMZREmailGenerator
+from mmzr_integracao_real import gerar_relatorio_integrado, montar_carteiras
+from mmzr_modelos import RelatorioCliente
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+HOST_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 8765
+
+# Segundos entre as verificações de alteração das planilhas
+INTERVALO_VERIFICACAO = 2.0
+
+# Opções de gerar_relatorio_integrado aceitas em POST /lote. Criar emails e
+# escolher a pasta de saída ficam de fora: só a linha de comando faz isso
+OPCOES_LOTE = ('incremental', 'subpastas', 'pipeline', 'workers', 'tamanho_lote', 'shard', 'retomar')
+
+
+class _EstadoServidor:
+    """Dados carregados de uma versão das planilhas (substituídos inteiros na recarga)."""
+
+    __slots__ = ('dataset', 'relatorios', 'por_nome', 'impressao', 'carregado_em', 'segundos')
+
+    def __init__(self, dataset: MMZRDataset, relatorios: List[RelatorioCliente], impressao: Tuple,
+                 segundos: float) -> None:
+        self.dataset = dataset
+        self.relatorios = {relatorio.nome: relatorio for relatorio in relatorios}
+        # Nome normalizado ou email (minúsculo) -> nome do cliente
+        self.por_nome: Dict[str, str] = {}
+        for relatorio in relatorios:
+            self.por_nome.setdefault(normalizar_nome_cliente(relatorio.nome), relatorio.nome)
+            if relatorio.email:
+                self.por_nome.setdefault(str(relatorio.email).strip().lower(), relatorio.nome)
+        self.impressao = impressao
+        self.carregado_em = datetime.now()
+        self.segundos = segundos
+
+
+class ServidorRelatorios:
+    """
+    Planilhas em memória e geração dos relatórios sob demanda.
+
+    Uso::
+
+        servidor = ServidorRelatorios()
+        html = servidor.renderizar("Nome do Cliente")
+        servidor.servir(porta=8765)
+
+    Attributes:
+        generator (MMZREmailGenerator): Gerador usado nos relatórios servidos
+        planilha_base (str): Caminho da planilha base
+        planilha_rentabilidade (str): Caminho da planilha de rentabilidade
+        recargas (int): Recargas feitas por alteração das planilhas
+        lote (Dict[str, Any]): Situação do último lote disparado
+    """
+
+    def __init__(self, planilha_base: Optional[str] = None, planilha_rentabilidade: Optional[str] = None,
+                 logo_mode: str = "inline", compacto: bool = False,
+                 intervalo: float = INTERVALO_VERIFICACAO) -> None:
+        """
+        Localiza as planilhas (se não informadas) e faz a primeira carga.
+
+        Args:
+            planilha_base (Optional[str]): Caminho da planilha base
+            planilha_rentabilidade (Optional[str]): Caminho da planilha de rentabilidade
+            logo_mode (str): "inline" ou "cid" (ver MMZREmailGenerator)
+            compacto (bool): Serve o HTML minificado
+            intervalo (float): Segundos entre as verificações das planilhas
+
+        Raises:
+            ValueError: Se a planilha base não tiver a aba 'Base Clientes'
+        """
+        if not planilha_base or not planilha_rentabilidade:
+            planilha_base, planilha_rentabilidade = MMZRCompatibilidade.get_planilhas_path()
+        self.planilha_base = planilha_base
+        self.planilha_rentabilidade = planilha_rentabilidade
+        self.logo_mode = logo_mode
+        self.compacto = compacto
+        self.intervalo = intervalo
+        self.generator = MMZREmailGenerator(logo_mode=logo_mode, compacto=compacto)
+        self.recargas = 0
+        self.lote: Dict[str, Any] = {'situacao': 'nenhum'}
+        self._trava_lote = threading.Lock()
+        self._parar = threading.Event()
+        self._estado = self._carregar(self.impressao_planilhas())
+
+    def impressao_planilhas(self) -> Tuple:
+        """
+        Identifica a versão atual das planilhas sem lê-las.
+
+        Returns:
+            Tuple: (tamanho, mtime_ns) de cada planilha (None se ausente) e o
+                mês atual, pois os rótulos do relatório dependem do mês
+        """
+        impressao = []
+        for caminho in (self.planilha_base, self.planilha_rentabilidade):
+            try:
+                stat = os.stat(caminho)
+                impressao.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                impressao.append(None)
+        impressao.append(datetime.now().strftime('%Y-%m'))
+        return tuple(impressao)
+
+    def _carregar(self, impressao: Tuple) -> _EstadoServidor:
+        """Lê as planilhas e monta as carteiras de todos os clientes."""
+        inicio = time.perf_counter()
+        dataset = MMZRDataset.carregar(self.planilha_base, self.planilha_rentabilidade)
+        relatorios = montar_carteiras(dataset, dataset.clientes, self.generator)
+        estado = _EstadoServidor(dataset, relatorios, impressao, time.perf_counter() - inicio)
+        logger.info(f"Planilhas carregadas: {len(estado.relatorios)} clientes em {estado.segundos:.2f}s")
+        return estado
+
+    def verificar_planilhas(self, impressao_anterior: Optional[Tuple] = None) -> Optional[Tuple]:
+        """
+        Recarrega os dados se as planilhas mudaram e estão estáveis.
+
+        Args:
+            impressao_anterior (Optional[Tuple]): Impressão vista na verificação
+                anterior; a recarga só acontece quando a nova coincide com ela
+
+        Returns:
+            Optional[Tuple]: Impressão atual, para a próxima verificação
+        """
+        impressao = self.impressao_planilhas()
+        if impressao == self._estado.impressao or impressao != impressao_anterior:
+            return impressao
+        if None in impressao[:2]:
+            logger.warning("Planilha ausente; mantendo os dados já carregados")
+            return impressao
+
+        try:
+            self._estado = self._carregar(impressao)
+            self.recargas += 1
+        except Exception as e:
+            # Mantém os dados anteriores; uma nova alteração da planilha tenta de novo
+            logger.error(f"Erro ao recarregar as planilhas: {e}")
+            self._estado.impressao = impressao
+        return impressao
+
+    def _vigiar(self) -> None:
+        """Laço da thread que verifica as planilhas."""
+        impressao = None
+        while not self._parar.wait(self.intervalo):
+            impressao = self.verificar_planilhas(impressao)
+
+    def buscar(self, nome_ou_email: str) -> Optional[RelatorioCliente]:
+        """
+        Localiza um cliente por nome ou email.
+
+        O nome exato tem prioridade; em seguida vale o nome sem acentos,
+        maiúsculas ou espaços extras, ou o email sem diferenciar maiúsculas.
+
+        Args:
+            nome_ou_email (str): Nome ou email do cliente
+
+        Returns:
+            Optional[RelatorioCliente]: Carteiras do cliente, ou None
+        """
+        estado = self._estado
+        nome_ou_email = nome_ou_email.strip()
+        relatorio = estado.relatorios.get(nome_ou_email)
+        if relatorio is not None:
+            return relatorio
+        nome = estado.por_nome.get(nome_ou_email.lower()) or estado.por_nome.get(normalizar_nome_cliente(nome_ou_email))
+        return estado.relatorios.get(nome) if nome else None
+
+    def renderizar(self, nome_ou_email: str) -> Optional[str]:
+        """
+        Gera o HTML do relatório de um cliente com os dados em memória.
+
+        Args:
+            nome_ou_email (str): Nome ou email do cliente
+
+        Returns:
+            Optional[str]: HTML do relatório, ou None se o cliente não existir
+        """
+        relatorio = self.buscar(nome_ou_email)
+        if relatorio is None:
+            return None
+        return self.generator.generate_html_email(relatorio.nome, datetime.now(), relatorio.carteiras)
+
+    def clientes(self) -> List[Dict[str, Any]]:
+        """Nome, email e quantidade de carteiras de cada cliente, em ordem alfabética."""
+        return [
+            {'nome': relatorio.nome, 'email': relatorio.email, 'carteiras': len(relatorio.carteiras)}
+            for _, relatorio in sorted(self._estado.relatorios.items())
+        ]
+
+    def estado(self) -> Dict[str, Any]:
+        """Resumo dos dados carregados (planilhas, clientes, horário e duração da carga)."""
+        estado = self._estado
+        return {
+            'planilha_base': self.planilha_base,
+            'planilha_rentabilidade': self.planilha_rentabilidade,
+            'clientes': len(estado.relatorios),
+            'carregado_em': estado.carregado_em.isoformat(timespec='seconds'),
+            'segundos_carga': round(estado.segundos, 3),
+            'recargas': self.recargas,
+            'lote': self.lote['situacao'],
+        }
+
+    def iniciar_lote(self, opcoes: Dict[str, Any]) -> bool:
+        """
+        Dispara a geração em lote em segundo plano, com os dados já carregados.
+
+        Args:
+            opcoes (Dict[str, Any]): Opções de gerar_relatorio_integrado (ver
+                OPCOES_LOTE); 'shard' aceita "i/N"
+
+        Returns:
+            bool: False se já houver um lote em andamento
+
+        Raises:
+            ValueError: Se houver uma opção desconhecida ou um shard inválido
+        """
+        desconhecidas = set(opcoes) - set(OPCOES_LOTE)
+        if desconhecidas:
+            raise ValueError(f"Opções desconhecidas: {', '.join(sorted(desconhecidas))}")
+        opcoes = dict(opcoes)
+        if isinstance(opcoes.get('shard'), str):
+            try:
+                indice, total = (int(parte) for parte in opcoes['shard'].split('/'))
+            except ValueError:
+                raise ValueError(f"Shard inválido: {opcoes['shard']} (use i/N)")
+            if not 1 <= indice <= total:
+                raise ValueError(f"Shard inválido: {opcoes['shard']} (use i/N)")
+            opcoes['shard'] = (indice, total)
+
+        with self._trava_lote:
+            if self.lote['situacao'] == 'em andamento':
+                return False
+            self.lote = {'situacao': 'em andamento', 'inicio': datetime.now().isoformat(timespec='seconds'),
+                         'opcoes': {chave: valor for chave, valor in opcoes.items()}}
+
+        threading.Thread(target=self._executar_lote, args=(self._estado.dataset, opcoes),
+                         name="mmzr-lote", daemon=True).start()
+        return True
+
+    def _executar_lote(self, dataset: MMZRDataset, opcoes: Dict[str, Any]) -> None:
+        """Executa o lote (thread própria) e registra o resultado."""
+        inicio = time.perf_counter()
+        try:
+            # Erros da geração são informados na saída e indicados pelo retorno
+            concluido = gerar_relatorio_integrado(dataset=dataset, logo_mode=self.logo_mode, compacto=self.compacto,
+                                                  **opcoes)
+            situacao = 'concluido' if concluido else 'erro'
+        except Exception as e:
+            logger.error(f"Erro no lote: {e}")
+            situacao = 'erro'
+        self.lote.update(situacao=situacao, fim=datetime.now().isoformat(timespec='seconds'),
+                         segundos=round(time.perf_counter() - inicio, 1))
+
+    def servir(self, host: str = HOST_PADRAO, porta: int = PORTA_PADRAO) -> None:
+        """
+        Atende pedidos HTTP até ser interrompido (Ctrl+C).
+
+        Por padrão escuta só em 127.0.0.1: os relatórios contêm dados de
+        clientes e o servidor não tem autenticação.
+
+        Args:
+            host (str): Endereço de escuta
+            porta (int): Porta TCP
+        """
+        manipulador = type("ManipuladorRelatorios", (_ManipuladorRelatorios,), {'servidor_relatorios': self})
+        httpd = ThreadingHTTPServer((host, porta), manipulador)
+        httpd.daemon_threads = True
+        vigia = threading.Thread(target=self._vigiar, name="mmzr-vigia", daemon=True)
+        vigia.start()
+        print(f"Servidor de relatórios em http://{host}:{porta} ({len(self._estado.relatorios)} clientes)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\nServidor encerrado.")
+        finally:
+            self._parar.set()
+            httpd.server_close()
+
+
+class _ManipuladorRelatorios(BaseHTTPRequestHandler):
+    """Rotas HTTP do servidor (a instância de ServidorRelatorios é definida em ``servir``)."""
+
+    servidor_relatorios: ServidorRelatorios = None
+    # Conexões persistentes: um assessor abrindo vários relatórios não paga um novo TCP por pedido
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas; sem isso (Nagle + ACK
+    # atrasado) cada resposta numa conexão persistente esperaria ~40ms
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        servidor = self.servidor_relatorios
+        if url.path == "/clientes":
+            self._json(200, servidor.clientes())
+        elif url.path == "/relatorio":
+            cliente = parse_qs(url.query).get('cliente', [''])[0]
+            if not cliente.strip():
+                self._json(400, {'erro': "Informe o cliente: /relatorio?cliente=<nome ou email>"})
+                return
+            inicio = time.perf_counter()
+            html = servidor.renderizar(cliente)
+            if html is None:
+                self._json(404, {'erro': f"Cliente '{cliente}' não encontrado"})
+            elif not html:
+                self._json(500, {'erro': f"Erro ao gerar o relatório de '{cliente}' (ver log)"})
+            else:
+                duracao = (time.perf_counter() - inicio) * 1000
+                self._responder(200, html.encode('utf-8'), "text/html; charset=utf-8",
+                                {'Server-Timing': f"render;dur={duracao:.2f}"})
+        elif url.path == "/lote":
+            self._json(200, servidor.lote)
+        elif url.path in ("/", "/estado"):
+            self._json(200, servidor.estado())
+        else:
+            self._json(404, {'erro': f"Rota desconhecida: {url.path}"})
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != "/lote":
+            self._json(404, {'erro': f"Rota desconhecida: {self.path}"})
+            return
+        # Um formulário de outro site consegue enviar POST ao servidor local, mas
+        # não com Content-Type JSON sem um preflight (que este servidor não aceita)
+        tipo = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if tipo != "application/json":
+            self._json(415, {'erro': "Envie as opções com Content-Type: application/json"})
+            return
+        if not self._origem_permitida():
+            self._json(403, {'erro': "Origem não permitida"})
+            return
+        try:
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            opcoes = json.loads(self.rfile.read(tamanho) or b"{}") if tamanho else {}
+            if not isinstance(opcoes, dict):
+                raise ValueError("O corpo deve ser um objeto JSON")
+            iniciado = self.servidor_relatorios.iniciar_lote(opcoes)
+        except ValueError as e:
+            self._json(400, {'erro': str(e)})
+            return
+        if iniciado:
+            self._json(202, self.servidor_relatorios.lote)
+        else:
+            self._json(409, {'erro': "Já existe um lote em andamento", 'lote': self.servidor_relatorios.lote})
+
+    def _origem_permitida(self) -> bool:
+        """
+        Indica se o pedido veio de fora do navegador ou de uma página do próprio servidor.
+
+        O ``Origin`` só é aceito se apontar para o endereço de escuta, 127.0.0.1
+        ou localhost na porta do servidor (o que também barra páginas que
+        apontam outro domínio para 127.0.0.1).
+        """
+        origem = self.headers.get('Origin')
+        if origem is None:
+            return True
+        host, porta = self.server.server_address[:2]
+        permitidas = {f"http://{nome}:{porta}" for nome in (host, "127.0.0.1", "localhost")}
+        return origem.rstrip('/').lower() in permitidas
+
+    def _json(self, status: int, dados: Any) -> None:
+        """Responde com um documento JSON."""
+        self._responder(status, json.dumps(dados, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8")
+
+    def _responder(self, status: int, corpo: bytes, tipo: str, cabecalhos: Optional[Dict[str, str]] = None) -> None:
+        """Envia status, cabeçalhos e corpo."""
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato: str, *args: Any) -> None:
+        """Registra os pedidos no log em vez de escrever direto no stderr."""
+        logger.info(f"{self.address_string()} {formato % args}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    host = HOST_PADRAO
+    porta = PORTA_PADRAO
+    logo_mode = "cid" if "--logo-cid" in sys.argv else "inline"
+    compacto = "--compacto" in sys.argv
+
+    if "--help" in sys.argv or "-h" in sys.argv:
+        print("\n=== MMZR SERVIDOR DE RELATÓRIOS ===")
+        print("Uso: python mmzr_servidor.py [opções]")
+        print("\nOpções:")
+        print(f"  --porta N        Porta TCP (padrão: {PORTA_PADRAO})")
+        print(f"  --host ENDEREÇO  Endereço de escuta (padrão: {HOST_PADRAO})")
+        print("  --logo-cid       Logo referenciada por cid: (anexo) em vez de embutida")
+        print("  --compacto       HTML minificado")
+        print("\nEndpoints: GET /clientes, GET /relatorio?cliente=<nome ou email>, POST /lote, GET /lote, GET /estado")
+        sys.exit(0)
+
+    try:
+        if "--porta" in sys.argv:
+            porta = int(sys.argv[sys.argv.index("--porta") + 1])
+        if "--host" in sys.argv:
+            host = sys.argv[sys.argv.index("--host") + 1]
+    except (IndexError, ValueError):
+        print("ERRO: use --porta N e --host ENDEREÇO")
+        sys.exit(1)
+
+    ServidorRelatorios(logo_mode=logo_mode, compacto=compacto).servir(host, porta)
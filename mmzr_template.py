@@ -0,0 +1,810 @@
+"""
+MMZR Family Office - Template Compilado do Relatório
+
+Este módulo guarda o texto HTML do relatório mensal dividido em trechos
+compilados. Cada trecho é analisado uma única vez na importação: as partes
+fixas (cabeçalho, bloco de CSS, rodapé, títulos das seções) ficam prontas
+como texto e como bytes UTF-8, e só os campos variáveis de cada cliente são
+preenchidos na renderização, anexando fragmentos a uma lista que é unida
+uma única vez no final (em vez de concatenar strings com ``+=``).
+
+A sintaxe dos trechos é a mesma de ``str.format``: ``{campo}`` marca um
+valor variável e ``{{``/``}}`` representam chaves literais (usadas no CSS).
+
+Autor: MMZR Family Office
+Versão: 2.0.0
+Data: 2026-10-17
+"""
+
+import hashlib
+import re
+import string
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Limite de seções memorizadas por MemoriaSecoes
+TAMANHO_MAXIMO_MEMORIA = 64
+
+# Padrões usados pelo modo compacto
+_PADRAO_COMENTARIO = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_PADRAO_BLOCO_CSS = re.compile(r'(<style[^>]*>)(.*?)(</style>)', re.DOTALL)
+_PADRAO_COMENTARIO_CSS = re.compile(r'/\*.*?\*/', re.DOTALL)
+_PADRAO_SEPARADOR_CSS = re.compile(r'\s*([{};:,])\s*')
+_PADRAO_ATRIBUTO_STYLE = re.compile(r'style="([^"]*)"')
+_PADRAO_COR_CURTA = re.compile(r'#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3(?![0-9a-fA-F])')
+_PADRAO_ENTRE_TAGS = re.compile(r'>\s+<')
+_PADRAO_ESPACOS = re.compile(r'\s+')
+_PADRAO_VIRGULA = re.compile(r'\s*,\s*')
+
+# Propriedades cujo valor abreviado segue a regra topo/direita/baixo/esquerda
+_PROPRIEDADES_QUATRO_LADOS = ('margin', 'padding')
+
+
+def compactar_estilo(estilo: str) -> str:
+    """
+    Reescreve o conteúdo de um atributo style na forma mais curta equivalente.
+
+    Remove espaços em volta de ":", ";" e ",", o ";" final, abrevia cores
+    hexadecimais de 6 dígitos que tenham forma de 3 dígitos (#ffffff -> #fff)
+    e reduz margin/padding à forma abreviada equivalente (0 0 12px 0 -> 0 0 12px).
+
+    Args:
+        estilo (str): Valor do atributo style
+
+    Returns:
+        str: Declarações equivalentes, compactadas
+    """
+    declaracoes = []
+    for declaracao in estilo.split(';'):
+        propriedade, separador, valor = declaracao.partition(':')
+        if not separador:
+            if declaracao.strip():
+                declaracoes.append(declaracao.strip())
+            continue
+        propriedade = propriedade.strip()
+        valor = _PADRAO_ESPACOS.sub(' ', valor).strip()
+        valor = _PADRAO_VIRGULA.sub(',', valor)
+        valor = _PADRAO_COR_CURTA.sub(r'#\1\2\3', valor)
+        if propriedade in _PROPRIEDADES_QUATRO_LADOS:
+            valor = _abreviar_lados(valor)
+        declaracoes.append(f"{propriedade}:{valor}")
+    return ';'.join(declaracoes)
+
+
+def _abreviar_lados(valor: str) -> str:
+    """Forma mais curta de um valor topo/direita/baixo/esquerda (regra do CSS)."""
+    lados = valor.split(' ')
+    if len(lados) == 4 and lados[3] == lados[1]:
+        lados = lados[:3]
+    if len(lados) == 3 and lados[2] == lados[0]:
+        lados = lados[:2]
+    if len(lados) == 2 and lados[1] == lados[0]:
+        lados = lados[:1]
+    return ' '.join(lados)
+
+
+def _compactar_css(css: str) -> str:
+    """Compacta o conteúdo de um bloco <style>."""
+    css = _PADRAO_COMENTARIO_CSS.sub('', css)
+    css = _PADRAO_ESPACOS.sub(' ', css)
+    css = _PADRAO_SEPARADOR_CSS.sub(r'\1', css)
+    css = css.replace(';}', '}')
+    return _PADRAO_COR_CURTA.sub(r'#\1\2\3', css).strip()
+
+
+def minificar_html(html: str) -> str:
+    """
+    Minifica um trecho de HTML de email sem alterar a renderização.
+
+    - Remove comentários, preservando os condicionais do Outlook (``<!--[if mso]>``)
+    - Compacta os blocos <style> e os atributos style
+    - Remove espaços entre tags e reduz os demais a um único espaço
+    - Remove espaços nas extremidades do trecho
+
+    Os trechos do relatório sempre começam e terminam em uma tag, por isso os
+    espaços nas extremidades não são significativos.
+
+    Args:
+        html (str): HTML a minificar
+
+    Returns:
+        str: HTML minificado
+    """
+    html = _PADRAO_COMENTARIO.sub('', html)
+    html = _PADRAO_BLOCO_CSS.sub(lambda m: m.group(1) + _compactar_css(m.group(2)) + m.group(3), html)
+    html = _PADRAO_ATRIBUTO_STYLE.sub(lambda m: f'style="{compactar_estilo(m.group(1))}"', html)
+    html = _PADRAO_ENTRE_TAGS.sub('><', html)
+    return _PADRAO_ESPACOS.sub(' ', html).strip()
+
+
+def _criar_renderizador(nome: str, campos: Tuple[str, ...],
+                        sequencia: Tuple[Any, ...]) -> Callable[..., List[str]]:
+    """
+    Cria a função de renderização de um trecho.
+
+    Args:
+        nome (str): Nome do trecho (usado nas mensagens de erro)
+        campos (Tuple[str, ...]): Campos aceitos, na ordem dos argumentos posicionais
+        sequencia (Tuple[Any, ...]): Partes fixas (str) intercaladas com o
+            índice (int) do campo a inserir
+
+    Returns:
+        Callable[..., List[str]]: ``renderizar(saida, *valores, **nomeados)``
+    """
+    total = len(campos)
+
+    def renderizar(saida: List[str], *valores: Any, **nomeados: Any) -> List[str]:
+        if nomeados:
+            try:
+                valores += tuple(nomeados.pop(campo) for campo in campos[len(valores):])
+            except KeyError as e:
+                raise TypeError(f"Trecho '{nome}': campo {e} não informado") from None
+            if nomeados:
+                raise TypeError(f"Trecho '{nome}': campos desconhecidos {sorted(nomeados)}")
+        if len(valores) != total:
+            raise TypeError(f"Trecho '{nome}' espera {total} campos, recebeu {len(valores)}")
+        anexar = saida.append
+        for elemento in sequencia:
+            if elemento.__class__ is str:
+                anexar(elemento)
+            else:
+                valor = valores[elemento]
+                anexar(valor if valor.__class__ is str else format(valor))
+        return saida
+
+    return renderizar
+
+
+class TrechoCompilado:
+    """
+    Trecho de HTML compilado em uma função de renderização.
+
+    Na criação, o texto é dividido em partes fixas e campos variáveis, e a
+    função ``renderizar(saida, campo1, campo2, ...)`` anexa à lista ``saida``
+    as partes fixas (sempre os mesmos objetos str) intercaladas com os
+    valores recebidos. Valores que não são str são convertidos como em uma
+    f-string (``format(valor)``).
+
+    Attributes:
+        nome (str): Nome do trecho
+        partes (Tuple[Tuple[str, Optional[str]], ...]): Pares (texto fixo, campo seguinte)
+        campos (Tuple[str, ...]): Campos distintos, na ordem em que aparecem
+        renderizar (Callable[..., List[str]]): Função compilada; recebe a lista
+            de saída e os campos (posicionais ou nomeados) e devolve a lista
+    """
+
+    __slots__ = ('nome', 'partes', 'campos', 'renderizar')
+
+    def __init__(self, nome: str, texto: str) -> None:
+        """
+        Compila o trecho.
+
+        Args:
+            nome (str): Nome do trecho
+            texto (str): HTML com campos no formato ``{campo}``
+
+        Raises:
+            ValueError: Se algum campo não for um identificador simples
+        """
+        self._compilar(nome, tuple(
+            (literal, campo or None)
+            for literal, campo, _, _ in string.Formatter().parse(texto)
+        ))
+
+    def _compilar(self, nome: str, partes: Tuple[Tuple[str, Optional[str]], ...],
+                  aceitos: Iterable[str] = ()) -> None:
+        """
+        Gera a função de renderização a partir das partes do trecho.
+
+        Args:
+            nome (str): Nome do trecho
+            partes (Tuple[Tuple[str, Optional[str]], ...]): Pares (texto fixo, campo seguinte)
+            aceitos (Iterable[str]): Campos aceitos mesmo sem aparecer nas partes
+                (ex.: campo que só existia em um comentário removido)
+        """
+        campos: List[str] = []
+        for campo in [campo for _, campo in partes] + list(aceitos):
+            if campo is None or campo in campos:
+                continue
+            if not campo.isidentifier():
+                raise ValueError(f"Campo inválido no trecho '{nome}': {{{campo}}}")
+            campos.append(campo)
+
+        indices = {campo: i for i, campo in enumerate(campos)}
+        sequencia: List[Any] = []
+        for literal, campo in partes:
+            if literal:
+                sequencia.append(literal)
+            if campo is not None:
+                sequencia.append(indices[campo])
+
+        self.nome = nome
+        self.partes = partes
+        self.campos = tuple(campos)
+        self.renderizar = _criar_renderizador(nome, self.campos, tuple(sequencia))
+
+    @property
+    def literais(self) -> List[str]:
+        """Partes fixas não vazias do trecho."""
+        return [literal for literal, _ in self.partes if literal]
+
+    def compactar(self) -> "TrechoCompilado":
+        """
+        Retorna uma cópia minificada do trecho (ver ``minificar_html``).
+
+        Os campos são preservados como marcadores durante a minificação, de
+        forma que espaços vizinhos a valores variáveis sejam mantidos. Campos
+        que só apareciam em comentários continuam aceitos pela renderização.
+
+        Returns:
+            TrechoCompilado: Novo trecho com os mesmos campos
+        """
+        texto = "".join(
+            literal + (f"\x00{i}\x00" if campo is not None else "")
+            for i, (literal, campo) in enumerate(self.partes)
+        )
+        pedacos = re.split(r'\x00(\d+)\x00', minificar_html(texto))
+
+        # pedacos alterna texto fixo e índice da parte original do campo
+        partes: List[Tuple[str, Optional[str]]] = []
+        for i in range(0, len(pedacos), 2):
+            campo = self.partes[int(pedacos[i + 1])][1] if i + 1 < len(pedacos) else None
+            partes.append((pedacos[i], campo))
+
+        trecho = TrechoCompilado.__new__(TrechoCompilado)
+        trecho._compilar(self.nome, tuple(partes), aceitos=self.campos)
+        return trecho
+
+    def fixar(self, **valores: str) -> "TrechoCompilado":
+        """
+        Retorna uma cópia do trecho com alguns campos já preenchidos.
+
+        Os valores fixados são incorporados às partes fixas vizinhas, de forma
+        que não tenham custo nas renderizações seguintes.
+
+        Args:
+            **valores (str): Campo -> texto definitivo
+
+        Returns:
+            TrechoCompilado: Novo trecho sem os campos informados
+        """
+        partes: List[Tuple[str, Optional[str]]] = []
+        acumulado = ""
+        for literal, campo in self.partes:
+            acumulado += literal
+            if campo in valores:
+                acumulado += valores[campo]
+                continue
+            partes.append((acumulado, campo))
+            acumulado = ""
+        if acumulado:
+            partes.append((acumulado, None))
+
+        trecho = TrechoCompilado.__new__(TrechoCompilado)
+        trecho._compilar(self.nome, tuple(partes))
+        return trecho
+
+
+# Conteúdo do campo {logo} do cabeçalho
+LOGO_IMAGEM = '<img src="{src}" alt="MMZR Family Office" width="100" height="50" style="width: 100px !important; height: 50px !important; max-width: 100px !important; max-height: 50px !important; display: block !important; border: 0 !important;" border="0">'
+LOGO_TEXTO = '<div style="width: 100px; height: 50px; display: block; background-color: #ffffff; border: 1px solid #ffffff; border-radius: 4px; display: flex; align-items: center; justify-content: center; color: #0D2035; font-weight: bold; font-size: 12px; text-align: center;">MMZR<br>Family<br>Office</div>'
+
+# Início do documento: head, CSS e cabeçalho (a logo é fixada por gerador)
+CABECALHO = TrechoCompilado("cabecalho", """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="color-scheme" content="light">
+    <meta name="supported-color-schemes" content="light">
+    <!--[if mso]>
+    <style type="text/css">
+    body, table, td {{font-family: Arial, Helvetica, sans-serif !important;}}
+    .logo-img {{
+        width: 100px !important;
+        height: 50px !important;
+        max-width: 100px !important;
+        max-height: 50px !important;
+    }}
+    .logo-container {{
+        width: 110px !important;
+        min-width: 110px !important;
+        max-width: 110px !important;
+    }}
+    </style>
+    <![endif]-->
+    <style>
+    /* Estilos para forçar modo claro em dispositivos com tema escuro */
+    :root {{
+        color-scheme: light;
+        supported-color-schemes: light;
+    }}
+    /* CSS responsivo para logo */
+    .logo-container {{
+        width: 110px !important;
+        min-width: 110px !important;
+        max-width: 110px !important;
+    }}
+    .logo-img {{
+        width: 100px !important;
+        height: 50px !important;
+        max-width: 100px !important;
+        max-height: 50px !important;
+        display: block !important;
+        object-fit: contain !important;
+    }}
+    @media only screen and (max-width: 600px) {{
+        .logo-container {{
+            width: 80px !important;
+            min-width: 80px !important;
+            max-width: 80px !important;
+        }}
+        .logo-img {{
+            width: 75px !important;
+            max-width: 75px !important;
+            max-height: 38px !important;
+        }}
+        .header-text {{
+            font-size: 18px !important;
+        }}
+        .header-subtext {{
+            font-size: 12px !important;
+        }}
+    }}
+    @media (prefers-color-scheme: dark) {{
+        body,
+        .body-wrapper {{
+            background-color: #f4f4f4 !important;
+        }}
+        .content-wrapper {{
+            background-color: #ffffff !important;
+            color: #333333 !important;
+        }}
+        .header-bg {{
+            background-color: #0D2035 !important;
+        }}
+        .header-text {{
+            color: #ffffff !important;
+        }}
+        .section-bg {{
+            background-color: #ffffff !important;
+        }}
+        .performance-header {{
+            color: #0D2035 !important;
+            border-bottom-color: #e0e0e0 !important;
+        }}
+        .data-table {{
+            background-color: #ffffff !important;
+        }}
+        .table-header {{
+            background-color: #f8f9fa !important;
+            color: #0D2035 !important;
+        }}
+        .highlight-section {{
+            background-color: #f8f9fa !important;
+        }}
+        .promoters-section {{
+            background-color: #e8f5e9 !important;
+        }}
+        .detractors-section {{
+            background-color: #ffebee !important;
+        }}
+        td, th, p, h1, h2, h3, h4, h5, h6, li {{
+            color: inherit !important;
+        }}
+        .portfolio-header {{
+            background-color: #0D2035 !important;
+            color: #ffffff !important;
+        }}
+    </style>
+</head>
+<body class="body-wrapper" style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Helvetica', 'Arial', sans-serif; line-height: 1.4; color: #333333; background-color: #f4f4f4;">
+    <table role="presentation" style="width: 100%; border-collapse: collapse; border: 0; border-spacing: 0; background: #f4f4f4;">
+        <tr>
+            <td align="center" style="padding: 0;">
+                <table role="presentation" class="content-wrapper" style="width: 100%; max-width: 800px; border-collapse: collapse; border: 0; border-spacing: 0; text-align: left; background: #ffffff; box-shadow: 0 2px 10px rgba(0,0,0,0.1);">
+                    <!-- Header -->
+                    <tr>
+                        <td style="padding: 0;">
+                            <table role="presentation" class="header-bg" style="width: 100%; border-collapse: collapse; background: #0D2035;">
+                                <tr>
+                                    <td style="padding: 10px;">
+                                        <table role="presentation" style="width: 100%; border-collapse: collapse;">
+                                            <tr>
+                                                <td style="width: 110px; max-width: 110px; min-width: 110px; vertical-align: middle;">
+                                                    <table role="presentation" style="width: 110px; max-width: 110px; border-collapse: collapse;">
+                                                        <tr>
+                                                            <td style="width: 110px; max-width: 110px; text-align: left; padding: 3px;">
+                                                                {logo}
+                                                            </td>
+                                                        </tr>
+                                                    </table>
+                                                </td>
+                                                <td style="text-align: left; vertical-align: middle; padding-left: 15px;">
+                                                    <p class="header-text" style="margin: 0; font-size: 21px; color: #ffffff; opacity: 0.9; line-height: 1.2;">MMZR Family Office</p>
+                                                    <p class="header-text header-subtext" style="margin: 0; font-size: 14px; color: #ffffff; opacity: 0.9; line-height: 1.2;">Relatório Mensal de Performance - {mes} de {ano}</p>
+                                                </td>
+                                            </tr>
+                                        </table>
+                                    </td>
+                                </tr>
+                            </table>
+                        </td>
+                    </tr>
+                    
+                    <!-- Content -->
+                    <tr>
+                        <td class="section-bg" style="padding: 20px 20px; background-color: #ffffff;">
+                            <h2 style="font-size: 15px; color: #0D2035; margin-bottom: 12px; margin-top: 0;">Olá {nome_cliente},</h2>
+                            
+                            <p style="margin-top: 0; margin-bottom: 9px; ">Segue o relatório mensal com o desempenho de suas carteiras referente a <strong>{data}</strong>.</p>""")
+
+# Fim da área de conteúdo e rodapé
+RODAPE = TrechoCompilado("rodape", """
+                        </td>
+                    </tr>
+                    
+                    <!-- Footer -->
+                    <tr>
+                        <td style="background-color: #f8f9fa; padding: 12px 20px; text-align: center;">
+                            <p style="margin: 0 0 3px 0; color: #666666; font-size: 11px;">MMZR Family Office | Gestão de Patrimônio</p>
+                            <p style="margin: 0 0 3px 0; color: #666666; font-size: 11px;">Este é um email automático. Por favor, não responda.</p>
+                            <p style="margin: 0; color: #666666; font-size: 11px;">© {ano} MMZR Family Office. Todos os direitos reservados.</p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>""")
+
+# Bloco de uma carteira (as seções são separadas por CARTEIRA_SEPARADOR)
+CARTEIRA_INICIO = TrechoCompilado("carteira_inicio", """
+                            <!-- Carteira: {nome} -->
+                            <table role="presentation" style="width: 100%; margin: 20px 0 0 0; border: 1px solid #e0e0e0; border-radius: 8px; overflow: hidden; box-shadow: 0 1px 3px rgba(0,0,0,0.1); background-color: #ffffff;">
+                                <tr>
+                                    <td class="header-bg portfolio-header" style="background-color: #0D2035; color: #ffffff; padding: 10px 15px;">
+                                        <h3 style="margin: 0; font-size: 16px; font-weight: 500;">{nome} <span style="font-weight: 300; font-size: 13px; margin-left: 8px; opacity: 0.8;">| {tipo}</span></h3>
+                                    </td>
+                                </tr>
+                                <tr>
+                                    <td class="section-bg" style="padding: 15px; background-color: #ffffff;">
+                                        """)
+
+CARTEIRA_SEPARADOR = TrechoCompilado("carteira_separador", """
+                                        
+                                        """)
+
+CARTEIRA_FIM = TrechoCompilado("carteira_fim", """
+                                    </td>
+                                </tr>
+                            </table>
+""")
+
+# Tabela de performance
+PERFORMANCE_INICIO = TrechoCompilado("performance_inicio", """
+                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 0 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Performance</h4>
+                                        <table role="presentation" class="data-table" style="width: 100%; border-collapse: collapse; font-size: 13px; margin-bottom: 15px; background-color: #ffffff;">
+                                            <thead>
+                                                <tr>
+                                                    <th class="table-header" style="background-color: #f8f9fa; color: #0D2035; font-weight: 600; padding: 8px 6px; text-align: left; border-bottom: 1px solid #dee2e6;">Período</th>
+                                                    <th class="table-header" style="background-color: #f8f9fa; color: #0D2035; font-weight: 600; padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6;">Carteira</th>
+                                                    <th class="table-header" style="background-color: #f8f9fa; color: #0D2035; font-weight: 600; padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6;">Benchmark</th>
+                                                    <th class="table-header" style="background-color: #f8f9fa; color: #0D2035; font-weight: 600; padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6;">Carteira vs. Benchmark</th>
+                                                </tr>
+                                            </thead>
+                                            <tbody>
+""")
+
+PERFORMANCE_LINHA = TrechoCompilado("performance_linha", """
+                                                <tr>
+                                                    <td style="padding: 8px 6px; text-align: left; border-bottom: 1px solid #dee2e6; background-color: #ffffff;">{periodo}</td>
+                                                    <td style="padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6; color: {cor_carteira}; font-weight: 500; background-color: #ffffff;">{carteira}</td>
+                                                    <td style="padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6; background-color: #ffffff;">{benchmark}</td>
+                                                    <td style="padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6; color: {cor_diferenca}; font-weight: 500; background-color: #ffffff;">{diferenca}</td>
+                                                </tr>
+""")
+
+PERFORMANCE_RETORNO = TrechoCompilado("performance_retorno", """
+                                                <tr>
+                                                    <td style="padding: 8px 6px; text-align: left; border-bottom: 1px solid #dee2e6; font-weight: 500; background-color: #ffffff;">Retorno Financeiro:</td>
+                                                    <td style="padding: 8px 6px; text-align: center; border-bottom: 1px solid #dee2e6; color: {cor}; font-weight: 500; background-color: #ffffff;" colspan="3">{retorno}</td>
+                                                </tr>
+""")
+
+PERFORMANCE_FIM = TrechoCompilado("performance_fim", """
+                                            </tbody>
+                                        </table>
+""")
+
+# Seção avulsa de retorno financeiro
+RETORNO_FINANCEIRO = TrechoCompilado("retorno_financeiro", """
+                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 20px 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Retorno Financeiro</h4>
+                                        <p style="font-size: 15px; margin: 8px 0 15px 0; padding: 10px; background-color: #f8f9fa; border-radius: 5px; text-align: center; font-weight: 500; color: #0D2035;">
+                                            {retorno}
+                                        </p>
+""")
+
+# Listas de estratégias e ativos
+ESTRATEGIAS_INICIO = TrechoCompilado("estrategias_inicio", """
+                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 20px 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Estratégias de Destaque</h4>
+                                        <ul class="highlight-section" style="margin: 8px 0 15px 0; padding: 10px 10px 10px 30px; background-color: #f8f9fa; border-radius: 5px; color: #333333;">
+""")
+
+PROMOTORES_INICIO = TrechoCompilado("promotores_inicio", """
+                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 20px 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Ativos Promotores</h4>
+                                        <ul class="promoters-section" style="margin: 8px 0 15px 0; padding: 10px 10px 10px 30px; background-color: #e8f5e9; border-radius: 5px; color: #2e7d32;">
+""")
+
+DETRATORES_INICIO = TrechoCompilado("detratores_inicio", """
+                                        <h4 class="performance-header" style="font-size: 18px; color: #0D2035; margin: 20px 0 12px 0; font-weight: 500; border-bottom: 1px solid #e0e0e0; padding-bottom: 8px;">Ativos Detratores</h4>
+                                        <ul class="detractors-section" style="margin: 8px 0 15px 0; padding: 10px 10px 10px 30px; background-color: #ffebee; border-radius: 5px; color: #c62828;">
+""")
+
+LISTA_ITEM = TrechoCompilado("lista_item", """
+                                            <li style="margin-bottom: 6px; font-size: 13px;">{item}</li>
+""")
+
+LISTA_FIM = TrechoCompilado("lista_fim", """
+                                        </ul>
+""")
+
+# Observações finais
+OBSERVACOES_INICIO = TrechoCompilado("observacoes_inicio", """
+                            <!-- Observações finais -->
+                            <table role="presentation" style="width: 100%; margin-top: 20px; border-collapse: collapse; background-color: #f8f9fa; border: 1px solid #e9ecef;">
+                                <tr>
+                                    <td style="padding: 15px;">
+                                        <p style="margin: 0 0 12px 0; color: #555555; font-size: 13px; line-height: 18px;">
+                                            <strong style="font-weight: bold;">Obs.:</strong> Eventuais ajustes retroativos do IPCA, após a divulgação oficial do indicador, podem impactar marginalmente a rentabilidade do portfólio no mês anterior.
+                                        </p>
+                                        <p style="margin: 0; color: #555555; font-size: 12px; font-style: italic; line-height: 16px;">
+                                            <strong style="font-weight: bold;">Obs.:</strong> Conforme solicitado, deixo o Felipe e Fernandito em cópia para também receberem as informações.
+                                        </p>""")
+
+OBSERVACOES_COMENTARIO = TrechoCompilado("observacoes_comentario", """
+                                        <p style="margin: 12px 0 0 0; color: #555555; font-size: 13px; line-height: 18px;">
+                                            <strong style="font-weight: bold;">Comentário:</strong> {comentario}
+                                        </p>""")
+
+OBSERVACOES_FIM = TrechoCompilado("observacoes_fim", """
+                                    </td>
+                                </tr>
+                            </table>
+""")
+
+# Principais indicadores
+INDICADORES = TrechoCompilado("indicadores", """
+                            <!-- Principais indicadores -->
+                            <table role="presentation" style="width: 100%; margin-top: 15px; border-collapse: collapse; background-color: #f8f9fa; border: 1px solid #e9ecef;">
+                                <tr>
+                                    <td style="padding: 12px;">
+                                        <p style="margin: 0 0 8px 0; font-weight: bold; color: #333333; font-size: 13px; line-height: 16px;">Principais indicadores:</p>
+                                        <p style="margin: 0; color: #555555; font-size: 11px; line-height: 15px;">
+                                            Locais: CDI: +1,06%, Ibovespa: +3,69%, Prefixados (IRF-M): +2,99%, Ativos IPCA (IMA-B): +2,09%, Imobiliários (IFIX): +3,01%, Dólar (Ptax): -1,42%, Multimercados (IHFA): +3,85%<br>
+                                            Internacionais: MSCI AC: +0,77%, S&P 500 -0,76%, Euro Stoxx 600 -1,21%, MSCI China -4,55%, MSCI EM +1,04%, Ouro +5,29%, Petróleo BRENT -14,97%, Minério de ferro -2,68% e Bitcoin (IBIT) +14,31%
+                                        </p>
+                                    </td>
+                                </tr>
+                            </table>
+""")
+
+# Botão da carta mensal
+BOTAO_CARTA = TrechoCompilado("botao_carta", """
+                            <!-- Link para carta mensal como botão azul -->
+                            <table role="presentation" style="width: 100%; margin-top: 25px; border-collapse: collapse;">
+                                <tr>
+                                    <td align="center" style="padding: 0;">
+                                        <table role="presentation" style="border-collapse: collapse; background-color: #0D2035; border-radius: 4px;">
+                                            <tr>
+                                                <td style="padding: 12px 24px; text-align: center;">
+                                                    <a href="{carta_link}" target="_blank" style="color: #ffffff; text-decoration: none; font-weight: bold; font-size: 14px; line-height: 18px;">Confira nossa carta completa: Carta {mes} {ano}</a>
+                                                </td>
+                                            </tr>
+                                        </table>
+                                    </td>
+                                </tr>
+                            </table>
+""")
+
+
+def calcular_versao(trechos: Iterable[TrechoCompilado], *textos: str) -> str:
+    """
+    Calcula a versão do template a partir do texto dos trechos.
+
+    Qualquer alteração no HTML muda a versão, invalidando seções memorizadas
+    e entradas do manifesto geradas com o texto anterior.
+
+    Args:
+        trechos (Iterable[TrechoCompilado]): Trechos do template
+        *textos (str): Textos adicionais (ex.: conteúdo da logo)
+
+    Returns:
+        str: Os 12 primeiros dígitos do SHA-1 do texto
+    """
+    resumo = hashlib.sha1()
+    for trecho in trechos:
+        resumo.update(repr((trecho.nome, trecho.partes)).encode('utf-8'))
+    for texto in textos:
+        resumo.update(texto.encode('utf-8'))
+    return resumo.hexdigest()[:12]
+
+
+class MMZRTemplate:
+    """
+    Template do relatório compilado para um gerador.
+
+    As partes que dependem apenas do gerador (a logo embutida no cabeçalho)
+    são preenchidas uma única vez na criação. Todas as partes fixas ficam
+    também disponíveis como bytes UTF-8, reaproveitados por ``codificar``.
+    Cada trecho de ``TRECHOS`` fica disponível como atributo de mesmo nome
+    (ex.: ``template.rodape``), já minificado no modo compacto.
+
+    Attributes:
+        cabecalho (TrechoCompilado): Cabeçalho com a logo já incorporada
+        compacto (bool): Se os trechos foram minificados
+        versao (str): Versão do template (TEMPLATE_VERSION)
+    """
+
+    TRECHOS: Dict[str, TrechoCompilado] = {
+        'rodape': RODAPE,
+        'carteira_inicio': CARTEIRA_INICIO,
+        'carteira_separador': CARTEIRA_SEPARADOR,
+        'carteira_fim': CARTEIRA_FIM,
+        'performance_inicio': PERFORMANCE_INICIO,
+        'performance_linha': PERFORMANCE_LINHA,
+        'performance_retorno': PERFORMANCE_RETORNO,
+        'performance_fim': PERFORMANCE_FIM,
+        'retorno_financeiro': RETORNO_FINANCEIRO,
+        'estrategias_inicio': ESTRATEGIAS_INICIO,
+        'promotores_inicio': PROMOTORES_INICIO,
+        'detratores_inicio': DETRATORES_INICIO,
+        'lista_item': LISTA_ITEM,
+        'lista_fim': LISTA_FIM,
+        'observacoes_inicio': OBSERVACOES_INICIO,
+        'observacoes_comentario': OBSERVACOES_COMENTARIO,
+        'observacoes_fim': OBSERVACOES_FIM,
+        'indicadores': INDICADORES,
+        'botao_carta': BOTAO_CARTA,
+    }
+
+    # Templates já compilados neste processo: (src da logo, compacto) -> template
+    _instancias: Dict[Tuple[str, bool], "MMZRTemplate"] = {}
+
+    def __init__(self, logo_src: str = "", compacto: bool = False) -> None:
+        """
+        Prepara o cabeçalho e os bytes das partes fixas.
+
+        Args:
+            logo_src (str): Atributo src da logo, data URI base64 ou referência
+                ``cid:`` (vazio usa o bloco de texto)
+            compacto (bool): Minifica todos os trechos (ver ``minificar_html``)
+        """
+        logo = LOGO_IMAGEM.format(src=logo_src) if logo_src else LOGO_TEXTO
+        self.cabecalho = CABECALHO.fixar(logo=logo)
+        if compacto:
+            self.cabecalho = self.cabecalho.compactar()
+        self.compacto = compacto
+        self.versao = TEMPLATE_VERSION
+
+        self._bytes: Dict[str, bytes] = {}
+        for literal in self.cabecalho.literais:
+            self._bytes[literal] = literal.encode('utf-8')
+        for nome, trecho in self.TRECHOS.items():
+            if compacto:
+                trecho = trecho.compactar()
+            setattr(self, nome, trecho)
+            for literal in trecho.literais:
+                self._bytes[literal] = literal.encode('utf-8')
+
+    @classmethod
+    def para_logo(cls, logo_src: str = "", compacto: bool = False) -> "MMZRTemplate":
+        """
+        Retorna o template compilado para uma logo, compartilhado no processo.
+
+        Geradores criados com a mesma logo (o caso normal) reaproveitam o
+        mesmo cabeçalho compilado e os mesmos bytes pré-codificados.
+
+        Args:
+            logo_src (str): Atributo src da logo (ver ``__init__``)
+            compacto (bool): Minifica todos os trechos
+
+        Returns:
+            MMZRTemplate: Template compilado
+        """
+        chave = (logo_src, compacto)
+        template = cls._instancias.get(chave)
+        if template is None:
+            if len(cls._instancias) >= 8:
+                cls._instancias.clear()
+            template = cls._instancias[chave] = cls(logo_src, compacto)
+        return template
+
+    def codificar(self, fragmentos: Iterable[str]) -> List[bytes]:
+        """
+        Converte fragmentos renderizados em bytes UTF-8.
+
+        Partes fixas usam os bytes pré-codificados; apenas os valores
+        variáveis são codificados a cada chamada.
+
+        Args:
+            fragmentos (Iterable[str]): Fragmentos produzidos pelos trechos
+
+        Returns:
+            List[bytes]: Fragmentos codificados, na mesma ordem
+        """
+        pre_codificados = self._bytes
+        return [pre_codificados.get(fragmento) or fragmento.encode('utf-8') for fragmento in fragmentos]
+
+
+# Versão do template, derivada do texto de todos os trechos
+TEMPLATE_VERSION = calcular_versao([CABECALHO, *MMZRTemplate.TRECHOS.values()], LOGO_IMAGEM, LOGO_TEXTO)
+
+
+class MemoriaSecoes:
+    """
+    Memória limitada das seções que não dependem do cliente.
+
+    Seções como principais indicadores, botão da carta mensal, observações
+    sem comentário e assunto do email são idênticas para todos os clientes
+    de um mesmo mês. Cada valor é guardado sob uma referência (mês de
+    referência + versão do template) e uma chave (nome da seção +
+    argumentos); quando a referência muda, tudo o que foi guardado para a
+    referência anterior é descartado.
+
+    Attributes:
+        referencia (Optional[Hashable]): Referência dos valores guardados
+        tamanho_maximo (int): Quantidade máxima de seções guardadas
+        acertos (int): Consultas atendidas pela memória
+        falhas (int): Consultas que precisaram renderizar a seção
+    """
+
+    def __init__(self, tamanho_maximo: int = TAMANHO_MAXIMO_MEMORIA) -> None:
+        """
+        Inicializa a memória vazia.
+
+        Args:
+            tamanho_maximo (int): Quantidade máxima de seções guardadas
+        """
+        self.referencia: Optional[Hashable] = None
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self._valores: Dict[Hashable, Any] = {}
+
+    def obter(self, referencia: Hashable, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor guardado para a chave ou o calcula e guarda.
+
+        Args:
+            referencia (Hashable): Mês de referência e versão do template
+            chave (Hashable): Nome da seção e argumentos
+            calcular (Callable[[], Any]): Função sem argumentos que produz o valor
+
+        Returns:
+            Any: Valor da seção
+        """
+        if referencia != self.referencia:
+            self.limpar()
+            self.referencia = referencia
+
+        try:
+            valor = self._valores[chave]
+        except KeyError:
+            pass
+        else:
+            self.acertos += 1
+            return valor
+
+        self.falhas += 1
+        valor = calcular()
+        if len(self._valores) >= self.tamanho_maximo:
+            # Descartar a entrada mais antiga
+            del self._valores[next(iter(self._valores))]
+        self._valores[chave] = valor
+        return valor
+
+    def limpar(self) -> None:
+        """Descarta todas as seções guardadas."""
+        self._valores.clear()
+        self.referencia = None
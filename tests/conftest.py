@@ -0,0 +1,51 @@
+"""
+Fixtures compartilhadas pelos testes do sistema MMZR.
+
+Os testes rodam em uma cópia temporária da pasta ``documentos`` (planilhas de
+exemplo e logos), de modo que caches, manifestos e relatórios gerados não
+sujam o repositório.
+"""
+
+import os
+import sys
+import shutil
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+PASTA_DADOS = os.path.join("documentos", "dados")
+PLANILHA_BASE = os.path.join(PASTA_DADOS, "Planilha Inteli.xlsm")
+PLANILHA_RENTABILIDADE = os.path.join(PASTA_DADOS, "Planilha Inteli - dados de rentabilidade.xlsx")
+
+
+@pytest.fixture
+def pasta_trabalho(tmp_path, monkeypatch):
+    """Cópia das planilhas de exemplo, logos e configuração; muda o diretório atual para ela."""
+    shutil.copytree(os.path.join(RAIZ, "documentos", "dados"), tmp_path / PASTA_DADOS,
+                    ignore=shutil.ignore_patterns(".mmzr_cache"))
+    shutil.copytree(os.path.join(RAIZ, "documentos", "img"), tmp_path / "documentos" / "img")
+    shutil.copy(os.path.join(RAIZ, "config_planilhas.json"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def dataset(pasta_trabalho):
+    """Planilhas de exemplo carregadas sem cache em disco e sem processos auxiliares."""
+    from mmzr_dataset import MMZRDataset
+
+    return MMZRDataset.carregar(PLANILHA_BASE, PLANILHA_RENTABILIDADE, usar_cache=False, paralelo=False)
+
+
+def alterar_celula(caminho, coluna, linha, valor):
+    """Altera uma célula da primeira aba (linha 2 = primeira linha de dados)."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(caminho)
+    planilha = workbook.worksheets[0]
+    cabecalho = [celula.value for celula in planilha[1]]
+    planilha.cell(linha, cabecalho.index(coluna) + 1).value = valor
+    workbook.save(caminho)
@@ -0,0 +1,43 @@
+"""Testes da formatação em bloco da tabela de performance (mmzr_apresentacao)."""
+
+import math
+
+import pytest
+
+from mmzr_apresentacao import apresentar_rentabilidade, cores, formatar_moedas, formatar_percentuais
+from mmzr_email_generator import MMZREmailGenerator
+
+VALORES = [0.0, -0.0, 0.004, -0.004, 1.005, 2.675, -17026.39, 999.995, -1234567.891, 1e12,
+           float('nan'), float('inf')]
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return MMZREmailGenerator()
+
+
+def _cor(valor):
+    return "#28a745" if valor > 0 else "#dc3545" if valor < 0 else "#333333"
+
+
+def test_formatacao_em_bloco_equivale_a_formatacao_por_valor(generator):
+    assert list(formatar_percentuais(VALORES)) == [generator.format_percentage(v) for v in VALORES]
+    assert list(formatar_percentuais(VALORES, " p.p.")) == \
+        [generator.format_percentage(v).replace('%', ' p.p.') for v in VALORES]
+    assert list(formatar_moedas(VALORES)) == [generator.format_currency(v) for v in VALORES]
+    assert list(cores(VALORES)) == [_cor(v) for v in VALORES]
+
+
+def test_apresentacao_da_planilha_indexada_por_codigo(dataset, generator):
+    apresentacao = apresentar_rentabilidade(dataset.rentabilidade)
+
+    assert list(apresentacao.index) == list(dataset.rentabilidade['Código carteira smart'])
+    for codigo, linha in dataset.rentabilidade.set_index('Código carteira smart').iterrows():
+        esperado = apresentacao.loc[codigo]
+        retorno = 0 if math.isnan(linha['Retorno Financeiro']) else linha['Retorno Financeiro']
+        assert esperado['carteira_mes'] == generator.format_percentage(linha['Rentabilidade Carteira Mês'])
+        assert esperado['benchmark_ano'] == generator.format_percentage(linha['Benchmark No Ano'])
+        assert esperado['diferenca_ano'] == \
+            generator.format_percentage(linha['Variação Relativa No Ano']).replace('%', ' p.p.')
+        assert esperado['cor_diferenca_mes'] == _cor(linha['Variação Relativa Mês'])
+        assert (esperado['cor_retorno'], esperado['retorno']) == (_cor(retorno), generator.format_currency(retorno))
@@ -0,0 +1,42 @@
+"""Testes da interpretação dos rótulos de ativos (mmzr_ativos)."""
+
+import pytest
+
+import mmzr_ativos
+from mmzr_ativos import interpretar_ativo, interpretar_coluna
+from mmzr_email_generator import MMZREmailGenerator
+from mmzr_integracao_real import montar_carteiras
+
+
+@pytest.mark.parametrize("texto, nome, percentual, sinal, rotulo_promotor", [
+    ("JUPITER GLOBAL (1.16%)", "JUPITER GLOBAL", 1.16, 1, "JUPITER GLOBAL (+1.16%)"),
+    ("BLACKROCK TECH (-11,23%)", "BLACKROCK TECH", -11.23, -1, "BLACKROCK TECH (-11,23%)"),
+    ("CAIXA (+2%)", "CAIXA", 2.0, 1, "CAIXA (+2%)"),
+    ("NEUTRO (0%)", "NEUTRO", 0.0, 0, "NEUTRO (0%)"),
+    ("SEM PERCENTUAL", "SEM PERCENTUAL", None, None, "SEM PERCENTUAL"),
+])
+def test_interpreta_rotulo(texto, nome, percentual, sinal, rotulo_promotor):
+    ativo = interpretar_ativo(texto)
+
+    assert (ativo.nome, ativo.percentual, ativo.sinal, ativo.rotulo_promotor) == \
+        (nome, percentual, sinal, rotulo_promotor)
+
+
+def test_coluna_equivale_a_interpretacao_individual(monkeypatch):
+    textos = ["A (1.5%)", "B (-0,94%)", None, "A (1.5%)", "C"]
+    individuais = {texto: interpretar_ativo(texto) for texto in textos if texto}
+    monkeypatch.setattr(mmzr_ativos, "_cache_ativos", {})
+
+    assert interpretar_coluna(textos) == 3
+    assert interpretar_coluna(textos) == 0
+    assert mmzr_ativos._cache_ativos == individuais
+
+
+def test_montagem_interpreta_os_promotores_em_bloco(dataset, monkeypatch):
+    monkeypatch.setattr(mmzr_ativos, "_cache_ativos", {})
+
+    relatorios = montar_carteiras(dataset, dataset.clientes, MMZREmailGenerator())
+
+    promotores = {ativo for relatorio in relatorios for carteira in relatorio.carteiras
+                  for ativo in carteira.ativos_promotores if ativo != "Sem ativos promotores"}
+    assert promotores and promotores <= set(mmzr_ativos._cache_ativos)
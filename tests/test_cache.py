@@ -0,0 +1,71 @@
+"""Testes do cache em disco das abas das planilhas (mmzr_cache)."""
+
+import os
+import pickle
+
+import pandas as pd
+import pytest
+
+from mmzr_cache import MMZRCache
+from mmzr_schema import EsquemaAba
+
+
+@pytest.fixture
+def planilha(tmp_path):
+    caminho = tmp_path / "dados.xlsx"
+    pd.DataFrame({'A': [1, 2], 'B': ['x', 'y']}).to_excel(caminho, index=False)
+    return str(caminho)
+
+
+def _entradas(cache_dir):
+    return sorted(nome for nome in os.listdir(cache_dir) if not nome.startswith("."))
+
+
+def test_reutiliza_entrada_da_mesma_versao(planilha, tmp_path, monkeypatch):
+    cache = MMZRCache(diretorio=str(tmp_path / "cache"))
+    primeiro = cache.ler_aba(planilha)
+    assert cache.contem_aba(planilha)
+
+    def falhar(*args, **kwargs):
+        raise AssertionError("o Excel não deveria ser lido de novo")
+
+    monkeypatch.setattr(pd, "read_excel", falhar)
+    pd.testing.assert_frame_equal(cache.ler_aba(planilha), primeiro)
+
+
+def test_planilha_modificada_descarta_entradas_antigas(planilha, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = MMZRCache(diretorio=str(cache_dir))
+    cache.ler_aba(planilha)
+    antiga = _entradas(cache_dir)
+
+    pd.DataFrame({'A': [3], 'B': ['z']}).to_excel(planilha, index=False)
+    os.utime(planilha, ns=(1, 1))
+    df = cache.ler_aba(planilha)
+
+    assert df['A'].tolist() == [3]
+    atual = _entradas(cache_dir)
+    assert len(atual) == 1 and atual != antiga
+
+
+def test_mudanca_de_esquema_descarta_entrada_da_mesma_aba(planilha, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = MMZRCache(diretorio=str(cache_dir))
+    cache.ler_aba(planilha, esquema=EsquemaAba("Teste", {'A': None}))
+    cache.ler_aba(planilha, esquema=EsquemaAba("Teste", {'A': None, 'B': None}))
+
+    assert len(_entradas(cache_dir)) == 1
+
+
+def test_gravacao_que_falha_nao_deixa_temporario(planilha, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    cache = MMZRCache(diretorio=str(cache_dir))
+
+    def falhar(*args, **kwargs):
+        raise pickle.PicklingError("valor não serializável")
+
+    monkeypatch.setattr(pickle, "dump", falhar)
+    df = cache.ler_aba(planilha)
+
+    assert df['A'].tolist() == [1, 2]
+    assert os.listdir(cache_dir) == []
@@ -0,0 +1,29 @@
+"""Testes da detecção e validação das planilhas (mmzr_compatibilidade)."""
+
+import pandas as pd
+
+from conftest import PLANILHA_BASE, PLANILHA_RENTABILIDADE
+from mmzr_compatibilidade import MMZRCompatibilidade
+
+
+def test_lista_abas_sem_interpretar_a_planilha(pasta_trabalho, monkeypatch):
+    def falhar(*args, **kwargs):
+        raise AssertionError("a sonda não deveria abrir a planilha com o pandas")
+
+    monkeypatch.setattr(pd, "ExcelFile", falhar)
+    monkeypatch.setattr(pd, "read_excel", falhar)
+
+    assert MMZRCompatibilidade._listar_abas(PLANILHA_BASE) == ['Textos', 'Base Consolidada', 'Base Clientes', 'Base Nova']
+    assert MMZRCompatibilidade._listar_abas(PLANILHA_RENTABILIDADE) == ['Sheet1']
+
+
+def test_valida_abas_necessarias(pasta_trabalho):
+    assert MMZRCompatibilidade._validar_abas(PLANILHA_BASE, ["Base Clientes", "Base Consolidada"])
+    assert not MMZRCompatibilidade._validar_abas(PLANILHA_BASE, ["Sheet1"])
+
+
+def test_arquivo_que_nao_e_planilha_e_rejeitado(tmp_path):
+    caminho = tmp_path / "corrompida.xlsx"
+    caminho.write_bytes(b"nao e um zip")
+
+    assert not MMZRCompatibilidade._validar_abas(str(caminho), ["Base Clientes"])
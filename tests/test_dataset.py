@@ -0,0 +1,92 @@
+"""Testes do carregamento único das planilhas (mmzr_dataset)."""
+
+import logging
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+import mmzr_dataset
+
+from conftest import PLANILHA_BASE, PLANILHA_RENTABILIDADE, RAIZ, alterar_celula
+from mmzr_cache import MMZRCache
+from mmzr_dataset import MMZRDataset
+
+
+def _carregar(**opcoes):
+    opcoes.setdefault('usar_cache', False)
+    opcoes.setdefault('paralelo', False)
+    return MMZRDataset.carregar(PLANILHA_BASE, PLANILHA_RENTABILIDADE, **opcoes)
+
+
+def test_cada_aba_e_lida_uma_vez_por_sessao(pasta_trabalho, monkeypatch):
+    leituras = []
+    ler_aba = MMZRCache.ler_aba
+
+    def contar(self, caminho, aba=0, **opcoes):
+        leituras.append(aba)
+        return ler_aba(self, caminho, aba, **opcoes)
+
+    monkeypatch.setattr(MMZRCache, "ler_aba", contar)
+    dataset = _carregar()
+    dataset.clientes
+    dataset.rentabilidade
+    dataset.filtrar_cliente("Helena Miranda")
+    dataset.clientes_com_rentabilidade
+
+    assert sorted(leituras) == ["Base Clientes", "Base Consolidada", "Sheet1"]
+
+
+def test_clientes_recebem_email_da_base_consolidada(pasta_trabalho):
+    dataset = _carregar()
+    carteiras = dataset.filtrar_cliente("helenamirandafm@gmail.com")
+
+    assert carteiras['Nome cliente'].unique().tolist() == ["Helena Miranda"]
+
+
+def test_importar_modulos_nao_configura_logging():
+    codigo = "import logging, mmzr_dataset; print(len(logging.getLogger().handlers))"
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip() == "0"
+
+
+def test_indice_de_rentabilidade_por_codigo(pasta_trabalho):
+    dataset = _carregar()
+    rentabilidade = dataset.rentabilidade
+
+    for posicao, codigo in enumerate(rentabilidade['Código carteira smart']):
+        assert dataset.registro_rentabilidade(codigo).equals(rentabilidade.iloc[posicao])
+    assert dataset.registro_rentabilidade(-1) is None
+
+
+def test_codigo_repetido_usa_a_primeira_linha(pasta_trabalho, caplog):
+    alterar_celula(PLANILHA_RENTABILIDADE, 'Código carteira smart', 3, 13317)
+    dataset = _carregar()
+
+    assert dataset.registro_rentabilidade(13317)['Retorno Financeiro'] == -17026.39
+    assert dataset.indice_rentabilidade == {13317: 0, 13357: 2}
+    assert "repetido" in caplog.text
+
+
+def test_leitura_paralela_produz_as_mesmas_abas(pasta_trabalho, monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger="mmzr_dataset")
+    sequencial = _carregar()
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    paralelo = _carregar(paralelo=True)
+
+    assert "abas lidas em paralelo" in caplog.text
+    pd.testing.assert_frame_equal(paralelo.clientes, sequencial.clientes)
+    pd.testing.assert_frame_equal(paralelo.rentabilidade, sequencial.rentabilidade)
+
+
+def test_abas_em_cache_nao_usam_processos(pasta_trabalho, monkeypatch):
+    _carregar(usar_cache=True)
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+
+    def falhar(*args, **kwargs):
+        raise AssertionError("abas já em cache não deveriam criar processos")
+
+    monkeypatch.setattr(mmzr_dataset, "ProcessPoolExecutor", falhar)
+    dataset = _carregar(usar_cache=True, paralelo=True)
+    assert len(dataset.clientes) == 3
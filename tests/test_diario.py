@@ -0,0 +1,92 @@
+"""Testes do diário de execução e da retomada (mmzr_diario, --resume)."""
+
+import glob
+import json
+import os
+
+from mmzr_compatibilidade import MMZRCompatibilidade
+from mmzr_diario import NOME_DIARIO, DiarioExecucao
+from mmzr_integracao_real import gerar_relatorio_integrado
+
+
+def _interromper(caminho, registros):
+    """Grava o diário de uma execução interrompida de 30/09/2026"""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        for registro in [{'tipo': 'inicio', 'versao_formato': DiarioExecucao.VERSAO_FORMATO,
+                          'data_ref': "2026-09-30T18:00:00", 'shard': None}, *registros]:
+            arquivo.write(json.dumps(registro) + "\n")
+
+
+def _contar_envios(monkeypatch):
+    destinatarios = []
+
+    def enviar(destinatario, assunto, caminho_html, **_):
+        destinatarios.append((destinatario, assunto))
+        return True
+
+    monkeypatch.setattr(MMZRCompatibilidade, "enviar_email", staticmethod(enviar))
+    return destinatarios
+
+
+def test_retomada_pula_os_clientes_ja_concluidos(dataset, capsys):
+    gerar_relatorio_integrado(dataset=dataset)
+    with open(NOME_DIARIO, encoding='utf-8') as arquivo:
+        registros = [json.loads(linha) for linha in arquivo]
+    assert registros[-1]['tipo'] == 'fim'
+    # Simula a interrupção logo depois do primeiro relatório
+    primeiro = next(r for r in registros if r['tipo'] == 'gerado')
+    with open(NOME_DIARIO, 'w', encoding='utf-8') as arquivo:
+        for registro in registros[:registros.index(primeiro) + 1]:
+            arquivo.write(json.dumps(registro) + "\n")
+    capsys.readouterr()
+
+    gerar_relatorio_integrado(dataset=dataset, retomar=True)
+
+    saida = capsys.readouterr().out
+    assert f"Relatório já gerado antes da interrupção: {primeiro['arquivo']}" in saida
+    assert saida.count("já gerado antes da interrupção") == 1
+    assert "1 clientes já concluídos antes da interrupção foram pulados" in saida
+
+
+def test_email_nao_e_criado_de_novo_mesmo_com_dados_alterados(dataset, monkeypatch, capsys):
+    destinatarios = _contar_envios(monkeypatch)
+    # O email de Helena saiu antes da interrupção, com dados que depois foram corrigidos
+    _interromper(NOME_DIARIO, [{'tipo': 'enviado', 'cliente': "Helena Miranda", 'hash': "hash-antigo",
+                                'email': "helenamirandafm@gmail.com"}])
+
+    gerar_relatorio_integrado(dataset=dataset, enviar_email=True, retomar=True)
+
+    assert [email for email, _ in destinatarios] == ["macielflorv@gmail.com"]
+    assert destinatarios[0][1].endswith("Setembro/2026")
+    assert "Email já criado antes da interrupção: helenamirandafm@gmail.com" in capsys.readouterr().out
+    assert len(glob.glob("relatorio_mensal_*.html")) == 2
+
+
+def test_retomada_usa_a_data_da_execucao_original(dataset):
+    os.makedirs("relatorios")
+    _interromper(os.path.join("relatorios", NOME_DIARIO), [])
+
+    gerar_relatorio_integrado(dataset=dataset, saida="relatorios", retomar=True)
+
+    arquivos = sorted(glob.glob("relatorios/relatorio_mensal_*.html"))
+    assert len(arquivos) == 2
+    assert all(caminho.endswith("_20260930.html") for caminho in arquivos)
+    for caminho in arquivos:
+        assert "Setembro:" in open(caminho, encoding='utf-8').read()
+    assert not os.path.exists(NOME_DIARIO)
+
+
+def test_diario_de_execucao_concluida_nao_e_retomado(dataset, monkeypatch, capsys):
+    destinatarios = _contar_envios(monkeypatch)
+    _interromper(NOME_DIARIO, [{'tipo': 'enviado', 'cliente': "Helena Miranda", 'hash': "hash-antigo",
+                                'email': "helenamirandafm@gmail.com"},
+                               {'tipo': 'fim', 'data': "2026-09-30T18:05:00"}])
+
+    gerar_relatorio_integrado(dataset=dataset, enviar_email=True, retomar=True)
+
+    assert "Retomando" not in capsys.readouterr().out
+    assert sorted(email for email, _ in destinatarios) == ["helenamirandafm@gmail.com", "macielflorv@gmail.com"]
+    assert glob.glob("relatorio_mensal_*_20260930.html") == []
+    with open(NOME_DIARIO, encoding='utf-8') as arquivo:
+        inicio = json.loads(arquivo.readline())
+    assert not inicio['data_ref'].startswith("2026-09-30")
@@ -0,0 +1,88 @@
+"""Testes do gerador de relatórios (mmzr_email_generator)."""
+
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import PLANILHA_BASE
+from mmzr_email_generator import MMZREmailGenerator
+from mmzr_integracao_real import montar_carteiras
+
+DATA_REF = datetime(2026, 10, 17)
+
+PALAVRAS = {
+    'performance': lambda texto: 'Performance' in texto,
+    'retorno': lambda texto: 'Retorno' in texto and 'Período' not in texto,
+    'estrategias': lambda texto: 'Estratégias de Destaque' in texto or 'Destaques' in texto,
+    'promotores': lambda texto: 'Promotores' in texto,
+    'detratores': lambda texto: 'Detratores' in texto,
+}
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return MMZREmailGenerator()
+
+
+def _varredura(df):
+    """Busca das âncoras célula a célula, como os métodos extract_* faziam."""
+    ancoras = {chave: [] for chave in PALAVRAS}
+    for i in range(len(df)):
+        for j in range(len(df.columns)):
+            valor = df.iat[i, j]
+            texto = str(valor) if pd.notna(valor) else ""
+            for chave, contem in PALAVRAS.items():
+                if contem(texto):
+                    ancoras[chave].append((i, j))
+    return ancoras
+
+
+def test_indice_de_ancoras_equivale_a_varredura(pasta_trabalho, generator):
+    df = pd.read_excel(PLANILHA_BASE, sheet_name="Textos")
+    assert generator.indexar_ancoras(df) == _varredura(df)
+
+
+def test_celula_longa_nao_infla_a_memoria_do_indice(generator):
+    df = pd.DataFrame(np.full((200, 20), "curto", dtype=object))
+    df.iat[0, 0] = "x" * 20_000
+    df.iat[5, 3] = "Ativos Promotores"
+
+    tracemalloc.start()
+    try:
+        ancoras = generator.indexar_ancoras(df)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert ancoras['promotores'] == [(5, 3)]
+    # Um array de largura fixa ocuparia 200 x 20 x 20.000 x 4 bytes (320 MB)
+    assert pico < 50 * 1024 * 1024
+
+
+def test_secoes_do_mes_sao_renderizadas_uma_vez(dataset):
+    generator = MMZREmailGenerator()
+    relatorios = montar_carteiras(dataset, dataset.clientes, generator)
+
+    htmls = [generator.generate_html_email(r.nome, DATA_REF, r.carteiras) for r in relatorios]
+    falhas = generator.secoes.falhas
+    repetidos = [generator.generate_html_email(r.nome, DATA_REF, r.carteiras) for r in relatorios]
+
+    assert repetidos == htmls
+    assert generator.secoes.falhas == falhas
+    assert generator.secoes.acertos > 0
+    # A memória não altera o HTML: um gerador novo produz o mesmo documento
+    assert htmls[-1] == MMZREmailGenerator().generate_html_email(
+        relatorios[-1].nome, DATA_REF, relatorios[-1].carteiras)
+
+
+def test_secoes_do_mes_seguem_o_mes_de_referencia(generator):
+    outubro = generator.generate_html_email("Cliente", DATA_REF, [])
+    novembro = generator.generate_html_email("Cliente", datetime(2026, 11, 3), [])
+
+    assert "carta-mensal-outubro-2026" in outubro
+    assert "carta-mensal-novembro-2026" in novembro and "outubro" not in novembro.lower()
+    assert generator.generate_email_subject(DATA_REF).endswith("Outubro/2026")
+    assert generator.generate_email_subject(datetime(2026, 11, 3)).endswith("Novembro/2026")
@@ -0,0 +1,69 @@
+"""Testes da gravação atômica e em segundo plano (mmzr_escrita)."""
+
+import glob
+import os
+
+import pytest
+
+import mmzr_escrita
+from mmzr_escrita import EscritorRelatorios, caminho_saida, gravar_atomico
+from mmzr_integracao_real import gerar_relatorio_integrado
+
+
+def test_gravacao_atomica_substitui_o_arquivo(tmp_path):
+    caminho = str(tmp_path / "relatorio.html")
+    gravar_atomico(caminho, "antigo")
+
+    assert gravar_atomico(caminho, "<p>ação</p>") == len("<p>ação</p>".encode('utf-8'))
+    assert open(caminho, encoding='utf-8').read() == "<p>ação</p>"
+    assert os.listdir(tmp_path) == ["relatorio.html"]
+
+
+def test_falha_na_gravacao_mantem_a_versao_anterior(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "relatorio.html")
+    gravar_atomico(caminho, "anterior")
+
+    def falhar(origem, destino):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(mmzr_escrita.os, "replace", falhar)
+    with pytest.raises(OSError):
+        gravar_atomico(caminho, "novo")
+    assert open(caminho, encoding='utf-8').read() == "anterior"
+    assert os.listdir(tmp_path) == ["relatorio.html"]
+
+
+def test_escritor_grava_todos_os_arquivos_nas_subpastas(tmp_path):
+    concluidos = []
+    with EscritorRelatorios(str(tmp_path), subpastas=True, threads=3, tamanho_fila=2) as escritor:
+        for i in range(20):
+            escritor.enviar(f"relatorio_{i}.html", f"<p>{i}</p>", concluidos.append)
+
+    estatisticas = escritor.estatisticas()
+    assert (estatisticas['gravados'], estatisticas['erros']) == (20, 0)
+    assert sorted(concluidos) == sorted(caminho_saida(str(tmp_path), f"relatorio_{i}.html", True) for i in range(20))
+    for i in range(20):
+        assert open(escritor.caminho_final(f"relatorio_{i}.html"), encoding='utf-8').read() == f"<p>{i}</p>"
+    with pytest.raises(RuntimeError):
+        escritor.enviar("tarde.html", "")
+
+
+def test_erro_de_gravacao_fica_registrado(tmp_path):
+    with EscritorRelatorios(str(tmp_path)) as escritor:
+        os.makedirs(escritor.caminho_final("pasta.html"))
+        escritor.enviar("pasta.html", "x")
+        escritor.enviar("ok.html", "x")
+
+    assert [caminho for caminho, _ in escritor.erros] == [escritor.caminho_final("pasta.html")]
+    assert escritor.estatisticas()['gravados'] == 1
+
+
+def test_saida_em_segundo_plano_gera_os_mesmos_relatorios(dataset):
+    gerar_relatorio_integrado(dataset=dataset, incremental=False)
+    gerar_relatorio_integrado(dataset=dataset, incremental=False, saida="relatorios")
+
+    diretos = sorted(glob.glob("relatorio_mensal_*.html"))
+    assert len(diretos) == 2
+    for caminho in diretos:
+        with open(caminho, 'rb') as direto, open(os.path.join("relatorios", caminho), 'rb') as escrito:
+            assert escrito.read() == direto.read()
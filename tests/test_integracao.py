@@ -0,0 +1,92 @@
+"""Testes da montagem das carteiras e da geração em lote (mmzr_integracao_real)."""
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from conftest import RAIZ
+from mmzr_email_generator import MMZREmailGenerator
+from mmzr_integracao_real import gerar_relatorio_integrado, montar_carteiras, obter_dados_carteira
+
+DATA_REF = datetime(2026, 10, 17)
+
+
+@pytest.fixture
+def generator():
+    return MMZREmailGenerator()
+
+
+def _por_linha(dataset, generator):
+    """Carteiras montadas uma a uma, como no caminho original (sem valores pré-formatados)."""
+    carteiras = {}
+    for _, cliente_row in dataset.clientes.iterrows():
+        registro = dataset.registro_rentabilidade(cliente_row['Código carteira smart'])
+        if registro is not None:
+            carteiras.setdefault(cliente_row['Nome cliente'], []).append(
+                obter_dados_carteira(cliente_row, registro, generator))
+    return carteiras
+
+
+def test_montagem_em_bloco_equivale_a_montagem_por_carteira(dataset, generator):
+    esperado = _por_linha(dataset, generator)
+    relatorios = montar_carteiras(dataset, dataset.clientes, generator)
+
+    assert [relatorio.nome for relatorio in relatorios] == sorted(esperado)
+    for relatorio in relatorios:
+        assert [carteira.para_dict()['name'] for carteira in relatorio.carteiras] == \
+            [carteira.nome for carteira in esperado[relatorio.nome]]
+        assert generator.generate_html_email(relatorio.nome, DATA_REF, relatorio.carteiras) == \
+            generator.generate_html_email(relatorio.nome, DATA_REF, esperado[relatorio.nome])
+
+
+def test_clientes_recebem_o_email_do_cadastro(dataset, generator):
+    emails = {relatorio.nome: relatorio.email for relatorio in montar_carteiras(dataset, dataset.clientes, generator)}
+    assert emails == {'Helena Miranda': 'helenamirandafm@gmail.com', 'Vinicius Maciel': 'macielflorv@gmail.com'}
+
+
+def test_medicao_da_compactacao_e_opcional(dataset, capsys, monkeypatch):
+    renderizados = []
+    original = MMZREmailGenerator.generate_html_email
+
+    def contar(self, *args, **kwargs):
+        renderizados.append(self.template.compacto)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(MMZREmailGenerator, "generate_html_email", contar)
+
+    gerar_relatorio_integrado(dataset=dataset, compacto=True, incremental=False, saida="compacto")
+    assert "Sem compactação" not in capsys.readouterr().out
+    assert renderizados == [True, True]
+
+    gerar_relatorio_integrado(dataset=dataset, compacto=True, incremental=False, saida="medido",
+                              medir_compactacao=True)
+    assert "Sem compactação" in capsys.readouterr().out
+    assert renderizados.count(False) == 2
+
+
+def test_retorno_indica_se_a_geracao_terminou(dataset, capsys):
+    assert gerar_relatorio_integrado(dataset=dataset, nome_ou_email_cliente="helenamirandafm@gmail.com") is True
+    assert gerar_relatorio_integrado(dataset=dataset, nome_ou_email_cliente="Cliente Inexistente") is False
+    assert "ERRO: Cliente 'Cliente Inexistente' não encontrado" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("argumentos, entrada, gerados", [
+    (["--todos"], None, 2),
+    (["--cliente", "Helena Miranda"], None, 1),
+    ([], "\nn\n", 2),
+    ([], "macielflorv@gmail.com\nn\n", 1),
+], ids=["todos", "cliente", "interativo_todos", "interativo_cliente"])
+def test_linha_de_comando_repassa_as_opcoes(pasta_trabalho, argumentos, entrada, gerados):
+    comando = [sys.executable, os.path.join(RAIZ, "mmzr_integracao_real.py"), *argumentos,
+               "--sem-cache", "--compacto", "--saida", "relatorios"]
+    resultado = subprocess.run(comando, input=entrada, stdin=None if entrada else subprocess.DEVNULL,
+                               capture_output=True, text=True, timeout=120)
+
+    assert resultado.returncode == 0, resultado.stderr
+    arquivos = [nome for nome in os.listdir("relatorios") if nome.startswith("relatorio_mensal_")]
+    assert len(arquivos) == gerados
+    assert all("\n" not in open(os.path.join("relatorios", nome), encoding='utf-8').read().strip()
+               for nome in arquivos)
@@ -0,0 +1,62 @@
+"""Testes da logo compartilhada no processo e do modo cid (mmzr_logo)."""
+
+import os
+from datetime import datetime
+
+import pytest
+
+import mmzr_logo
+from mmzr_email_generator import MMZREmailGenerator
+from mmzr_logo import CAMINHOS_LOGO, CONTENT_ID_LOGO, carregar_logo
+
+DATA_REF = datetime(2026, 10, 17)
+
+
+def test_logo_e_lida_uma_vez_enquanto_o_arquivo_nao_muda(pasta_trabalho):
+    primeira = carregar_logo()
+    assert primeira is not None
+    assert primeira.data_uri.startswith(f"data:{primeira.mime_type};base64,")
+    assert carregar_logo() is primeira
+
+    caminho = CAMINHOS_LOGO[0]
+    with open(caminho, "ab") as arquivo:
+        arquivo.write(b"\0")
+    stat = os.stat(caminho)
+    os.utime(caminho, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    nova = carregar_logo()
+    assert nova is not primeira
+    assert nova.conteudo == primeira.conteudo + b"\0"
+    # A versão anterior do mesmo arquivo é descartada
+    assert [c for c in mmzr_logo._logos_carregadas if c[0] == nova.caminho] == \
+        [(nova.caminho, stat.st_size, stat.st_mtime_ns + 10**9)]
+
+
+def test_sem_arquivo_de_logo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert carregar_logo() is None
+    assert MMZREmailGenerator().logo_base64 == ""
+
+
+def test_modo_cid_referencia_o_anexo(pasta_trabalho):
+    inline = MMZREmailGenerator()
+    cid = MMZREmailGenerator(logo_mode="cid")
+    html_inline = inline.generate_html_email("Cliente", DATA_REF, [])
+    html_cid = cid.generate_html_email("Cliente", DATA_REF, [])
+
+    assert f'src="cid:{CONTENT_ID_LOGO}"' in html_cid
+    assert "base64," not in html_cid
+    assert html_inline.replace(inline.logo_base64, f"cid:{CONTENT_ID_LOGO}") == html_cid
+
+    mensagem = cid.build_mime_message(html_cid, "cliente@example.com", "Assunto")
+    anexos = [parte for parte in mensagem.walk() if parte.get('Content-ID')]
+    assert [parte['Content-ID'] for parte in anexos] == [f"<{CONTENT_ID_LOGO}>"]
+    assert anexos[0].get_payload(decode=True) == cid.logo.conteudo
+
+    simples = inline.build_mime_message(html_inline, "cliente@example.com", "Assunto")
+    assert not simples.is_multipart()
+
+
+def test_modo_de_logo_invalido():
+    with pytest.raises(ValueError):
+        MMZREmailGenerator(logo_mode="anexo")
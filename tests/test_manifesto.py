@@ -0,0 +1,47 @@
+"""Testes do manifesto da geração incremental (mmzr_manifesto)."""
+
+import glob
+import json
+import os
+
+import pytest
+
+from mmzr_integracao_real import gerar_relatorio_integrado
+from mmzr_manifesto import NOME_MANIFESTO
+
+
+def _gerar(dataset, **opcoes):
+    gerar_relatorio_integrado(dataset=dataset, **opcoes)
+
+
+def test_cliente_sem_alteracoes_e_reaproveitado(dataset, capsys):
+    _gerar(dataset)
+    assert capsys.readouterr().out.count("Relatório gerado") == 2
+
+    _gerar(dataset)
+    saida = capsys.readouterr().out
+    assert "Relatório gerado" not in saida
+    assert "2 relatórios sem alterações foram reaproveitados (0 gerados)" in saida
+
+    _gerar(dataset, incremental=False)
+    assert capsys.readouterr().out.count("Relatório gerado") == 2
+
+
+def test_relatorio_apagado_e_gerado_novamente(dataset, capsys):
+    _gerar(dataset)
+    capsys.readouterr()
+    os.remove(glob.glob("relatorio_mensal_Helena_Miranda_*.html")[0])
+
+    _gerar(dataset)
+    saida = capsys.readouterr().out
+    assert saida.count("Relatório gerado") == 1 and "Helena_Miranda" in saida
+
+
+@pytest.mark.parametrize("opcoes", [{}, {'pipeline': True}, {'workers': 2}], ids=["sequencial", "pipeline", "workers"])
+def test_arquivos_de_controle_ficam_na_pasta_de_saida(dataset, opcoes):
+    _gerar(dataset, saida="relatorios", **opcoes)
+
+    assert [nome for nome in os.listdir(".") if nome.startswith(".mmzr_")] == []
+    with open(os.path.join("relatorios", NOME_MANIFESTO), encoding="utf-8") as arquivo:
+        clientes = json.load(arquivo)['clientes']
+    assert sorted(clientes) == ['Helena Miranda', 'Vinicius Maciel']
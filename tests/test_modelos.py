@@ -0,0 +1,60 @@
+"""Testes dos registros de carteira e cliente (mmzr_modelos)."""
+
+import pickle
+from datetime import datetime
+
+from mmzr_email_generator import MMZREmailGenerator
+from mmzr_modelos import LinhaPerformance, RelatorioCarteira, RelatorioCliente, como_carteira
+
+CARTEIRA = {
+    'name': 'Carteira Smart',
+    'type': 'Arrojada',
+    'comentarios': 'Comentário',
+    'data': {
+        'performance': [
+            {'periodo': 'Outubro:', 'carteira': 1.25, 'benchmark': 0.8, 'diferenca': 0.45},
+            {'periodo': 'No ano:', 'carteira': -2.0, 'benchmark': 5.1, 'diferenca': -7.1,
+             'formatado': ('#dc3545', '-2.00%', '+5.10%', '#dc3545', '-7.10 p.p.')},
+        ],
+        'retorno_financeiro': -17026.39,
+        'estrategias_destaque': ['Renda fixa'],
+        'ativos_promotores': ['Ativo A (+1.00%)'],
+        'ativos_detratores': ['Ativo B (-0.50%)'],
+    },
+}
+
+
+def test_conversao_de_ida_e_volta():
+    carteira = RelatorioCarteira.de_dict(CARTEIRA)
+
+    assert carteira.para_dict() == CARTEIRA
+    assert RelatorioCarteira.de_dict(carteira.para_dict()) == carteira
+    assert carteira.performance[1].formatado[1] == '-2.00%'
+    assert como_carteira(carteira) is carteira
+    assert como_carteira(CARTEIRA) == carteira
+
+
+def test_valores_padrao_do_formato_antigo():
+    carteira = RelatorioCarteira.de_dict({})
+
+    assert (carteira.nome, carteira.tipo, carteira.comentarios, carteira.retorno_financeiro) == \
+        ('Carteira', 'Diversificada', '', 0)
+    assert carteira.performance == [] and carteira.ativos_detratores == []
+
+
+def test_registros_sem_dicionario_de_atributos():
+    linha = LinhaPerformance('Outubro:', 1.0, 0.5, 0.5)
+    cliente = RelatorioCliente('Cliente', 'cliente@example.com', [RelatorioCarteira.de_dict(CARTEIRA)])
+
+    for registro in (linha, cliente, cliente.carteiras[0]):
+        assert not hasattr(registro, '__dict__')
+    assert pickle.loads(pickle.dumps(cliente)) == cliente
+    assert repr(linha) == "LinhaPerformance(periodo='Outubro:', carteira=1.0, benchmark=0.5, diferenca=0.5, formatado=None)"
+
+
+def test_dicionario_e_registro_geram_o_mesmo_html():
+    generator = MMZREmailGenerator()
+    data_ref = datetime(2026, 10, 17)
+
+    assert generator.generate_html_email('Cliente', data_ref, [CARTEIRA]) == \
+        generator.generate_html_email('Cliente', data_ref, [RelatorioCarteira.de_dict(CARTEIRA)])
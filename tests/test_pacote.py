@@ -0,0 +1,65 @@
+"""Testes do pacote zip de relatórios (mmzr_pacote)."""
+
+import glob
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from mmzr_email_generator import MMZREmailGenerator
+from mmzr_integracao_real import gerar_relatorio_integrado, montar_carteiras
+from mmzr_pacote import NOME_INDICE, LeitorPacote, PacoteRelatorios
+
+DATA_REF = datetime(2026, 10, 17)
+
+
+def test_pacote_guarda_os_mesmos_relatorios_com_indice(dataset, tmp_path):
+    generator = MMZREmailGenerator()
+    relatorios = montar_carteiras(dataset, dataset.clientes, generator)
+    caminho = str(tmp_path / "relatorios.zip")
+
+    with PacoteRelatorios(caminho) as pacote:
+        for relatorio in relatorios:
+            pacote.adicionar(generator, relatorio.nome, relatorio.email, DATA_REF, relatorio.carteiras)
+
+    with LeitorPacote(caminho) as leitor:
+        assert leitor.clientes() == ['Helena Miranda', 'Vinicius Maciel']
+        for relatorio in relatorios:
+            esperado = generator.generate_html_email(relatorio.nome, DATA_REF, relatorio.carteiras)
+            assert leitor.ler(relatorio.nome) == esperado
+            assert leitor.ler(relatorio.email.upper()) == esperado
+            assert leitor.indice[relatorio.nome]['tamanho'] == len(esperado.encode('utf-8'))
+        with pytest.raises(KeyError):
+            leitor.ler("Cliente Inexistente")
+
+
+def test_nomes_de_entrada_repetidos(tmp_path):
+    generator = MMZREmailGenerator()
+    caminho = str(tmp_path / "relatorios.zip")
+
+    with PacoteRelatorios(caminho) as pacote:
+        primeira = pacote.adicionar(generator, "Ana Souza", "a@example.com", DATA_REF, [])
+        segunda = pacote.adicionar(generator, "Ana-Souza", "b@example.com", DATA_REF, [])
+
+    assert primeira != segunda
+    assert segunda == primeira.replace(".html", "_2.html")
+    with LeitorPacote(caminho) as leitor:
+        assert "Ana-Souza" in leitor.ler("b@example.com")
+
+
+def test_arquivo_sem_indice_e_rejeitado(tmp_path):
+    caminho = str(tmp_path / "outro.zip")
+    with zipfile.ZipFile(caminho, 'w') as arquivo:
+        arquivo.writestr("relatorio.html", "<html></html>")
+
+    with pytest.raises(ValueError):
+        LeitorPacote(caminho)
+
+
+def test_modo_pacote_nao_grava_arquivos_soltos(dataset, capsys):
+    gerar_relatorio_integrado(dataset=dataset, pacote="relatorios.zip")
+
+    assert "Pacote gerado: relatorios.zip (2 relatórios" in capsys.readouterr().out
+    assert glob.glob("relatorio_mensal_*.html") == []
+    with zipfile.ZipFile("relatorios.zip") as arquivo:
+        assert NOME_INDICE in arquivo.namelist()
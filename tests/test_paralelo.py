@@ -0,0 +1,47 @@
+"""Testes da geração em vários processos (--workers)."""
+
+import glob
+import os
+
+import pytest
+
+from conftest import PLANILHA_BASE, PLANILHA_RENTABILIDADE
+from mmzr_integracao_real import gerar_relatorio_integrado
+
+
+def _relatorios(pasta):
+    return {os.path.basename(caminho): open(caminho, 'rb').read()
+            for caminho in glob.glob(os.path.join(pasta, "relatorio_mensal_*.html"))}
+
+
+@pytest.mark.parametrize("opcoes", [
+    {'workers': 2},
+    {'workers': 2, 'tamanho_lote': 1, 'saida': "processos"},
+    {'workers': 2, 'streaming': True, 'compacto': True},
+], ids=["padrao", "lote_unitario_com_saida", "streaming_compacto"])
+def test_processos_geram_os_mesmos_relatorios(pasta_trabalho, capsys, opcoes):
+    comuns = dict(planilha_base=PLANILHA_BASE, planilha_rentabilidade=PLANILHA_RENTABILIDADE,
+                  usar_cache=False, incremental=False)
+    sequencial = {k: v for k, v in opcoes.items() if k not in ('workers', 'tamanho_lote', 'saida')}
+    gerar_relatorio_integrado(saida="sequencial", **comuns, **sequencial)
+    capsys.readouterr()
+
+    gerar_relatorio_integrado(**comuns, **opcoes)
+    saida = capsys.readouterr().out
+
+    esperado = _relatorios("sequencial")
+    assert len(esperado) == 2
+    assert _relatorios(opcoes.get('saida', ".")) == esperado
+    assert saida.count("Relatório gerado") == 2
+    assert "Geração paralela: 2 relatórios" in saida
+    assert f"com 2 processos e lotes de {opcoes.get('tamanho_lote', 50)} clientes" in saida
+
+
+def test_processos_reaproveitam_relatorios_inalterados(dataset, capsys):
+    gerar_relatorio_integrado(dataset=dataset, workers=2)
+    capsys.readouterr()
+
+    gerar_relatorio_integrado(dataset=dataset, workers=2)
+    saida = capsys.readouterr().out
+    assert "Relatório gerado" not in saida
+    assert "2 relatórios sem alterações foram reaproveitados" in saida
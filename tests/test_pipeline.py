@@ -0,0 +1,81 @@
+"""Testes do pipeline assíncrono (mmzr_pipeline e --pipeline)."""
+
+import glob
+import threading
+import time
+
+import pytest
+
+import mmzr_integracao_real
+from mmzr_integracao_real import gerar_relatorio_integrado
+from mmzr_pipeline import Etapa, PipelineAssincrono
+
+
+def test_itens_passam_por_todas_as_etapas():
+    resultados = []
+    trava = threading.Lock()
+
+    def guardar(item):
+        with trava:
+            resultados.append(item)
+
+    def falhar_no_tres(item):
+        if item == 3:
+            raise ValueError("item inválido")
+        return item
+
+    pipeline = PipelineAssincrono([
+        Etapa("dobrar", lambda item: item * 2, threads=0),
+        Etapa("validar", lambda item: falhar_no_tres(item // 2) * 2, threads=2),
+        Etapa("multiplos_de_quatro", lambda item: item if item % 4 == 0 else None),
+        Etapa("guardar", guardar, threads=3),
+    ], tamanho_fila=2)
+    pipeline.executar(range(10))
+
+    assert sorted(resultados) == [0, 4, 8, 12, 16]
+    estatisticas = {etapa['etapa']: etapa for etapa in pipeline.estatisticas()}
+    assert list(estatisticas) == ["carregar", "dobrar", "validar", "multiplos_de_quatro", "guardar"]
+    assert estatisticas['validar']['erros'] == 1
+    assert estatisticas['guardar']['processados'] == 5
+    assert max(etapa['fila_maxima'] for etapa in estatisticas.values()) <= 2
+
+
+def test_erro_da_fonte_e_propagado_depois_dos_itens_produzidos():
+    processados = []
+
+    def fonte():
+        yield 1
+        yield 2
+        raise RuntimeError("planilha ilegível")
+
+    pipeline = PipelineAssincrono([Etapa("guardar", processados.append)])
+    with pytest.raises(RuntimeError):
+        pipeline.executar(fonte())
+    assert processados == [1, 2]
+
+
+def test_pipeline_gera_os_mesmos_relatorios(dataset):
+    gerar_relatorio_integrado(dataset=dataset, incremental=False, saida="sequencial")
+    gerar_relatorio_integrado(dataset=dataset, incremental=False, saida="pipeline", pipeline=True)
+
+    sequencial = sorted(glob.glob("sequencial/relatorio_mensal_*.html"))
+    assert len(sequencial) == 2
+    for caminho in sequencial:
+        assert open(caminho, 'rb').read() == open(caminho.replace("sequencial", "pipeline", 1), 'rb').read()
+
+
+def test_mensagens_das_threads_de_gravacao_nao_se_misturam(dataset, monkeypatch):
+    linhas = []
+
+    def imprimir_devagar(*partes, **_):
+        # Como o print, escreve o texto e a quebra de linha separadamente
+        linhas.append(" ".join(map(str, partes)))
+        time.sleep(0.02)
+        linhas.append("\n")
+
+    monkeypatch.setattr(mmzr_integracao_real, "print", imprimir_devagar, raising=False)
+    gerar_relatorio_integrado(dataset=dataset, incremental=False, pipeline=True)
+
+    gerados = [i for i, linha in enumerate(linhas) if linha.startswith("Relatório gerado")]
+    assert len(gerados) == 2
+    assert all(linhas[i + 1] == "\n" for i in gerados)
@@ -0,0 +1,55 @@
+"""Testes do esquema das abas e da conversão das colunas numéricas (mmzr_schema)."""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mmzr_cache import MMZRCache
+from mmzr_schema import ESQUEMA_RENTABILIDADE, EsquemaAba
+
+
+def _rentabilidade(tmp_path, benchmark_mes):
+    linhas = len(benchmark_mes)
+    dados = {coluna: [None] * linhas for coluna in ESQUEMA_RENTABILIDADE.colunas}
+    dados.update({coluna: [1.5] * linhas for coluna in ESQUEMA_RENTABILIDADE.numericas})
+    dados['Código carteira smart'] = list(range(1, linhas + 1))
+    dados['Benchmark Mês'] = benchmark_mes
+    dados['Coluna Extra'] = ['ignorada'] * linhas
+    caminho = tmp_path / "rentabilidade.xlsx"
+    pd.DataFrame(dados).to_excel(caminho, index=False)
+    return str(caminho)
+
+
+def test_le_apenas_as_colunas_do_esquema(tmp_path):
+    caminho = _rentabilidade(tmp_path, [0.37, 0.63])
+    df = MMZRCache(habilitado=False).ler_aba(caminho, esquema=ESQUEMA_RENTABILIDADE)
+
+    assert set(df.columns) == set(ESQUEMA_RENTABILIDADE.colunas)
+    assert all(df[coluna].dtype == np.float64 for coluna in ESQUEMA_RENTABILIDADE.numericas)
+
+
+def test_valor_nao_numerico_vira_vazio_sem_abortar_a_leitura(tmp_path, caplog):
+    caminho = _rentabilidade(tmp_path, [0.37, 'n/d', None])
+
+    with caplog.at_level(logging.WARNING, logger="mmzr_schema"):
+        df = MMZRCache(habilitado=False).ler_aba(caminho, esquema=ESQUEMA_RENTABILIDADE)
+
+    assert df['Benchmark Mês'].dtype == np.float64
+    assert df['Benchmark Mês'].iloc[0] == 0.37
+    assert df['Benchmark Mês'].iloc[1:].isna().all()
+    assert "Benchmark Mês" in caplog.text and "linhas 3" in caplog.text
+
+
+def test_coluna_obrigatoria_ausente(tmp_path):
+    caminho = tmp_path / "incompleta.xlsx"
+    pd.DataFrame({'Código carteira smart': [1]}).to_excel(caminho, index=False)
+
+    with pytest.raises(ValueError, match="Colunas obrigatórias ausentes"):
+        MMZRCache(habilitado=False).ler_aba(str(caminho), esquema=ESQUEMA_RENTABILIDADE)
+
+
+def test_tipos_numericos_ficam_fora_do_read_excel():
+    esquema = EsquemaAba("Teste", {'Nome': 'category', 'Valor': 'float64', 'Texto': None})
+    assert esquema.opcoes_leitura()['dtype'] == {'Nome': 'category'}
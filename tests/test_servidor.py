@@ -0,0 +1,100 @@
+"""Testes do servidor de relatórios (mmzr_servidor)."""
+
+import glob
+import http.client
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import mmzr_integracao_real
+from conftest import PLANILHA_BASE, PLANILHA_RENTABILIDADE
+from mmzr_servidor import ServidorRelatorios, _ManipuladorRelatorios
+
+
+@pytest.fixture
+def servidor(pasta_trabalho):
+    """Servidor HTTP numa porta livre, atendendo em uma thread."""
+    servidor = ServidorRelatorios(PLANILHA_BASE, PLANILHA_RENTABILIDADE)
+    manipulador = type("ManipuladorTeste", (_ManipuladorRelatorios,), {'servidor_relatorios': servidor})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), manipulador)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield servidor, httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _pedir(porta, metodo, caminho, corpo=None, cabecalhos=None):
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+    try:
+        conexao.request(metodo, caminho, body=corpo, headers=cabecalhos or {})
+        resposta = conexao.getresponse()
+        return resposta.status, resposta.read()
+    finally:
+        conexao.close()
+
+
+def test_relatorio_e_renderizado_com_os_dados_em_memoria(servidor):
+    _, porta = servidor
+
+    status, corpo = _pedir(porta, "GET", "/relatorio?cliente=helena%20miranda")
+    assert status == 200
+    assert "Helena Miranda" in corpo.decode('utf-8')
+    assert _pedir(porta, "GET", "/relatorio?cliente=Ninguem")[0] == 404
+    status, corpo = _pedir(porta, "GET", "/clientes")
+    assert [cliente['nome'] for cliente in json.loads(corpo)] == ['Helena Miranda', 'Vinicius Maciel']
+
+
+@pytest.mark.parametrize("cabecalhos, esperado", [
+    ({}, 415),
+    ({'Content-Type': "application/x-www-form-urlencoded"}, 415),
+    ({'Content-Type': "text/plain"}, 415),
+    ({'Content-Type': "application/json", 'Origin': "http://site-qualquer.com"}, 403),
+    ({'Content-Type': "application/json", 'Origin': "http://site-qualquer.com:8765"}, 403),
+], ids=["sem_tipo", "formulario", "texto", "outra_origem", "outra_origem_mesma_porta"])
+def test_lote_recusa_pedidos_de_outros_sites(servidor, cabecalhos, esperado):
+    instancia, porta = servidor
+
+    assert _pedir(porta, "POST", "/lote", b"{}", cabecalhos)[0] == esperado
+    assert instancia.lote['situacao'] == 'nenhum'
+
+
+@pytest.mark.parametrize("opcoes", [{'enviar_email': True}, {'saida': "/tmp"}], ids=["enviar_email", "saida"])
+def test_lote_nao_aceita_email_nem_pasta_de_saida(servidor, opcoes):
+    instancia, porta = servidor
+
+    status, corpo = _pedir(porta, "POST", "/lote", json.dumps(opcoes), {'Content-Type': "application/json"})
+    assert status == 400
+    assert "Opções desconhecidas" in json.loads(corpo)['erro']
+    assert instancia.lote['situacao'] == 'nenhum'
+
+
+def _executar_lote(instancia, porta, opcoes):
+    cabecalhos = {'Content-Type': "application/json; charset=utf-8", 'Origin': f"http://localhost:{porta}"}
+    status, _ = _pedir(porta, "POST", "/lote", json.dumps(opcoes), cabecalhos)
+    assert status == 202
+    limite = time.monotonic() + 60
+    while instancia.lote['situacao'] == 'em andamento' and time.monotonic() < limite:
+        time.sleep(0.05)
+    return json.loads(_pedir(porta, "GET", "/lote")[1])
+
+
+def test_lote_do_proprio_servidor_e_executado(servidor):
+    instancia, porta = servidor
+
+    assert _executar_lote(instancia, porta, {'incremental': False})['situacao'] == 'concluido'
+    assert len(glob.glob("relatorio_mensal_*.html")) == 2
+
+
+def test_lote_com_erro_e_informado(servidor, monkeypatch):
+    instancia, porta = servidor
+
+    def falhar(*_, **__):
+        raise RuntimeError("planilha corrompida")
+
+    monkeypatch.setattr(mmzr_integracao_real, "montar_carteiras", falhar)
+    assert _executar_lote(instancia, porta, {})['situacao'] == 'erro'
+    assert glob.glob("relatorio_mensal_*.html") == []
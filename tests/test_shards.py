@@ -0,0 +1,68 @@
+"""Testes da divisão em shards e da junção dos manifestos (--shard, --juntar-manifestos, --todos)."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import RAIZ
+from mmzr_dataset import shard_do_cliente
+from mmzr_integracao_real import gerar_relatorio_integrado, juntar_shards
+from mmzr_manifesto import NOME_MANIFESTO_JUNTADO, juntar_manifestos, nome_manifesto_shard
+
+NOMES = [f"Cliente {i:04d}" for i in range(200)]
+
+
+def test_shards_formam_uma_particao_estavel():
+    for total in (1, 3, 8):
+        shards = [shard_do_cliente(nome, total) for nome in NOMES]
+        assert set(shards) <= set(range(1, total + 1))
+        assert shards == [shard_do_cliente(nome, total) for nome in NOMES]
+    # Variações de maiúsculas, espaços e acentos não mudam o shard
+    assert shard_do_cliente("  helena   MIRANDA ", 4) == shard_do_cliente("Helena Miranda", 4)
+    assert shard_do_cliente("José Álvares", 4) == shard_do_cliente("Jose Alvares", 4)
+
+
+def test_filtro_por_shard_cobre_todos_os_clientes(dataset):
+    partes = [dataset.filtrar_shard(i, 3) for i in (1, 2, 3)]
+
+    nomes = [set(parte['Nome cliente']) for parte in partes]
+    assert sum(len(parte) for parte in partes) == len(dataset.clientes)
+    assert set().union(*nomes) == set(dataset.clientes['Nome cliente'])
+    assert all(not (a & b) for i, a in enumerate(nomes) for b in nomes[i + 1:])
+    with pytest.raises(ValueError):
+        dataset.filtrar_shard(4, 3)
+
+
+def test_manifestos_dos_shards_sao_juntados_em_arquivo_proprio(dataset, capsys):
+    for indice in (1, 2):
+        gerar_relatorio_integrado(dataset=dataset, shard=(indice, 2))
+    origens = [nome_manifesto_shard(indice, 2) for indice in (1, 2)]
+    originais = [open(caminho, encoding='utf-8').read() for caminho in origens]
+    capsys.readouterr()
+
+    resumo = juntar_shards(origens)
+
+    assert resumo['clientes'] == 2 and resumo['faltando'] == [] and resumo['repetidos'] == 0
+    assert f"Manifesto combinado: {NOME_MANIFESTO_JUNTADO}" in capsys.readouterr().out
+    with open(NOME_MANIFESTO_JUNTADO, encoding='utf-8') as arquivo:
+        assert sorted(json.load(arquivo)['clientes']) == ['Helena Miranda', 'Vinicius Maciel']
+    assert [open(caminho, encoding='utf-8').read() for caminho in origens] == originais
+
+    with pytest.raises(ValueError):
+        juntar_manifestos(origens, destino=os.path.join(".", origens[0]))
+    assert juntar_manifestos(origens[:1], destino="parcial.json")['faltando'] == [2]
+
+
+def test_todos_gera_sem_perguntas(pasta_trabalho):
+    resultado = subprocess.run(
+        [sys.executable, os.path.join(RAIZ, "mmzr_integracao_real.py"), "--todos", "--sem-cache", "--saida", "relatorios"],
+        stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=120,
+    )
+
+    assert resultado.returncode == 0, resultado.stderr
+    assert "Digite o nome" not in resultado.stdout
+    assert resultado.stdout.count("Relatório gerado") == 2
+    assert len([nome for nome in os.listdir("relatorios") if nome.startswith("relatorio_mensal_")]) == 2
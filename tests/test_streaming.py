@@ -0,0 +1,99 @@
+"""Testes do modo streaming da rentabilidade e da gravação direta no arquivo ou destino."""
+
+import glob
+import io
+import math
+import os
+from datetime import datetime
+
+import pytest
+
+from conftest import PLANILHA_BASE, PLANILHA_RENTABILIDADE, alterar_celula
+from mmzr_dataset import MMZRDataset, iterar_rentabilidade
+from mmzr_email_generator import MMZREmailGenerator
+from mmzr_integracao_real import gerar_relatorio_integrado, montar_carteiras
+from mmzr_schema import ESQUEMA_RENTABILIDADE
+
+DATA_REF = datetime(2026, 10, 17)
+
+
+def _iguais(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+@pytest.mark.parametrize("valor", [None, "n/d"])
+def test_streaming_produz_os_mesmos_valores_da_leitura_normal(pasta_trabalho, valor):
+    alterar_celula(PLANILHA_RENTABILIDADE, 'Benchmark Mês', 2, valor)
+    normal = MMZRDataset(PLANILHA_BASE, PLANILHA_RENTABILIDADE, usar_cache=False).rentabilidade
+    registros = list(iterar_rentabilidade(PLANILHA_RENTABILIDADE))
+
+    assert len(registros) == len(normal)
+    for registro, esperado in zip(registros, normal.to_dict('records')):
+        for coluna in ESQUEMA_RENTABILIDADE.numericas:
+            assert isinstance(registro[coluna], float)
+            assert _iguais(registro[coluna], esperado[coluna]), coluna
+    assert math.isnan(registros[0]['Benchmark Mês'])
+
+
+def _gerar(pasta, streaming):
+    gerar_relatorio_integrado(PLANILHA_BASE, PLANILHA_RENTABILIDADE, usar_cache=False,
+                              streaming=streaming, incremental=False, saida=str(pasta))
+    return {caminho.rsplit('/', 1)[-1]: open(caminho, 'rb').read()
+            for caminho in glob.glob(f"{pasta}/relatorio_mensal_*.html")}
+
+
+def test_celula_vazia_gera_o_mesmo_relatorio_nos_dois_modos(pasta_trabalho):
+    alterar_celula(PLANILHA_RENTABILIDADE, 'Benchmark Mês', 2, None)
+    normal = _gerar(pasta_trabalho / "normal", streaming=False)
+    streaming = _gerar(pasta_trabalho / "streaming", streaming=True)
+
+    assert len(normal) == 2
+    assert streaming == normal
+
+
+def test_falha_na_geracao_nao_deixa_arquivo_nem_anuncia_sucesso(pasta_trabalho, monkeypatch, capsys):
+    def falhar(self, sink, *args):
+        sink.write("<html>parcial")
+        raise TypeError("'>' not supported between instances of 'NoneType' and 'int'")
+
+    monkeypatch.setattr(MMZREmailGenerator, "write_html_email", falhar)
+    gerar_relatorio_integrado(PLANILHA_BASE, PLANILHA_RENTABILIDADE, usar_cache=False, streaming=True,
+                              incremental=False)
+
+    saida = capsys.readouterr().out
+    assert "Relatório gerado" not in saida
+    assert "não foi gerado" in saida
+    assert glob.glob("relatorio_mensal_*.html") == []
+
+
+@pytest.mark.parametrize("compacto", [False, True])
+def test_escrita_no_destino_equivale_ao_html_completo(dataset, compacto):
+    generator = MMZREmailGenerator(compacto=compacto)
+    relatorio = montar_carteiras(dataset, dataset.clientes, generator)[0]
+    esperado = generator.generate_html_email(relatorio.nome, DATA_REF, relatorio.carteiras)
+
+    texto = io.StringIO()
+    binario = io.BytesIO()
+    escritos = generator.write_html_email(binario, relatorio.nome, DATA_REF, relatorio.carteiras)
+    generator.write_html_email(texto, relatorio.nome, DATA_REF, relatorio.carteiras)
+
+    assert texto.getvalue() == esperado
+    assert binario.getvalue() == esperado.encode('utf-8')
+    assert escritos == len(binario.getvalue())
+    assert "".join(generator.iter_html_email(relatorio.nome, DATA_REF, relatorio.carteiras)) == esperado
+
+
+def test_falha_ao_gravar_remove_o_arquivo_parcial(pasta_trabalho, monkeypatch):
+    generator = MMZREmailGenerator()
+    caminho = str(pasta_trabalho / "relatorio.html")
+
+    def disco_cheio(self, sink, *args):
+        sink.write("<html>parcial")
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(MMZREmailGenerator, "write_html_email", disco_cheio)
+    with pytest.raises(IOError):
+        generator.stream_email_to_file("Cliente", DATA_REF, [], caminho)
+    assert not os.path.exists(caminho)
@@ -0,0 +1,92 @@
+"""Testes dos trechos compilados do template (mmzr_template)."""
+
+import pytest
+
+import mmzr_template
+from mmzr_template import MMZRTemplate, MemoriaSecoes, TrechoCompilado, calcular_versao
+
+
+TEXTO = '<p class="x">{nome} tem {valor} {{literal}}</p>\n<!-- {nota} -->\n<b>{nome}</b>'
+
+
+def test_renderizacao_equivale_a_str_format():
+    trecho = TrechoCompilado("teste", TEXTO)
+    esperado = TEXTO.format(nome="Ana", valor=1.5, nota="n")
+
+    assert "".join(trecho.renderizar([], nome="Ana", valor=1.5, nota="n")) == esperado
+    assert "".join(trecho.renderizar([], "Ana", 1.5, "n")) == esperado
+    assert "".join(trecho.renderizar([], "Ana", valor=1.5, nota="n")) == esperado
+    assert trecho.campos == ("nome", "valor", "nota")
+
+
+def test_renderizacao_reaproveita_partes_fixas():
+    trecho = TrechoCompilado("teste", TEXTO)
+    primeira = trecho.renderizar([], "a", "b", "c")
+    segunda = trecho.renderizar([], "d", "e", "f")
+
+    assert primeira[0] is segunda[0]
+
+
+def test_campos_invalidos_na_renderizacao():
+    trecho = TrechoCompilado("teste", TEXTO)
+
+    with pytest.raises(TypeError):
+        trecho.renderizar([], nome="Ana", valor=1)
+    with pytest.raises(TypeError):
+        trecho.renderizar([], nome="Ana", valor=1, nota="", extra=2)
+    with pytest.raises(TypeError):
+        trecho.renderizar([], "Ana")
+    with pytest.raises(ValueError):
+        TrechoCompilado("teste", "<p>{a.b}</p>")
+
+
+def test_compactar_mantem_campos_de_comentarios():
+    compacto = TrechoCompilado("teste", TEXTO).compactar()
+
+    assert compacto.campos == ("nome", "valor", "nota")
+    html = "".join(compacto.renderizar([], nome="Ana", valor=2, nota="n"))
+    assert html == '<p class="x">Ana tem 2 {literal}</p><b>Ana</b>'
+
+
+def test_fixar_incorpora_valores():
+    fixado = TrechoCompilado("teste", TEXTO).fixar(nome="Ana")
+
+    assert fixado.campos == ("valor", "nota")
+    assert "".join(fixado.renderizar([], 3, "n")) == TEXTO.format(nome="Ana", valor=3, nota="n")
+
+
+def test_versao_muda_com_o_texto():
+    trecho = TrechoCompilado("teste", TEXTO)
+    alterado = TrechoCompilado("teste", TEXTO.replace("tem", "possui"))
+
+    assert calcular_versao([trecho]) == calcular_versao([TrechoCompilado("teste", TEXTO)])
+    assert calcular_versao([trecho]) != calcular_versao([alterado])
+    assert calcular_versao([trecho], "a") != calcular_versao([trecho], "b")
+    assert MMZRTemplate.para_logo().versao == mmzr_template.TEMPLATE_VERSION
+
+
+def test_memoria_calcula_uma_vez_por_referencia():
+    memoria = MemoriaSecoes()
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return ("<p>", "x", "</p>")
+
+    assert memoria.obter((2026, 10), ('secao',), calcular) == ("<p>", "x", "</p>")
+    assert memoria.obter((2026, 10), ('secao',), calcular) == ("<p>", "x", "</p>")
+    assert (len(chamadas), memoria.acertos, memoria.falhas) == (1, 1, 1)
+
+    # Outra referência (mês ou versão do template) descarta o que foi guardado
+    memoria.obter((2026, 11), ('secao',), calcular)
+    assert len(chamadas) == 2
+    assert memoria.referencia == (2026, 11)
+
+
+def test_memoria_e_limitada():
+    memoria = MemoriaSecoes(tamanho_maximo=2)
+    for chave in ('a', 'b', 'c'):
+        memoria.obter('ref', chave, lambda: chave)
+
+    assert memoria.obter('ref', 'c', lambda: 'novo') == 'c'
+    assert memoria.obter('ref', 'a', lambda: 'novo') == 'novo'